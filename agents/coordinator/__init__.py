@@ -1,5 +1,10 @@
 """Coordinator Agent Module"""
 
-from .orchestrator import TravelOrchestrator
+from shared.lazy import lazy_exports
 
-__all__ = ["TravelOrchestrator"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "TravelOrchestrator": ".orchestrator",
+    "create_app": ".service",
+})
+
+__all__ = ["TravelOrchestrator", "create_app"]
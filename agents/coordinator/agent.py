@@ -1,14 +1,58 @@
+import argparse
 import asyncio
-import sys
-from agents.coordinator.orchestrator import TravelOrchestrator
+from datetime import date
+from agents.coordinator.orchestrator import TravelOrchestrator, concurrency_limit
+from shared.a2a_client import close_transport
 from shared.logger import setup_logger
 from config.setting import settings
 
 logger = setup_logger("coordinator")
 
-async def main():
+# Default locations to test
+DEFAULT_LOCATIONS = ["Da Nang", "Hanoi", "Ho Chi Minh"]
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Plan trips with the A2A travel agents")
+    parser.add_argument(
+        "locations",
+        nargs="*",
+        default=DEFAULT_LOCATIONS,
+        help="Locations to plan trips for"
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=settings.COORDINATOR_MAX_CONCURRENCY,
+        help="Maximum number of locations planned at the same time (1 = sequential)"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        help="Plan a day-by-day itinerary of this many days from the daily forecast"
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        help="First day of the itinerary (YYYY-MM-DD, default: today)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream weather and each activity as soon as it is generated"
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.stream and args.days:
+        parser.error("--stream and --days cannot be combined")
+    return args
+
+async def main(argv=None):
     """Main coordinator function"""
     
+    args = parse_args(argv)
+    
     logger.info("=" * 60)
     logger.info("🎯 TRAVEL COORDINATOR STARTING")
     logger.info("=" * 60)
@@ -16,31 +60,58 @@ async def main():
     # Create orchestrator
     orchestrator = TravelOrchestrator()
     
-    # Default locations to test
-    test_locations = ["Da Nang", "Hanoi", "Ho Chi Minh"]
-    
-    # Check if locations provided via command line
-    if len(sys.argv) > 1:
-        test_locations = sys.argv[1:]
-    
-    logger.info(f"\n📋 Planning trips for: {', '.join(test_locations)}")
-    
-    # Process each location
-    for location in test_locations:
-        try:
-            result = await orchestrator.plan_trip(location)
+    try:
+        logger.info(f"\n📋 Planning trips for: {', '.join(args.locations)}")
+        logger.info(f"⚡ Concurrency limit: {args.concurrency}")
+        
+        if args.stream:
+            await stream_trips(orchestrator, args.locations)
+            return
+        
+        if args.days:
+            await plan_itineraries(orchestrator, args.locations, args.days, args.start, max_concurrency=args.concurrency)
+            return
+        
+        # Print each plan as soon as it is ready
+        async for result in orchestrator.iter_trips(args.locations, max_concurrency=args.concurrency):
+            if not result["success"]:
+                logger.error(f"❌ Failed to process {result['location']}: {', '.join(result['errors'])}")
             print(orchestrator.format_result(result))
-            
-            if location != test_locations[-1]:
-                logger.info("\n" + "─" * 60 + "\n")
-                await asyncio.sleep(2)  # Brief pause between requests
-                
-        except Exception as e:
-            logger.error(f"❌ Failed to process {location}: {e}")
+        
+        logger.info("\n" + "=" * 60)
+        logger.info("✅ ALL TRIPS PLANNED")
+        logger.info("=" * 60)
+    finally:
+        await close_transport()
+
+async def plan_itineraries(orchestrator: TravelOrchestrator, locations, days: int, start=None, max_concurrency=None):
+    """Plan and print a multi-day itinerary per location, at most `max_concurrency` locations at a time"""
+    semaphore = asyncio.Semaphore(concurrency_limit(max_concurrency))
     
-    logger.info("\n" + "=" * 60)
-    logger.info("✅ ALL TRIPS PLANNED")
-    logger.info("=" * 60)
+    async def plan(location):
+        async with semaphore:
+            return await orchestrator.plan_itinerary(location, days, start=start)
+    
+    results = await asyncio.gather(*(plan(location) for location in locations))
+    for result in results:
+        if not result["success"]:
+            logger.error(f"❌ Failed to plan {result['location']}: {', '.join(result['errors'])}")
+        print(orchestrator.format_itinerary(result))
+
+async def stream_trips(orchestrator: TravelOrchestrator, locations):
+    """Print streamed events location by location"""
+    for location in locations:
+        print(f"\n📍 Location: {location}")
+        async for event in orchestrator.plan_trip_stream(location):
+            if event["type"] == "weather":
+                print(f"\n{event['weather']}\n")
+            elif event["type"] == "activity":
+                activity = event["activity"]
+                print(f"{activity['title']}\n{activity['description'].strip()}\n")
+            elif event["type"] == "text":
+                print(event["text"])
+            elif event["type"] == "done" and not event["success"]:
+                print(f"❌ Failed to plan trip: {', '.join(event['errors'])}")
 
 if __name__ == "__main__":
     try:
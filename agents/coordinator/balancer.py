@@ -0,0 +1,204 @@
+"""Client-side load balancing across agent replicas"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Sequence
+from shared.a2a_client import create_a2a_client
+from shared.logger import setup_logger
+
+logger = setup_logger("balancer")
+
+STRATEGIES = ("least_outstanding", "ewma")
+
+class Replica:
+    """One agent endpoint with its load, latency and health state"""
+    
+    def __init__(self, url: str, client: Any, window: int = 100):
+        self.url = url
+        self.client = client
+        self.outstanding = 0
+        self.ewma: Optional[float] = None   # seconds
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        
+        self.requests = 0
+        self.failures = 0
+    
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejected": self.ejected_until > now
+        }
+
+class ReplicaPool:
+    """
+    Route calls to the best of several replicas of one agent.
+    
+    - "least_outstanding" picks the replica with the fewest in-flight calls
+      (latency EWMA breaks ties); "ewma" picks the lowest EWMA latency
+      weighted by in-flight calls. Equal replicas are used round-robin.
+    - A replica failing `eject_after` times in a row is skipped for
+      `eject_seconds`. If every replica is ejected, the one due back first
+      is used rather than failing outright.
+    - With hedging on, a call still running after the pool's recent
+      `hedge_percentile` latency is duplicated on a second replica and the
+      first successful answer wins.
+    """
+    
+    def __init__(
+        self,
+        urls: Sequence[str],
+        client_factory: Optional[Callable[[str], Any]] = None,
+        strategy: str = "least_outstanding",
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        ewma_alpha: float = 0.3,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if not urls:
+            raise ValueError("at least one replica URL is required")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy!r}, expected one of {STRATEGIES}")
+        
+        factory = client_factory or (lambda url: create_a2a_client(f"{url}/a2a"))
+        self.replicas: List[Replica] = [Replica(url, factory(url)) for url in urls]
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.ewma_alpha = ewma_alpha
+        self._clock = clock
+        self._rotation = itertools.count()
+        self._latencies: Deque[float] = deque(maxlen=200)   # pool-wide, for the hedge delay
+        
+        self.hedges = 0
+        self.hedge_wins = 0
+    
+    def pick(self, exclude: Sequence[Replica] = ()) -> Replica:
+        """Choose a replica for the next call"""
+        now = self._clock()
+        candidates = [replica for replica in self.replicas if replica not in exclude] or self.replicas
+        offset = next(self._rotation) % len(candidates)
+        candidates = candidates[offset:] + candidates[:offset]
+        
+        healthy = [replica for replica in candidates if replica.ejected_until <= now]
+        if not healthy:
+            return min(candidates, key=lambda replica: replica.ejected_until)
+        
+        if self.strategy == "ewma":
+            return min(healthy, key=lambda replica: ((replica.ewma or 0.0) * (replica.outstanding + 1), replica.outstanding))
+        return min(healthy, key=lambda replica: (replica.outstanding, replica.ewma or 0.0))
+    
+    @asynccontextmanager
+    async def acquire(self, record_latency: bool = True) -> AsyncIterator[Replica]:
+        """
+        Pick a replica and track the call made with it.
+        
+        Use record_latency=False for long-lived calls such as streams.
+        """
+        async with self._track(self.pick(), record_latency) as replica:
+            yield replica
+    
+    async def call(self, func: Callable[[Replica], Awaitable[Any]]) -> Any:
+        """Run func(replica) on the best replica, hedging if enabled"""
+        primary_replica = self.pick()
+        primary = asyncio.create_task(self._attempt(primary_replica, func))
+        tasks = {primary}
+        try:
+            delay = self.hedge_delay()
+            if delay is None or len(self.replicas) < 2:
+                return await primary
+            
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            
+            self.hedges += 1
+            hedge = asyncio.create_task(self._attempt(self.pick(exclude=(primary_replica,)), func))
+            tasks.add(hedge)
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing (or abandoned) call is cancelled
+            for task in tasks:
+                task.cancel()
+    
+    def hedge_delay(self) -> Optional[float]:
+        """Recent latency percentile, or None when hedging is off or data is short"""
+        if not self.hedge or len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+    
+    async def _attempt(self, replica: Replica, func: Callable[[Replica], Awaitable[Any]]) -> Any:
+        async with self._track(replica, True):
+            return await func(replica)
+    
+    @asynccontextmanager
+    async def _track(self, replica: Replica, record_latency: bool) -> AsyncIterator[Replica]:
+        replica.outstanding += 1
+        replica.requests += 1
+        started = self._clock()
+        try:
+            yield replica
+        except Exception:
+            self._record_failure(replica)
+            raise
+        else:
+            self._record_success(replica, self._clock() - started if record_latency else None)
+        finally:
+            replica.outstanding -= 1
+    
+    def _record_success(self, replica: Replica, latency: Optional[float]):
+        replica.consecutive_failures = 0
+        if latency is None:
+            return
+        replica.latencies.append(latency)
+        self._latencies.append(latency)
+        if replica.ewma is None:
+            replica.ewma = latency
+        else:
+            replica.ewma += self.ewma_alpha * (latency - replica.ewma)
+    
+    def _record_failure(self, replica: Replica):
+        replica.failures += 1
+        replica.consecutive_failures += 1
+        if replica.consecutive_failures >= self.eject_after:
+            replica.ejected_until = self._clock() + self.eject_seconds
+            logger.warning(
+                f"⚠️ Ejecting {replica.url} for {self.eject_seconds:.0f}s "
+                f"after {replica.consecutive_failures} consecutive failures"
+            )
+    
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        delay = self.hedge_delay()
+        return {
+            "strategy": self.strategy,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "replicas": [replica.stats(now) for replica in self.replicas]
+        }
@@ -0,0 +1,275 @@
+"""
+Batch planning: locations from JSONL, one NDJSON result per trip.
+
+Each input line is {"location": "Hanoi"} with an optional "timeout" in
+seconds (a bare JSON string works too). Each result is written as soon as
+its trip finishes: the plan_trip result plus "index", the 0-based input
+line it came from, so output order follows completion rather than input.
+Lines that cannot be parsed produce a failed result instead of stopping
+the run. Input is read lazily (TravelOrchestrator.stream_trips), so memory
+stays flat whatever the input size.
+
+With an output file the run is resumable: a checkpoint (<output>.checkpoint)
+records which input lines are done, and rerunning the same command skips
+them and appends to the output. Results written after the last checkpoint
+save are recovered from the output itself, and a line cut short by a kill
+is dropped, so no trip is planned twice. --restart starts over.
+
+    uv run python -m agents.coordinator.batch destinations.jsonl -o plans.ndjson --concurrency 20
+    cat destinations.jsonl | uv run python -m agents.coordinator.batch - > plans.ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
+from agents.coordinator.orchestrator import TravelOrchestrator
+from shared.a2a_client import close_transport
+from shared.logger import configure_logging, flush_logs, setup_logger
+from config.setting import settings
+
+logger = setup_logger("coordinator")
+
+class Checkpoint:
+    """
+    Input lines whose results are in the output.
+    
+    Kept as a low watermark (every line below `next` is done) plus the done
+    lines above it, so it stays small however long the run; `offset` is the
+    output size the checkpoint covers. Saved atomically (temp file + rename).
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.next = 0
+        self.done: Set[int] = set()
+        self.offset = 0
+    
+    @classmethod
+    def load(cls, path: Path) -> "Checkpoint":
+        checkpoint = cls(path)
+        if path.exists():
+            data = json.loads(path.read_text())
+            checkpoint.next = data["next"]
+            checkpoint.done = set(data["done"])
+            checkpoint.offset = data["offset"]
+        return checkpoint
+    
+    def __contains__(self, index: int) -> bool:
+        return index < self.next or index in self.done
+    
+    def __len__(self) -> int:
+        return self.next + len(self.done)
+    
+    def add(self, index: int):
+        self.done.add(index)
+        while self.next in self.done:
+            self.done.remove(self.next)
+            self.next += 1
+    
+    def save(self, offset: int):
+        self.offset = offset
+        temp = self.path.with_name(self.path.name + ".tmp")
+        temp.write_text(json.dumps({"next": self.next, "done": sorted(self.done), "offset": offset}))
+        os.replace(temp, self.path)
+    
+    def recover(self, output: Path) -> int:
+        """
+        Add results written past `offset` (after the last save) and cut the
+        output after the last complete line; returns the lines recovered.
+        """
+        if not output.exists():
+            self.next, self.done, self.offset = 0, set(), 0
+            return 0
+        recovered = 0
+        with open(output, "r+b") as file:
+            if self.offset > os.fstat(file.fileno()).st_size:
+                raise ValueError(f"{output} is shorter than its checkpoint {self.path}; use --restart")
+            file.seek(self.offset)
+            end = self.offset
+            for line in file:
+                try:
+                    index = json.loads(line)["index"] if line.endswith(b"\n") else None
+                except (ValueError, KeyError, TypeError):
+                    index = None
+                if not isinstance(index, int):
+                    break
+                self.add(index)
+                end += len(line)
+                recovered += 1
+            file.truncate(end)
+        self.offset = end
+        return recovered
+
+def parse_line(line: str) -> Tuple[str, Optional[float]]:
+    """(location, timeout) from one input line"""
+    data = json.loads(line)
+    if isinstance(data, str):
+        data = {"location": data}
+    if not isinstance(data, dict):
+        raise ValueError("expected an object or a string")
+    location = data.get("location")
+    timeout = data.get("timeout")
+    if not isinstance(location, str) or not location.strip():
+        raise ValueError('"location" must be a non-empty string')
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ValueError('"timeout" must be a positive number')
+    return location, timeout
+
+def read_items(
+    lines: Iterable[Union[bytes, str]],
+    checkpoint: Optional[Checkpoint],
+    invalid: List[Tuple[int, str]],
+    blank: Optional[List[int]] = None
+) -> Iterator[Tuple[int, str, Optional[float]]]:
+    """
+    (index, location, timeout) for lines not done yet; bad lines go to
+    `invalid` and blank ones to `blank`
+    
+    Byte lines are decoded here, one at a time, so a line that is not UTF-8
+    fails on its own instead of ending the run.
+    """
+    for index, line in enumerate(lines):
+        if checkpoint is not None and index in checkpoint:
+            continue
+        if not line.strip():
+            if blank is not None:
+                blank.append(index)
+            continue
+        try:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            location, timeout = parse_line(line)
+        except ValueError as e:   # including UnicodeDecodeError
+            invalid.append((index, f"Invalid input line: {e}"))
+            continue
+        yield index, location, timeout
+
+class BatchWriter:
+    """Writes NDJSON results, saving the checkpoint every `checkpoint_every` lines"""
+    
+    def __init__(self, stream: TextIO, checkpoint: Optional[Checkpoint], checkpoint_every: int):
+        self.stream = stream
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.written = 0
+        self.succeeded = 0
+        self.invalid = 0
+    
+    def write(self, index: int, result: Dict[str, Any]):
+        self.stream.write(json.dumps({"index": index, **result}, ensure_ascii=False) + "\n")
+        self.stream.flush()
+        self.written += 1
+        self.succeeded += bool(result.get("success"))
+        if self.checkpoint is not None:
+            self.checkpoint.add(index)
+            if self.written % self.checkpoint_every == 0:
+                self.save()
+    
+    def skip_blank(self, blank: List[int]):
+        """Count blank lines as done, so the checkpoint watermark moves past them"""
+        while blank:
+            index = blank.pop(0)
+            if self.checkpoint is not None:
+                self.checkpoint.add(index)
+    
+    def write_invalid(self, invalid: List[Tuple[int, str]]):
+        while invalid:
+            index, error = invalid.pop(0)
+            self.invalid += 1
+            self.write(index, {**TravelOrchestrator._empty_result(None), "errors": [error]})
+    
+    def save(self):
+        if self.checkpoint is not None:
+            self.checkpoint.save(self.stream.tell())
+
+async def run_batch(
+    orchestrator: TravelOrchestrator,
+    lines: Iterable[Union[bytes, str]],
+    writer: BatchWriter,
+    concurrency: int
+):
+    # Lines are read on a worker thread: the checkpoint is only updated here, on the loop
+    invalid: List[Tuple[int, str]] = []
+    blank: List[int] = []
+    items = read_items(lines, writer.checkpoint, invalid, blank)
+    try:
+        async for index, result in orchestrator.stream_trips(items, max_concurrency=concurrency):
+            writer.skip_blank(blank)
+            writer.write_invalid(invalid)
+            writer.write(index, result)
+        writer.skip_blank(blank)
+        writer.write_invalid(invalid)
+    finally:
+        writer.save()
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help='JSONL file of locations, or "-" for stdin')
+    parser.add_argument("-o", "--output", help="NDJSON output file (default: stdout, not resumable)")
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=settings.COORDINATOR_MAX_CONCURRENCY,
+        help="Maximum number of trips planned at the same time"
+    )
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Results between checkpoint saves")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and overwrite the output")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+async def main(argv=None):
+    args = parse_args(argv)
+    if args.output is None:
+        # stdout carries the results
+        configure_logging(stream=sys.stderr)
+        setup_logger("coordinator")
+    
+    checkpoint = None
+    if args.output:
+        output = Path(args.output)
+        checkpoint_path = Path(args.checkpoint or f"{args.output}.checkpoint")
+        if args.restart:
+            checkpoint_path.unlink(missing_ok=True)
+            output.unlink(missing_ok=True)
+        checkpoint = Checkpoint.load(checkpoint_path)
+        recovered = checkpoint.recover(output)
+        if len(checkpoint):
+            logger.info("♻️ Resuming: {} line(s) already done ({} recovered from the output)", len(checkpoint), recovered)
+        stream = open(output, "a", encoding="utf-8")
+    else:
+        stream = sys.stdout
+    # Read as bytes: read_items decodes each line
+    lines = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    
+    writer = BatchWriter(stream, checkpoint, args.checkpoint_every)
+    skipped = len(checkpoint) if checkpoint else 0
+    started = time.perf_counter()
+    try:
+        await run_batch(TravelOrchestrator(), lines, writer, args.concurrency)
+    finally:
+        elapsed = time.perf_counter() - started
+        if stream is not sys.stdout:
+            stream.close()
+        if lines is not sys.stdin.buffer:
+            lines.close()
+        await close_transport()
+        logger.info(
+            "📊 Batch: {} trip(s) in {:.1f}s ({:.2f}/s): {} succeeded, {} failed, {} invalid line(s), {} skipped from checkpoint",
+            writer.written, elapsed, writer.written / elapsed if elapsed else 0.0,
+            writer.succeeded, writer.written - writer.succeeded - writer.invalid, writer.invalid, skipped
+        )
+        flush_logs()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("\n🛑 Batch stopped by user; rerun the same command to resume")
@@ -9,17 +9,34 @@ COORDINATOR_CONFIG = {
     "agents": {
         "weather": {
             "url": settings.WEATHER_AGENT_URL,
+            "urls": settings.WEATHER_AGENT_URLS,
             "endpoint": "/a2a"
         },
         "planning": {
             "url": settings.PLANNING_AGENT_URL,
+            "urls": settings.PLANNING_AGENT_URLS,
             "endpoint": "/a2a"
         }
     },
+    "load_balancing": {
+        "strategy": settings.AGENT_LB_STRATEGY,
+        "eject_after": settings.AGENT_EJECT_AFTER,
+        "eject_seconds": settings.AGENT_EJECT_SECONDS,
+        "hedge": settings.AGENT_HEDGE_ENABLED,
+        "hedge_percentile": settings.AGENT_HEDGE_PERCENTILE
+    },
     "retry_config": {
         "max_retries": 3,
         "base_delay": 1.0,
-        "max_delay": 10.0
+        "max_delay": 10.0,
+        "jitter": True,
+        "budget_ratio": 0.2,      # retries allowed per request over a 10 s window
+        "budget_min_retries": 10
+    },
+    "circuit_breaker": {
+        "failure_threshold": 5,
+        "reset_timeout": 30.0     # seconds open before a trial call
     },
-    "timeout": 30.0  # seconds
+    "timeout": 30.0,  # seconds, per trip
+    "weather_timeout_share": 0.3  # part of the trip deadline given to the weather step
 }
@@ -1,102 +1,754 @@
-from python_a2a import A2AClient, Message, TextContent, MessageRole
-from typing import Dict, Any, List
-from shared.logger import setup_logger
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
+from datetime import date
+from python_a2a import Message, Metadata, Task, TextContent, MessageRole
+from python_a2a.exceptions import A2AConnectionError, A2AResponseError
+from typing import Dict, Any, Iterable, List, AsyncIterator, Callable, Optional, Sequence, Tuple
+from agents.coordinator.balancer import ReplicaPool
+from agents.coordinator.config import COORDINATOR_CONFIG
+from shared import metrics
+from shared.logger import LogSampler, setup_logger
+from shared.payloads import (
+    METADATA_KEY, ActivityPlan, Forecast, ForecastRequest, PayloadError, PlanningRequest,
+    WeatherBatch, WeatherReport, WeatherRequest
+)
+from shared.resilience import CircuitBreaker, Deadline, RetryBudget
 from shared.utils import retry_async
+from shared.weather import weather_signature
 from config.setting import settings
 
 logger = setup_logger("coordinator")
+request_logs = LogSampler(logger)
+
+# Transport failures worth retrying; agent-reported errors are not
+RETRYABLE_ERRORS = (OSError, A2AConnectionError, A2AResponseError)
+
+STEP_LATENCY = metrics.histogram(
+    "coordinator_step_duration_seconds", "Agent call duration per orchestration step, retries included", ["step"]
+)
+STEP_RETRIES = metrics.counter("coordinator_step_retries_total", "Agent calls retried per orchestration step", ["step"])
+TRIP_LATENCY = metrics.histogram("coordinator_trip_duration_seconds", "End-to-end plan_trip duration")
+TRIPS = metrics.counter("coordinator_trips_total", "Planned trips by outcome", ["outcome"])
+TRIPS_IN_FLIGHT = metrics.gauge("coordinator_trips_in_flight", "Trips currently being planned")
+ITINERARY_LATENCY = metrics.histogram("coordinator_itinerary_duration_seconds", "End-to-end plan_itinerary duration")
+ITINERARY_GROUPS = metrics.histogram(
+    "coordinator_itinerary_planning_calls", "Planning calls per itinerary (days with distinct weather)",
+    buckets=(1, 2, 3, 4, 5, 7, 10, 14)
+)
+
+class AgentError(RuntimeError):
+    """An agent answered with an error"""
+
+def concurrency_limit(max_concurrency: Optional[int]) -> int:
+    """max_concurrency, or COORDINATOR_MAX_CONCURRENCY when it is None; below 1 is an error"""
+    limit = settings.COORDINATOR_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+    if limit < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {limit}")
+    return limit
 
 class TravelOrchestrator:
     """Orchestrates travel planning workflow"""
     
-    def __init__(self):
-        # Initialize A2A clients for agents
-        self.weather_client = A2AClient(f"{settings.WEATHER_AGENT_URL}/a2a")
-        self.planning_client = A2AClient(f"{settings.PLANNING_AGENT_URL}/a2a")
+    def __init__(
+        self,
+        weather_urls: Optional[Sequence[str]] = None,
+        planning_urls: Optional[Sequence[str]] = None
+    ):
+        # A2A clients for every agent replica
+        weather_urls = weather_urls or settings.WEATHER_AGENT_URLS
+        planning_urls = planning_urls or settings.PLANNING_AGENT_URLS
+        self.weather_pool = self._create_pool(weather_urls)
+        self.planning_pool = self._create_pool(planning_urls)
+        
+        # Per-trip deadline, circuit breakers per agent, shared retry budget
+        self.timeout = COORDINATOR_CONFIG["timeout"]
+        self.weather_timeout_share = COORDINATOR_CONFIG["weather_timeout_share"]
+        self.retry_config = COORDINATOR_CONFIG["retry_config"]
+        self.retryable_errors = RETRYABLE_ERRORS
+        breaker_config = COORDINATOR_CONFIG["circuit_breaker"]
+        self.weather_breaker = CircuitBreaker("weather", **breaker_config)
+        self.planning_breaker = CircuitBreaker("planning", **breaker_config)
+        self.retry_budget = RetryBudget(
+            ratio=self.retry_config["budget_ratio"],
+            min_retries=self.retry_config["budget_min_retries"]
+        )
         
         logger.info("✅ Orchestrator initialized")
-        logger.info(f"   Weather Agent: {settings.WEATHER_AGENT_URL}")
-        logger.info(f"   Planning Agent: {settings.PLANNING_AGENT_URL}")
+        logger.info("   Weather Agent: {}", ", ".join(weather_urls))
+        logger.info("   Planning Agent: {}", ", ".join(planning_urls))
+    
+    @staticmethod
+    def _create_pool(urls: Sequence[str]) -> ReplicaPool:
+        return ReplicaPool(
+            urls,
+            strategy=settings.AGENT_LB_STRATEGY,
+            eject_after=settings.AGENT_EJECT_AFTER,
+            eject_seconds=settings.AGENT_EJECT_SECONDS,
+            hedge=settings.AGENT_HEDGE_ENABLED,
+            hedge_percentile=settings.AGENT_HEDGE_PERCENTILE
+        )
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Per-replica load, latency and health for both agents"""
+        return {
+            "weather": self.weather_pool.stats(),
+            "planning": self.planning_pool.stats()
+        }
     
-    async def plan_trip(self, location: str) -> Dict[str, Any]:
+    def resilience_stats(self) -> Dict[str, Any]:
+        """Circuit breaker states and retry budget usage"""
+        return {
+            "weather": self.weather_breaker.stats(),
+            "planning": self.planning_breaker.stats(),
+            "retry_budget": self.retry_budget.stats()
+        }
+    
+    async def plan_trip(
+        self,
+        location: str,
+        timeout: Optional[float] = None,
+        weather: Optional[Tuple[str, Optional[WeatherReport]]] = None
+    ) -> Dict[str, Any]:
         """
         Main orchestration workflow:
         1. Get weather from Weather Agent
         2. Get activity suggestions from Planning Agent
         3. Combine results
+        
+        The whole trip must finish within `timeout` seconds (default:
+        COORDINATOR_CONFIG["timeout"]); the weather step gets its share of
+        it and planning gets the rest. `weather` is (text, report) already
+        fetched in bulk, which skips step 1.
+        
+        "weather" and "activities" are display text; "weather_report" and
+        "activity_plan" hold the structured payloads when the agents sent them.
         """
+        deadline = Deadline(timeout or self.timeout)
+        log = request_logs.for_request()
         
-        logger.info("=" * 60)
-        logger.info(f"🚀 Starting trip planning for: {location}")
-        logger.info("=" * 60)
+        log.info("=" * 60)
+        log.info("🚀 Starting trip planning for: {}", location)
+        log.info("=" * 60)
         
-        result = {
-            "location": location,
-            "weather": None,
-            "activities": None,
-            "success": False,
-            "errors": []
-        }
+        result = self._empty_result(location)
+        started = time.perf_counter()
+        TRIPS_IN_FLIGHT.inc()
         
         try:
             # Step 1: Get Weather
-            logger.info(f"\n📍 STEP 1: Querying Weather Agent...")
-            weather_info = await self._get_weather(location)
+            if weather is not None:
+                log.info("\n📍 STEP 1: Weather fetched in bulk")
+                weather_info, report = weather
+            else:
+                log.info("\n📍 STEP 1: Querying Weather Agent...")
+                weather_info, report = await self._get_weather(location, deadline.share(self.weather_timeout_share))
             result["weather"] = weather_info
-            logger.info(f"   ✅ Weather: {weather_info}")
+            result["weather_report"] = report.to_dict() if report else None
+            log.opt(lazy=True).info("   ✅ Weather: {}", lambda: report.to_text() if report else weather_info)
             
             # Step 2: Get Activity Suggestions
-            logger.info(f"\n📍 STEP 2: Querying Planning Agent...")
-            activities = await self._get_activities(location, weather_info)
+            log.info("\n📍 STEP 2: Querying Planning Agent...")
+            activities, plan = await self._get_activities(location, weather_info, report, deadline)
             result["activities"] = activities
-            logger.info(f"   ✅ Activities: {len(activities.split('🎯')) - 1} suggestions")
+            result["activity_plan"] = plan.to_dict() if plan else None
+            log.opt(lazy=True).info(
+                "   ✅ Activities: {} suggestions",
+                lambda: plan.count if plan else len(activities.split('🎯')) - 1
+            )
             
             result["success"] = True
-            logger.info(f"\n✅ Trip planning completed successfully!")
+            log.info("\n✅ Trip planning completed successfully!")
             
         except Exception as e:
             error_msg = f"Error in orchestration: {e}"
             logger.error(f"❌ {error_msg}")
             result["errors"].append(error_msg)
+        finally:
+            TRIPS_IN_FLIGHT.dec()
         
+        TRIP_LATENCY.observe(time.perf_counter() - started)
+        TRIPS.labels("success" if result["success"] else "failure").inc()
         return result
     
-    async def _get_weather(self, location: str) -> str:
-        """Get weather from Weather Agent with retry"""
+    async def plan_itinerary(
+        self,
+        location: str,
+        days: int,
+        start: Optional[date] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Multi-day workflow:
+        1. Get the daily forecast for the whole date range in one Weather Agent call
+        2. Group days with equivalent weather (shared.weather.weather_signature, as the planning cache does)
+        3. Plan every group once, all groups concurrently, asking for
+           COORDINATOR_ACTIVITIES_PER_DAY activities per day of the group
+        4. Spread each group's activities over its days, day by day
+        
+        Latency is one forecast call plus the slowest planning call, not one
+        trip per day. Days past the forecast horizon share one group with
+        unknown weather; agents without forecast support get the current
+        weather for every day. A failed group only fails its own days.
+        
+        "itinerary" holds one entry per day with "weather"/"activities"
+        display text and the structured "weather_report"/"activity_plan".
+        """
+        if not 1 <= days <= settings.COORDINATOR_MAX_TRIP_DAYS:
+            raise ValueError(f"days must be between 1 and {settings.COORDINATOR_MAX_TRIP_DAYS}")
+        start = start or date.today()
+        deadline = Deadline(timeout or self.timeout)
+        log = request_logs.for_request()
+        log.info("🚀 Planning a {}-day itinerary for {} from {}", days, location, start.isoformat())
+        
+        result = {
+            "location": location,
+            "start": start.isoformat(),
+            "days": days,
+            "forecast": None,
+            "planning_calls": 0,
+            "itinerary": [],
+            "success": False,
+            "errors": []
+        }
+        started = time.perf_counter()
+        TRIPS_IN_FLIGHT.inc()
         
-        async def fetch():
-            message = Message(
-                content=TextContent(text=location),
-                role=MessageRole.USER
+        try:
+            # Step 1: one forecast for the whole range
+            forecast = await self._get_forecast(location, start, days, deadline.share(self.weather_timeout_share))
+            if forecast is not None:
+                reports: List[Optional[WeatherReport]] = list(forecast.days[:days])
+                result["forecast"] = forecast.to_dict()
+            else:
+                _, report = await self._get_weather(location, deadline.share(self.weather_timeout_share))
+                reports = [report] * days
+            reports += [None] * (days - len(reports))
+            
+            # Step 2: days with equivalent weather share a planning call
+            groups: Dict[str, List[int]] = {}
+            for offset, report in enumerate(reports):
+                signature = weather_signature(report.to_text()) if report else "unknown"
+                groups.setdefault(signature, []).append(offset)
+            result["planning_calls"] = len(groups)
+            ITINERARY_GROUPS.observe(len(groups))
+            log.info("   📅 {} day(s), {} distinct weather group(s)", days, len(groups))
+            
+            # Step 3: plan the groups concurrently
+            async def plan_group(offsets: List[int]) -> Tuple[str, Optional[ActivityPlan]]:
+                report = reports[offsets[0]]
+                return await self._get_activities(
+                    location,
+                    report.to_text() if report else "Unknown weather conditions",
+                    report,
+                    deadline,
+                    activity_count=min(10, settings.COORDINATOR_ACTIVITIES_PER_DAY * len(offsets)),
+                    additional_context=(
+                        f"These activities cover {len(offsets)} days with this weather; do not repeat activities."
+                        if len(offsets) > 1 else None
+                    )
+                )
+            
+            plans = await asyncio.gather(*(plan_group(offsets) for offsets in groups.values()), return_exceptions=True)
+            
+            # Step 4: merge day by day
+            itinerary: List[Optional[Dict[str, Any]]] = [None] * days
+            for offsets, planned in zip(groups.values(), plans):
+                for position, offset in enumerate(offsets):
+                    itinerary[offset] = self._itinerary_day(
+                        location, start, offset, reports[offset], planned, position, len(offsets)
+                    )
+            result["itinerary"] = itinerary
+            failed = [day for day in itinerary if day["error"]]
+            result["errors"] = [f"Day {day['day']}: {day['error']}" for day in failed]
+            result["success"] = not failed
+            log.info("\n✅ Itinerary planned: {}/{} day(s)", days - len(failed), days)
+            
+        except Exception as e:
+            error_msg = f"Error in orchestration: {e}"
+            logger.error(f"❌ {error_msg}")
+            result["errors"].append(error_msg)
+        finally:
+            TRIPS_IN_FLIGHT.dec()
+        
+        ITINERARY_LATENCY.observe(time.perf_counter() - started)
+        TRIPS.labels("success" if result["success"] else "failure").inc()
+        return result
+    
+    @staticmethod
+    def _itinerary_day(
+        location: str,
+        start: date,
+        offset: int,
+        report: Optional[WeatherReport],
+        planned: Any,
+        position: int,
+        group_size: int
+    ) -> Dict[str, Any]:
+        """One itinerary day: the `position`-th share of its group's activities"""
+        day = {
+            "day": offset + 1,
+            "date": date.fromordinal(start.toordinal() + offset).isoformat(),
+            "weather": report.to_display_text() if report else "Unknown weather conditions",
+            "weather_report": report.to_dict() if report else None,
+            "activities": None,
+            "activity_plan": None,
+            "error": None
+        }
+        if isinstance(planned, BaseException):
+            day["error"] = str(planned) or type(planned).__name__
+            return day
+        
+        text, plan = planned
+        if plan is None or not plan.activities:
+            # Unstructured answer: every day of the group gets the whole text
+            day["activities"] = text
+            return day
+        activities = plan.activities[position::group_size] or plan.activities[:1]
+        day["activity_plan"] = ActivityPlan(location=plan.location, activities=activities, cached=plan.cached).to_dict()
+        day["activities"] = "\n\n".join(
+            f"{activity.get('title', '')}\n{activity.get('description', '').strip()}".strip() for activity in activities
+        )
+        return day
+    
+    async def plan_trip_stream(self, location: str, timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of plan_trip.
+        
+        Yields events as soon as they are available:
+        - {"type": "weather", "location", "weather"}
+        - {"type": "activity", "location", "index", "activity"} per activity
+        - {"type": "text", "location", "text"} if the agent could not stream
+        - {"type": "done", "location", "success", "count", "errors"} last
+        """
+        
+        log = request_logs.for_request()
+        log.info("🚀 Streaming trip planning for: {}", location)
+        deadline = Deadline(timeout or self.timeout)
+        started = time.perf_counter()
+        count = 0
+        errors = []
+        
+        try:
+            weather_info, report = await self._get_weather(location, deadline.share(self.weather_timeout_share))
+            yield {
+                "type": "weather",
+                "location": location,
+                "weather": weather_info,
+                "weather_report": report.to_dict() if report else None
+            }
+            
+            message = self._planning_message(location, weather_info, report, deadline)
+            async with self.planning_breaker.guard(), self.planning_pool.acquire(record_latency=False) as replica:
+                stream = replica.client.stream_response(message)
+                try:
+                    while True:
+                        try:
+                            chunk = await deadline.run(stream.__anext__())
+                        except StopAsyncIteration:
+                            break
+                        
+                        event = self._parse_stream_chunk(chunk)
+                        if event is None:
+                            # Agent fell back to a single non-streamed reply
+                            yield {"type": "text", "location": location, "text": str(chunk)}
+                        elif event.get("type") == "error":
+                            raise AgentError(event.get("error", "agent error"))
+                        elif event.get("type") == "activity":
+                            count += 1
+                            if count == 1:
+                                log.info("   ⏱️ First activity after {:.2f}s", time.perf_counter() - started)
+                            yield {
+                                "type": "activity",
+                                "location": location,
+                                "index": count,
+                                "activity": event["activity"]
+                            }
+                finally:
+                    await stream.aclose()
+                    
+        except Exception as e:
+            error_msg = f"Error in orchestration: {e}"
+            logger.error(f"❌ {error_msg}")
+            errors.append(error_msg)
+        
+        yield {
+            "type": "done",
+            "location": location,
+            "success": not errors,
+            "count": count,
+            "errors": errors
+        }
+    
+    @staticmethod
+    def _parse_stream_chunk(chunk: Any) -> Optional[Dict[str, Any]]:
+        """Decode one JSON event from the Planning Agent stream"""
+        if isinstance(chunk, dict):
+            return chunk
+        try:
+            event = json.loads(chunk)
+        except (TypeError, ValueError):
+            return None
+        return event if isinstance(event, dict) else None
+    
+    async def plan_trips(
+        self,
+        locations: List[str],
+        max_concurrency: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Plan trips for several locations concurrently.
+        
+        Returns one result per location, in the same order as `locations`.
+        A failing location never affects the others.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(locations)
+        async for index, result in self._plan_trips_indexed(locations, max_concurrency):
+            results[index] = result
+        return results
+    
+    async def iter_trips(
+        self,
+        locations: List[str],
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Plan trips concurrently, yielding each result as soon as it finishes"""
+        async for _, result in self._plan_trips_indexed(locations, max_concurrency):
+            yield result
+    
+    async def _plan_trips_indexed(
+        self,
+        locations: List[str],
+        max_concurrency: Optional[int]
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Fan out plan_trip with bounded concurrency, yielding (index, result) pairs
+        
+        Runs through stream_trips, so with COORDINATOR_BULK_WEATHER the first
+        trips start as soon as the first chunk's bulk weather is in, while
+        the next chunk's is fetched; locations missing from the bulk answers
+        query the Weather Agent on their own.
+        """
+        items = ((index, location, None) for index, location in enumerate(locations))
+        async for index, result in self.stream_trips(items, max_concurrency):
+            yield index, result
+    
+    async def stream_trips(
+        self,
+        items: Iterable[Tuple[Any, str, Optional[float]]],
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Plan (key, location, timeout) items from an iterable of any length,
+        yielding (key, result) as each trip finishes.
+        
+        Items are pulled lazily, one chunk at a time and in a worker thread
+        (so `items` may block, e.g. reading a file): at most
+        `max_concurrency` trips run at once, and with COORDINATOR_BULK_WEATHER
+        the next WEATHER_BULK_MAX_LOCATIONS items are read ahead so their
+        weather is fetched in bulk while the current chunk is planned.
+        Memory stays bounded by two chunks whatever the input size.
+        """
+        limit = concurrency_limit(max_concurrency)
+        bulk = settings.COORDINATOR_BULK_WEATHER
+        chunk_size = max(limit, settings.WEATHER_BULK_MAX_LOCATIONS if bulk else limit)
+        items = iter(items)
+        
+        async def read_chunk() -> Tuple[List[Tuple[Any, str, Optional[float]]], Dict[str, Tuple[str, WeatherReport]]]:
+            # Pulling items may block on I/O (a file, stdin): keep it off the loop
+            chunk = await asyncio.to_thread(list, itertools.islice(items, chunk_size))
+            locations = [location for _, location, _ in chunk]
+            weather = await self.get_weather_many(locations) if bulk and len(set(locations)) > 1 else {}
+            return chunk, weather
+        
+        async def run(key: Any, location: str, timeout: Optional[float], weather) -> Tuple[Any, Dict[str, Any]]:
+            return key, await self._plan_trip_isolated(location, weather, timeout)
+        
+        next_chunk: Optional[asyncio.Task] = asyncio.create_task(read_chunk())
+        buffer: deque = deque()
+        weather: Dict[str, Tuple[str, WeatherReport]] = {}
+        running = set()
+        try:
+            while True:
+                if not buffer and next_chunk is not None and next_chunk.done():
+                    chunk, weather = next_chunk.result()
+                    buffer.extend(chunk)
+                    next_chunk = asyncio.create_task(read_chunk()) if len(chunk) == chunk_size else None
+                while buffer and len(running) < limit:
+                    key, location, timeout = buffer.popleft()
+                    running.add(asyncio.create_task(run(key, location, timeout, weather.get(location))))
+                
+                waiting = set(running)
+                if not buffer and next_chunk is not None:
+                    waiting.add(next_chunk)
+                if not waiting:
+                    return
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is not next_chunk:
+                        running.discard(task)
+                        yield task.result()
+        finally:
+            # Stop outstanding work if the consumer stops iterating early
+            for task in running:
+                task.cancel()
+            if next_chunk is not None:
+                next_chunk.cancel()
+    
+    async def get_weather_many(
+        self,
+        locations: Sequence[str],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Tuple[str, WeatherReport]]:
+        """
+        Weather for many locations in a few Weather Agent calls: one bulk
+        request per WEATHER_BULK_MAX_LOCATIONS locations, sent concurrently
+        within the weather share of `timeout`.
+        
+        Returns {location: (display text, report)} for the locations that
+        were answered; failed requests and per-location errors are left out
+        (and logged), as are all locations if the agent does not support
+        bulk requests.
+        """
+        unique = list(dict.fromkeys(locations))
+        size = settings.WEATHER_BULK_MAX_LOCATIONS
+        chunks = [unique[i:i + size] for i in range(0, len(unique), size)]
+        deadline = Deadline(timeout or self.timeout).share(self.weather_timeout_share)
+        
+        async def fetch(chunk: List[str]) -> WeatherBatch:
+            request = WeatherRequest(locations=chunk)
+            _, data = await self._call_agent(
+                "weather_bulk",
+                self.weather_pool,
+                self.weather_breaker,
+                deadline,
+                lambda: Message(
+                    content=TextContent(text=request.to_text()),
+                    role=MessageRole.USER,
+                    metadata=Metadata(custom_fields={METADATA_KEY: request.to_dict()})
+                )
+            )
+            # Agents without bulk support answer with a single report
+            return WeatherBatch.from_dict(data)
+        
+        weather = {}
+        batches = await asyncio.gather(*(fetch(chunk) for chunk in chunks), return_exceptions=True)
+        for chunk, batch in zip(chunks, batches):
+            if isinstance(batch, BaseException):
+                logger.warning(f"⚠️ Bulk weather request for {len(chunk)} location(s) failed: {batch}")
+                continue
+            for location, report in batch.reports.items():
+                weather[location] = (report.to_display_text(), report)
+            if batch.errors:
+                logger.warning(f"⚠️ No bulk weather for {len(batch.errors)} location(s): {batch.errors}")
+        logger.info("🌤️ Bulk weather: {}/{} location(s) in {} request(s)", len(weather), len(unique), len(chunks))
+        return weather
+    
+    async def _plan_trip_isolated(
+        self,
+        location: str,
+        weather: Optional[Tuple[str, Optional[WeatherReport]]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Run plan_trip, turning any unexpected error into a failed result"""
+        try:
+            return await self.plan_trip(location, timeout=timeout, weather=weather)
+        except Exception as e:
+            error_msg = f"Error in orchestration: {e}"
+            logger.error(f"❌ {location}: {error_msg}")
+            result = self._empty_result(location)
+            result["errors"].append(error_msg)
+            return result
+    
+    @staticmethod
+    def _empty_result(location: str) -> Dict[str, Any]:
+        return {
+            "location": location,
+            "weather": None,
+            "weather_report": None,
+            "activities": None,
+            "activity_plan": None,
+            "success": False,
+            "errors": []
+        }
+    
+    @staticmethod
+    def _read_task(task: Task) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Return (text, structured data) from a task's artifact parts"""
+        text, data = "", None
+        for artifact in task.artifacts or []:
+            for part in artifact.get("parts", []):
+                if part.get("type") == "text":
+                    text = part.get("text", "")
+                elif part.get("type") == "data":
+                    data = part.get("data")
+                elif part.get("type") == "error":
+                    raise AgentError(part.get("message", "agent error"))
+        return text, data
+    
+    @staticmethod
+    def _planning_message(
+        location: str,
+        weather_info: str,
+        report: Optional[WeatherReport],
+        deadline: Optional[Deadline] = None,
+        activity_count: Optional[int] = None,
+        additional_context: Optional[str] = None
+    ) -> Message:
+        """Planning request as a structured payload, with the legacy text as fallback"""
+        request = PlanningRequest(
+            location=location,
+            weather=report,
+            weather_text=None if report else weather_info,
+            additional_context=additional_context,
+            activity_count=activity_count
+        )
+        custom_fields = {METADATA_KEY: request.to_dict()}
+        if deadline:
+            custom_fields.update(deadline.to_metadata())
+        return Message(
+            content=TextContent(text=request.to_text()),
+            role=MessageRole.USER,
+            metadata=Metadata(custom_fields=custom_fields)
+        )
+    
+    async def _call_agent(
+        self,
+        step: str,
+        pool: ReplicaPool,
+        breaker: CircuitBreaker,
+        deadline: Deadline,
+        build_message: Callable[[], Message]
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Send a task through the agent's circuit breaker and replica pool,
+        retrying transport errors with jittered backoff within the deadline
+        and the retry budget. Each attempt carries the remaining time.
+        Durations and retries are recorded under `step`.
+        """
+        attempts = 0
+        
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                STEP_RETRIES.labels(step).inc()
+            message = build_message()
+            message.metadata = message.metadata or Metadata()
+            message.metadata.custom_fields.update(deadline.to_metadata())
+            # The deadline is the caller's budget, applied outside the breaker:
+            # running out of it cancels the call rather than failing the agent
+            task = await deadline.run(breaker.call(lambda: pool.call(
+                lambda replica: replica.client.send_task_async(Task(message=message.to_dict()))
+            )))
+            return self._read_task(task)
+        
+        with STEP_LATENCY.labels(step).time():
+            return await retry_async(
+                attempt,
+                max_retries=self.retry_config["max_retries"],
+                delay=self.retry_config["base_delay"],
+                max_delay=self.retry_config["max_delay"],
+                jitter=self.retry_config["jitter"],
+                retry_on=self.retryable_errors,
+                deadline=deadline,
+                budget=self.retry_budget
             )
-            response = await self.weather_client.send_message_async(message)
-            return response.content.text
+    
+    async def _get_weather(
+        self,
+        location: str,
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[str, Optional[WeatherReport]]:
+        """Get weather from Weather Agent with retry"""
         
         try:
-            return await retry_async(fetch, max_retries=3)
+            text, data = await self._call_agent(
+                "weather",
+                self.weather_pool,
+                self.weather_breaker,
+                deadline or Deadline(self.timeout),
+                lambda: Message(content=TextContent(text=location), role=MessageRole.USER)
+            )
         except Exception as e:
             logger.error(f"Failed to get weather after retries: {e}")
             raise
-    
-    async def _get_activities(self, location: str, weather_info: str) -> str:
-        """Get activities from Planning Agent with retry"""
         
-        async def fetch():
-            # Format message for planning agent
-            planning_query = f"Plan for {location} with weather: {weather_info}"
-            
-            message = Message(
-                content=TextContent(text=planning_query),
-                role=MessageRole.USER
+        report = None
+        if data is not None:
+            try:
+                report = WeatherReport.from_dict(data)
+            except (PayloadError, KeyError) as e:
+                logger.warning(f"⚠️ Ignoring invalid weather payload: {e}")
+        return text, report
+    
+    async def _get_forecast(
+        self,
+        location: str,
+        start: date,
+        days: int,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[Forecast]:
+        """Daily forecast from the Weather Agent, or None if it does not support forecasts"""
+        request = ForecastRequest(location=location, start=start.isoformat(), days=days)
+        try:
+            _, data = await self._call_agent(
+                "forecast",
+                self.weather_pool,
+                self.weather_breaker,
+                deadline or Deadline(self.timeout),
+                lambda: Message(
+                    content=TextContent(text=request.to_text()),
+                    role=MessageRole.USER,
+                    metadata=Metadata(custom_fields={METADATA_KEY: request.to_dict()})
+                )
             )
-            response = await self.planning_client.send_message_async(message)
-            return response.content.text
+        except Exception as e:
+            logger.error(f"Failed to get forecast after retries: {e}")
+            raise
         
         try:
-            return await retry_async(fetch, max_retries=3)
+            return Forecast.from_dict(data)
+        except (PayloadError, KeyError) as e:
+            logger.warning(f"⚠️ No forecast from the Weather Agent, using current weather for every day: {e}")
+            return None
+    
+    async def _get_activities(
+        self,
+        location: str,
+        weather_info: str,
+        report: Optional[WeatherReport] = None,
+        deadline: Optional[Deadline] = None,
+        activity_count: Optional[int] = None,
+        additional_context: Optional[str] = None
+    ) -> Tuple[str, Optional[ActivityPlan]]:
+        """Get activities from Planning Agent with retry"""
+        
+        try:
+            text, data = await self._call_agent(
+                "planning",
+                self.planning_pool,
+                self.planning_breaker,
+                deadline or Deadline(self.timeout),
+                lambda: self._planning_message(
+                    location, weather_info, report,
+                    activity_count=activity_count,
+                    additional_context=additional_context
+                )
+            )
         except Exception as e:
             logger.error(f"Failed to get activities after retries: {e}")
             raise
+        
+        plan = None
+        if data is not None:
+            try:
+                plan = ActivityPlan.from_dict(data)
+            except (PayloadError, KeyError) as e:
+                logger.warning(f"⚠️ Ignoring invalid activity payload: {e}")
+        return text, plan
     
     def format_result(self, result: Dict[str, Any]) -> str:
         """Format result for display"""
@@ -118,3 +770,20 @@ class TravelOrchestrator:
 {'=' * 60}
         """
         return output.strip()
+    
+    def format_itinerary(self, result: Dict[str, Any]) -> str:
+        """Format a plan_itinerary result for display, day by day"""
+        
+        if not result["itinerary"]:
+            return f"❌ Failed to plan itinerary: {', '.join(result['errors'])}"
+        
+        lines = [
+            "=" * 60,
+            f"🗓️ {result['days']}-DAY ITINERARY: {result['location']}",
+            "=" * 60
+        ]
+        for day in result["itinerary"]:
+            lines += ["", f"📅 Day {day['day']} ({day['date']})", day["weather"], ""]
+            lines.append(day["activities"] if not day["error"] else f"❌ Failed to plan this day: {day['error']}")
+        lines += ["", "=" * 60]
+        return "\n".join(lines)
@@ -0,0 +1,160 @@
+"""
+Coordinator as a long-lived HTTP service on COORDINATOR_PORT.
+
+One TravelOrchestrator (agent clients, replica pools, circuit breakers and
+retry budget) is shared by every request. POST /plan goes through an
+AdmissionController: COORDINATOR_MAX_IN_FLIGHT trips are planned at once,
+COORDINATOR_MAX_QUEUE more wait for a slot, and anything beyond that, or
+expected to wait longer than COORDINATOR_QUEUE_TIMEOUT, gets 429 with
+Retry-After straight away.
+
+    uv run python -m agents.coordinator.service
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from agents.coordinator.orchestrator import TravelOrchestrator
+from shared import metrics
+from shared.a2a_client import close_transport, transport_stats
+from shared.logger import setup_logger
+from shared.resilience import AdmissionController, Overloaded
+from config.setting import settings
+
+logger = setup_logger("coordinator")
+
+QUEUE_WAIT = metrics.histogram(
+    "coordinator_queue_wait_seconds", "Time /plan requests waited for an admission slot",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+REJECTED = metrics.counter("coordinator_rejected_total", "/plan requests shed with 429 by reason", ["reason"])
+
+def create_admission() -> AdmissionController:
+    return AdmissionController(
+        max_in_flight=settings.COORDINATOR_MAX_IN_FLIGHT,
+        max_queue=settings.COORDINATOR_MAX_QUEUE,
+        max_wait=settings.COORDINATOR_QUEUE_TIMEOUT
+    )
+
+def create_app(
+    orchestrator: Optional[TravelOrchestrator] = None,
+    admission: Optional[AdmissionController] = None
+) -> FastAPI:
+    """
+    Build the coordinator service around one shared orchestrator.
+    
+    POST /plan takes {"location": str, "timeout": seconds (optional)} and
+    returns the plan_trip result, or the plan_itinerary result when "days"
+    (and optionally "start") are given; time spent queued counts against
+    the timeout. 429 with Retry-After when admission control sheds the request,
+    502 when planning failed, 504 when the deadline passed in the queue.
+    """
+    orchestrator = orchestrator or TravelOrchestrator()
+    admission = admission or create_admission()
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Plain python_a2a clients (A2A_POOLED_TRANSPORT=false) block an
+        # executor thread per agent call: give every admitted trip room for
+        # its calls so the executor does not become a hidden queue behind
+        # admission control
+        workers = admission.max_in_flight * 2
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers))
+        yield
+        await close_transport()
+    
+    app = FastAPI(title="Travel Coordinator", docs_url=None, redoc_url=None, lifespan=lifespan)
+    
+    metrics.callback(
+        "coordinator_queue_depth", "gauge", "/plan requests waiting for an admission slot",
+        lambda: admission.queued
+    )
+    metrics.callback(
+        "coordinator_requests_in_flight", "gauge", "/plan requests holding an admission slot",
+        lambda: admission.in_flight
+    )
+    
+    @app.post("/plan")
+    async def plan(request: Request):
+        try:
+            data = await request.json()
+            location = data["location"]
+            timeout = float(data.get("timeout") or orchestrator.timeout)
+            days = data.get("days")
+            start = date.fromisoformat(data["start"]) if data.get("start") else None
+            if not isinstance(location, str) or not location.strip() or timeout <= 0:
+                raise ValueError
+            if days is not None and (
+                not isinstance(days, int) or isinstance(days, bool) or not 1 <= days <= settings.COORDINATOR_MAX_TRIP_DAYS
+            ):
+                raise ValueError
+        except Exception:
+            return JSONResponse(
+                {"error": (
+                    'Expected {"location": str, "timeout": seconds (optional), '
+                    f'"days": 1-{settings.COORDINATOR_MAX_TRIP_DAYS} (optional), "start": "YYYY-MM-DD" (optional)}}'
+                )},
+                status_code=400
+            )
+        
+        try:
+            async with admission.slot() as waited:
+                QUEUE_WAIT.observe(waited)
+                remaining = timeout - waited
+                if remaining <= 0:
+                    return JSONResponse(
+                        {"location": location, "success": False, "errors": ["Deadline exceeded while queued"]},
+                        status_code=504
+                    )
+                if days:
+                    result = await orchestrator.plan_itinerary(location, days, start=start, timeout=remaining)
+                else:
+                    result = await orchestrator.plan_trip(location, timeout=remaining)
+        except Overloaded as e:
+            REJECTED.labels(e.reason).inc()
+            logger.debug("🚦 Shedding /plan for {}: {}", location, e)
+            return JSONResponse(
+                {"error": str(e)}, status_code=429, headers={"Retry-After": str(e.retry_after)}
+            )
+        
+        headers = {"X-Queue-Wait": f"{waited:.3f}"}
+        return JSONResponse(result, status_code=200 if result["success"] else 502, headers=headers)
+    
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+    
+    @app.get("/stats")
+    async def stats():
+        return {
+            "admission": admission.stats(),
+            "pools": orchestrator.pool_stats(),
+            "transport": transport_stats(),
+            "resilience": orchestrator.resilience_stats()
+        }
+    
+    @app.get("/metrics")
+    async def get_metrics():
+        return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+    
+    return app
+
+if __name__ == "__main__":
+    logger.info("=" * 60)
+    logger.info("🎯 TRAVEL COORDINATOR SERVICE STARTING")
+    logger.info(f"🔌 Port: {settings.COORDINATOR_PORT}")
+    logger.info(
+        f"🚦 Admission: {settings.COORDINATOR_MAX_IN_FLIGHT} in flight, "
+        f"{settings.COORDINATOR_MAX_QUEUE} queued, {settings.COORDINATOR_QUEUE_TIMEOUT:g}s max wait"
+    )
+    logger.info("=" * 60)
+    
+    try:
+        uvicorn.run(create_app(), host="0.0.0.0", port=settings.COORDINATOR_PORT, log_level="warning")
+    except KeyboardInterrupt:
+        logger.info("\n🛑 Coordinator service stopped by user")
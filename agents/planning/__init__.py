@@ -1,8 +1,15 @@
 """Planning Agent Module"""
 
-from .agent import planning_agent
-from .handlers import PlanningHandler
-from .gemini_client import GeminiClient
-from .config import AGENT_CARD
+from shared.lazy import lazy_exports
 
-__all__ = ["planning_agent", "PlanningHandler", "GeminiClient", "AGENT_CARD"]
+# Imported on first access: importing the package builds no client or server
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "create_planning_agent": ".agent",
+    "planning_agent": ".agent",
+    "PlanningAgent": ".agent",
+    "PlanningHandler": ".handlers",
+    "GeminiClient": ".gemini_client",
+    "AGENT_CARD": ".config",
+})
+
+__all__ = ["create_planning_agent", "planning_agent", "PlanningAgent", "PlanningHandler", "GeminiClient", "AGENT_CARD"]
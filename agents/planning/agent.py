@@ -1,65 +1,73 @@
 import asyncio
-from python_a2a import AgentCard, A2AServer, run_server
+import json
+from typing import Optional
+from python_a2a import AgentCard, A2AServer
 from agents.planning.config import AGENT_CARD
 from agents.planning.gemini_client import GeminiClient
-from shared.logger import setup_logger
+from shared.asgi import run_asgi_server, to_response_message
+from shared.logger import LogSampler, setup_logger
+from shared.payloads import ActivityPlan, PayloadError, PlanningRequest, message_payload
+from shared.resilience import Deadline
 from config.setting import settings
 
 logger = setup_logger("planning_agent")
-
-# Validate Gemini API key
-settings.validate()
-
-# Create Gemini client
-gemini_client = GeminiClient()
+request_logs = LogSampler(logger)
 
 class PlanningAgent(A2AServer):
     """Planning Agent Server with Gemini AI"""
     
+    def __init__(self, agent_card: AgentCard, gemini_client: GeminiClient, **kwargs):
+        super().__init__(agent_card=agent_card, **kwargs)
+        self.gemini_client = gemini_client
+    
+    def setup_asgi_routes(self, app):
+        """Register the token usage endpoint"""
+        
+        @app.get("/a2a/usage")
+        async def usage():
+            return self.gemini_client.usage_stats()
+    
+    async def close(self):
+        """Release the Gemini client's cache when the ASGI server shuts down"""
+        await asyncio.to_thread(self.gemini_client.close)
+    
     def handle_message(self, message):
-        """Handle incoming planning requests"""
+        """
+        Handle incoming planning requests (synchronous python_a2a entry point).
+        
+        The ASGI server awaits _async_handle_message directly; this is only
+        used when the agent is driven through python_a2a's Flask server.
+        """
         try:
-            # Get or create event loop
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            # Run async handler
-            return loop.run_until_complete(self._async_handle_message(message))
+            result = asyncio.run(self._async_handle_message(message))
+            return to_response_message(result, message)
         except Exception as e:
             logger.error(f"❌ Error in handle_message: {e}")
-            return {
-                "text": f"Sorry, I couldn't process your request",
-                "role": "agent",
-                "error": str(e)
-            }
+            return to_response_message(
+                {"text": "Sorry, I couldn't process your request", "error": str(e)},
+                message
+            )
     
     async def _async_handle_message(self, message):
         """Async implementation of message handler"""
         try:
-            text = message.content.text
-            logger.info(f"📋 Received planning request: {text[:100]}...")
-            
-            # Parse location and weather from message
-            # Expected format: "Plan for {location} with weather: {weather_info}"
-            parts = text.split("with weather:")
-            if len(parts) == 2:
-                location = parts[0].replace("Plan for", "").strip()
-                weather_info = parts[1].strip()
-            else:
-                location = "Unknown"
-                weather_info = text
-            
-            logger.info(f"📍 Location: {location}")
-            logger.info(f"☁️ Weather: {weather_info}")
+            request = self._read_request(message)
+            location = request.location
+            log = request_logs.for_request()
+            log.info("📋 Received planning request for: {}", location)
+            log.debug("☁️ Weather: {}", request.weather_info)
             
-            # Generate activities using Gemini
-            result = await gemini_client.generate_activities(
+            # Generate activities using Gemini, abandoning the wait once the
+            # caller's deadline has passed (the generation still finishes and
+            # is cached)
+            generation = self.gemini_client.generate_activities(
                 location=location,
-                weather_info=weather_info
+                weather_info=request.weather_info,
+                additional_context=request.additional_context,
+                activity_count=request.activity_count
             )
+            deadline = Deadline.from_message(message)
+            result = await (deadline.run(generation) if deadline else generation)
             
             # Format response
             response_text = f"🎯 Activity Suggestions for {location}:\n\n"
@@ -67,12 +75,17 @@ class PlanningAgent(A2AServer):
                 response_text += f"{activity['title']}\n"
                 response_text += f"{activity['description'].strip()}\n\n"
             
-            logger.info(f"✅ Generated {result['count']} activities")
+            log.info("✅ Generated {} activities", result["count"])
             
             return {
                 "text": response_text.strip(),
                 "role": "agent",
-                "metadata": result
+                "metadata": result,
+                "data": ActivityPlan(
+                    location=location,
+                    activities=result["activities"],
+                    cached=result.get("cached", False)
+                ).to_dict()
             }
             
         except Exception as e:
@@ -82,14 +95,87 @@ class PlanningAgent(A2AServer):
                 "role": "agent",
                 "error": str(e)
             }
+    
+    async def stream_response(self, message):
+        """
+        Stream activities as Gemini generates them.
+        
+        Each chunk is a JSON event: {"type": "activity", ...} per activity,
+        then {"type": "done", "count": n}.
+        """
+        request = self._read_request(message)
+        deadline = Deadline.from_message(message)
+        log = request_logs.for_request()
+        log.info("📋 Received streaming planning request for: {}", request.location)
+        
+        count = 0
+        async for activity in self.gemini_client.stream_activities(
+            location=request.location,
+            weather_info=request.weather_info,
+            additional_context=request.additional_context,
+            activity_count=request.activity_count
+        ):
+            if deadline and deadline.expired:
+                logger.warning(f"⏰ Deadline passed, abandoning stream for {request.location}")
+                yield json.dumps({"type": "error", "error": "deadline exceeded"})
+                return
+            count += 1
+            yield json.dumps(
+                {"type": "activity", "index": count, "activity": activity},
+                ensure_ascii=False
+            )
+        
+        log.info("✅ Streamed {} activities", count)
+        yield json.dumps({"type": "done", "count": count})
+    
+    def _read_request(self, message) -> PlanningRequest:
+        """Use the structured payload if the message has one, else parse the text"""
+        payload = message_payload(message)
+        if payload is not None:
+            try:
+                return PlanningRequest.from_dict(payload)
+            except (PayloadError, KeyError) as e:
+                logger.warning(f"⚠️ Ignoring invalid planning payload: {e}")
+        
+        location, weather_info = self._parse_request(message.content.text)
+        return PlanningRequest(location=location, weather_text=weather_info)
+    
+    def _parse_request(self, text: str) -> tuple[str, str]:
+        """Parse location and weather from message text (legacy format)"""
+        
+        # Expected format: "Plan for {location} with weather: {weather_info}"
+        parts = text.split("with weather:")
+        if len(parts) == 2:
+            location = parts[0].replace("Plan for", "").strip()
+            weather_info = parts[1].strip()
+        else:
+            location = "Unknown"
+            weather_info = text
+        
+        return location, weather_info
 
-# Create agent card
-agent_card = AgentCard(**AGENT_CARD)
+def create_planning_agent(gemini_client: Optional[GeminiClient] = None) -> PlanningAgent:
+    """Validate settings and build the Planning Agent server (and its Gemini client)"""
+    settings.validate()
+    return PlanningAgent(
+        agent_card=AgentCard(**AGENT_CARD),
+        gemini_client=gemini_client or GeminiClient()
+    )
 
-# Create A2A server
-planning_agent = PlanningAgent(agent_card=agent_card)
+_default_agent: Optional[PlanningAgent] = None
+
+def __getattr__(name: str):
+    # planning_agent is built on first access rather than at import time
+    global _default_agent
+    if name == "planning_agent":
+        if _default_agent is None:
+            _default_agent = create_planning_agent()
+        return _default_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
+    planning_agent = create_planning_agent()
+    
     logger.info("=" * 60)
     logger.info("🗺️  PLANNING AGENT STARTING (with Gemini)")
     logger.info(f"📡 URL: {settings.PLANNING_AGENT_URL}")
@@ -98,7 +184,7 @@ if __name__ == "__main__":
     logger.info("=" * 60)
     
     try:
-        run_server(
+        run_asgi_server(
             planning_agent,
             host="0.0.0.0",
             port=settings.PLANNING_AGENT_PORT
@@ -0,0 +1,391 @@
+"""
+LLM backends behind GeminiClient.
+
+A backend is anything with the google.generativeai model call shape:
+`generate_content(prompt, generation_config=None, stream=False)` returns a
+response with `.text` and `.usage_metadata`, or with stream=True an
+iterator of such chunks. Calls block; GeminiClient runs them on its
+executor. A backend may also take the shared instructions once, through
+`set_system_instruction(text)`; GeminiClient then leaves them out of the
+prompts.
+
+- "gemini": the real model (needs GEMINI_API_KEY)
+- "record": the real model, appending every answer and its timing to
+  LLM_RECORD_PATH (JSONL)
+- "replay": answers prompts from a recording, sleeping for the recorded
+  latency times LLM_REPLAY_LATENCY_SCALE (0 = no delay)
+- "simulator": deterministic emoji-formatted activities generated from
+  the prompt at LLM_SIM_TOKENS_PER_SECOND after LLM_SIM_LATENCY_MS
+"""
+
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config.setting import settings
+from shared.logger import setup_logger
+
+logger = setup_logger("gemini_client")
+
+BACKENDS = ("gemini", "record", "replay", "simulator")
+
+# Smallest system instruction worth a context cache: Gemini rejects shorter ones
+CONTEXT_CACHE_MIN_TOKENS = 1024
+
+@dataclass
+class Usage:
+    prompt_token_count: int = 0
+    candidates_token_count: int = 0
+    total_token_count: int = 0
+
+@dataclass
+class LLMResponse:
+    """Response or stream chunk, shaped like the SDK's"""
+    text: str
+    usage_metadata: Optional[Usage] = None
+
+class ReplayMissError(LookupError):
+    """The recording has no answer for this prompt"""
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:32]
+
+def _usage(data: Optional[Dict[str, Any]]) -> Optional[Usage]:
+    return Usage(**data) if data else None
+
+def _usage_dict(usage: Any) -> Optional[Dict[str, int]]:
+    if usage is None:
+        return None
+    return {
+        "prompt_token_count": getattr(usage, "prompt_token_count", 0) or 0,
+        "candidates_token_count": getattr(usage, "candidates_token_count", 0) or 0,
+        "total_token_count": getattr(usage, "total_token_count", 0) or 0
+    }
+
+class GeminiBackend:
+    """
+    google.generativeai model; the SDK is imported on first use.
+    
+    The system instruction is put in a context cache (renewed before it
+    expires, the previous cache deleted) when context_cache_ttl is set,
+    the instruction reaches CONTEXT_CACHE_MIN_TOKENS and the model accepts
+    it; otherwise it is sent with each call, where Gemini can still reuse
+    it as a common prefix.
+    """
+    
+    name = "gemini"
+    
+    def __init__(self, model_name: str, api_key: str, context_cache_ttl: float = 0):
+        import google.generativeai as genai
+        
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.model_name = model_name
+        self.context_cache_ttl = context_cache_ttl
+        self.cached_content: Optional[str] = None
+        self._cache: Any = None   # the live CachedContent
+        self._system_instruction: Optional[str] = None
+        self._cache_expires = 0.0
+        self._lock = threading.Lock()
+        self._model = genai.GenerativeModel(model_name)
+    
+    def set_system_instruction(self, text: str):
+        self._system_instruction = text
+        self._model = self._genai.GenerativeModel(self.model_name, system_instruction=text)
+        if self.context_cache_ttl > 0:
+            if estimate_tokens(text) < CONTEXT_CACHE_MIN_TOKENS:
+                logger.info(
+                    "ℹ️ System instruction (~{} tokens) is below the context cache minimum, sending it per call",
+                    estimate_tokens(text)
+                )
+                self.context_cache_ttl = 0
+            else:
+                self._cache_system_instruction()
+    
+    def _cache_system_instruction(self):
+        try:
+            cached = self._genai.caching.CachedContent.create(
+                model=f"models/{self.model_name}",
+                system_instruction=self._system_instruction,
+                ttl=timedelta(seconds=self.context_cache_ttl)
+            )
+        except Exception as e:
+            # E.g. the instruction is below the model's minimum cacheable size
+            logger.warning("⚠️ Context cache unavailable, sending the system instruction per call: {}", e)
+            self.context_cache_ttl = 0
+            self.cached_content = None
+            self._model = self._genai.GenerativeModel(self.model_name, system_instruction=self._system_instruction)
+            return
+        previous = self._cache
+        self._model = self._genai.GenerativeModel.from_cached_content(cached)
+        self._cache = cached
+        self.cached_content = cached.name
+        if previous is not None:
+            # Billed until it expires otherwise
+            try:
+                previous.delete()
+            except Exception as e:
+                logger.warning("⚠️ Could not delete the previous context cache {}: {}", previous.name, e)
+        self._cache_expires = time.monotonic() + self.context_cache_ttl
+        logger.info("💾 System instruction cached as {}", cached.name)
+    
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, stream: bool = False):
+        if self.cached_content and time.monotonic() > self._cache_expires - 60:
+            with self._lock:
+                if time.monotonic() > self._cache_expires - 60:
+                    self._cache_system_instruction()
+        return self._model.generate_content(prompt, generation_config=generation_config, stream=stream)
+
+class RecordingBackend:
+    """Pass calls through to another backend and append each answer to a JSONL file"""
+    
+    name = "record"
+    
+    def __init__(self, inner: Any, path: Path):
+        self.inner = inner
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.recorded = 0
+    
+    def set_system_instruction(self, text: str):
+        # Recordings are keyed by prompt only; the instruction goes to the model
+        self.inner.set_system_instruction(text)
+    
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, stream: bool = False):
+        started = time.perf_counter()
+        if stream:
+            return self._record_stream(prompt, generation_config, started)
+        response = self.inner.generate_content(prompt, generation_config=generation_config)
+        self._write({
+            "key": prompt_key(prompt),
+            "prompt": prompt,
+            "text": response.text,
+            "latency_s": round(time.perf_counter() - started, 4),
+            "chunks": None,
+            "usage": _usage_dict(getattr(response, "usage_metadata", None))
+        })
+        return response
+    
+    def _record_stream(self, prompt: str, generation_config: Optional[Dict[str, Any]], started: float) -> Iterator[Any]:
+        chunks = []
+        chunk = None
+        for chunk in self.inner.generate_content(prompt, generation_config=generation_config, stream=True):
+            chunks.append([round(time.perf_counter() - started, 4), chunk.text])
+            yield chunk
+        # Only complete streams are recorded
+        self._write({
+            "key": prompt_key(prompt),
+            "prompt": prompt,
+            "text": "".join(text for _, text in chunks),
+            "latency_s": chunks[-1][0] if chunks else 0.0,
+            "chunks": chunks,
+            "usage": _usage_dict(getattr(chunk, "usage_metadata", None))
+        })
+    
+    def _write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as recording:
+                recording.write(line + "\n")
+            self.recorded += 1
+
+class ReplayBackend:
+    """
+    Serve recorded answers by prompt. Prompts recorded several times are
+    answered with each recording in turn. Unknown prompts raise
+    ReplayMissError (GeminiClient then falls back like on an API error).
+    """
+    
+    name = "replay"
+    
+    def __init__(self, path: Path, latency_scale: float = 1.0):
+        self.path = Path(path)
+        self.latency_scale = latency_scale
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        with open(self.path, encoding="utf-8") as recording:
+            for line in recording:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records.setdefault(record["key"], []).append(record)
+        self._turns = {key: itertools.cycle(records) for key, records in self._records.items()}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def set_system_instruction(self, text: str):
+        """Nothing to do: the recorded answers already followed it"""
+    
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._records.values())
+    
+    def _next(self, prompt: str) -> Dict[str, Any]:
+        key = prompt_key(prompt)
+        with self._lock:
+            turns = self._turns.get(key)
+            if turns is None:
+                self.misses += 1
+                raise ReplayMissError(f"no recorded answer for prompt {key}")
+            self.hits += 1
+            return next(turns)
+    
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, stream: bool = False):
+        record = self._next(prompt)
+        usage = _usage(record.get("usage"))
+        if stream:
+            return self._replay_stream(record, usage)
+        time.sleep(record["latency_s"] * self.latency_scale)
+        return LLMResponse(record["text"], usage)
+    
+    def _replay_stream(self, record: Dict[str, Any], usage: Optional[Usage]) -> Iterator[LLMResponse]:
+        # A non-streamed recording is replayed as a single chunk
+        chunks = record.get("chunks") or [[record["latency_s"], record["text"]]]
+        started = time.perf_counter()
+        for index, (offset, text) in enumerate(chunks):
+            delay = offset * self.latency_scale - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            yield LLMResponse(text, usage if index == len(chunks) - 1 else None)
+
+# Activity templates per weather kind: (emoji, title, description)
+_SIM_ACTIVITIES = {
+    "sunny": [
+        ("🏖️", "Beach Morning", "Swim and relax on the beach near {location} before the midday heat."),
+        ("🚴", "Coastal Cycling", "Rent a bike and ride along the waterfront while the sky is clear."),
+        ("⛵", "Boat Trip", "Take a boat tour around the bay and enjoy the sunshine."),
+        ("🥾", "Hill Hike", "Hike a nearby trail early for wide views over {location}."),
+        ("🍹", "Sunset Drinks", "Watch the sunset from a rooftop bar with a cold drink."),
+    ],
+    "rainy": [
+        ("🏛️", "Museum Visit", "Spend the afternoon in the museums of {location}, dry and comfortable."),
+        ("☕", "Cafe Hopping", "Try local coffee in cozy cafes while the rain passes."),
+        ("🍜", "Cooking Class", "Learn to cook regional dishes in an indoor class."),
+        ("💆", "Spa Afternoon", "Unwind with a massage or a traditional spa treatment."),
+        ("🛍️", "Covered Market", "Browse the covered markets for crafts and street food."),
+    ],
+    "mild": [
+        ("🚶", "Old Town Walk", "Walk the historic streets of {location}; the weather is pleasant for it."),
+        ("🍜", "Street Food Tour", "Sample local street food with a guide in the evening."),
+        ("🏯", "Temple Visit", "Visit the main temples and pagodas around {location}."),
+        ("🚲", "Lakeside Ride", "Cycle around the lake while it is not too hot."),
+        ("📸", "Photo Walk", "Capture the city's markets and lanes in soft light."),
+    ],
+}
+
+_SIM_SINGLE_RE = re.compile(r"^Location: (.+)\nWeather: (.+)$", re.MULTILINE)
+_SIM_BATCH_RE = re.compile(r"^\[(\d+)\] Location: (.+)\n\s*Weather: (.+)$", re.MULTILINE)
+
+class SimulatorBackend:
+    """
+    Offline stand-in for the model: 3-5 activities matching the weather in
+    the prompt, the same answer for the same prompt, produced at a fixed
+    speed (latency_ms to the first token, then tokens_per_second).
+    """
+    
+    name = "simulator"
+    
+    def __init__(self, latency_ms: float = 300.0, tokens_per_second: float = 200.0, seed: int = 0, chunk_tokens: int = 16):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.seed = seed
+        self.chunk_tokens = chunk_tokens
+    
+    def set_system_instruction(self, text: str):
+        """Answers are generated from the prompt alone"""
+    
+    def answer(self, prompt: str, structured: bool = False) -> str:
+        """Deterministic answer text for a prompt (JSON when `structured`)"""
+        batch = _SIM_BATCH_RE.findall(prompt)
+        if batch:
+            if structured:
+                return json.dumps([
+                    {"number": int(number), "activities": self._json(self._activities(location, weather))}
+                    for number, location, weather in batch
+                ], ensure_ascii=False)
+            return "\n".join(
+                f"=== {number} ===\n{self._text(self._activities(location, weather))}"
+                for number, location, weather in batch
+            )
+        match = _SIM_SINGLE_RE.search(prompt)
+        location, weather = match.groups() if match else ("the city", "")
+        activities = self._activities(location, weather)
+        return json.dumps(self._json(activities), ensure_ascii=False) if structured else self._text(activities)
+    
+    def _activities(self, location: str, weather: str) -> List[Tuple[str, str, str]]:
+        rng = random.Random(zlib.crc32(f"{self.seed}:{location}:{weather}".encode("utf-8")))
+        weather = weather.lower()
+        if "sun" in weather or "clear" in weather:
+            kind = "sunny"
+        elif "rain" in weather or "storm" in weather or "drizzle" in weather:
+            kind = "rainy"
+        else:
+            kind = "mild"
+        picks = rng.sample(_SIM_ACTIVITIES[kind], rng.randint(3, 5))
+        return [(emoji, title, description.format(location=location.strip())) for emoji, title, description in picks]
+    
+    @staticmethod
+    def _text(activities: List[Tuple[str, str, str]]) -> str:
+        return "\n\n".join(f"{emoji} {title}\n{description}" for emoji, title, description in activities) + "\n"
+    
+    @staticmethod
+    def _json(activities: List[Tuple[str, str, str]]) -> List[Dict[str, str]]:
+        return [
+            {"emoji": emoji, "title": title, "description": description}
+            for emoji, title, description in activities
+        ]
+    
+    def _usage(self, prompt: str, text: str) -> Usage:
+        prompt_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        return Usage(prompt_tokens, output_tokens, prompt_tokens + output_tokens)
+    
+    def _generation_time(self, text: str) -> float:
+        return estimate_tokens(text) / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+    
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, stream: bool = False):
+        structured = (generation_config or {}).get("response_mime_type") == "application/json"
+        text = self.answer(prompt, structured)
+        if stream:
+            return self._stream(prompt, text)
+        time.sleep(self.latency_ms / 1000 + self._generation_time(text))
+        return LLMResponse(text, self._usage(prompt, text))
+    
+    def _stream(self, prompt: str, text: str) -> Iterator[LLMResponse]:
+        time.sleep(self.latency_ms / 1000)
+        size = self.chunk_tokens * 4
+        for start in range(0, len(text), size):
+            chunk = text[start:start + size]
+            time.sleep(self._generation_time(chunk))
+            last = start + size >= len(text)
+            yield LLMResponse(chunk, self._usage(prompt, text) if last else None)
+
+def create_backend(name: Optional[str] = None):
+    """Backend selected by `name` (default: settings.LLM_BACKEND)"""
+    name = (name or settings.LLM_BACKEND).lower()
+    if name == "gemini":
+        return GeminiBackend(settings.GEMINI_MODEL, settings.GEMINI_API_KEY, settings.GEMINI_CONTEXT_CACHE_TTL)
+    if name == "record":
+        return RecordingBackend(
+            GeminiBackend(settings.GEMINI_MODEL, settings.GEMINI_API_KEY, settings.GEMINI_CONTEXT_CACHE_TTL),
+            settings.LLM_RECORD_PATH
+        )
+    if name == "replay":
+        return ReplayBackend(settings.LLM_REPLAY_PATH, settings.LLM_REPLAY_LATENCY_SCALE)
+    if name == "simulator":
+        return SimulatorBackend(
+            latency_ms=settings.LLM_SIM_LATENCY_MS,
+            tokens_per_second=settings.LLM_SIM_TOKENS_PER_SECOND,
+            seed=settings.LLM_SIM_SEED
+        )
+    raise ValueError(f"unknown LLM backend {name!r}, expected one of {BACKENDS}")
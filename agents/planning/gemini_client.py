@@ -1,54 +1,269 @@
-import google.generativeai as genai
-from typing import Dict, Any, Optional
+import asyncio
+import functools
+import json
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 from config.setting import settings
+from agents.planning.backends import create_backend
+from agents.planning.parser import ACTIVITY_SCHEMA, BATCH_SCHEMA, ActivityParser, parse_activities
+from agents.planning.response_cache import ResponseCache, make_cache_key
+from shared import metrics
 from shared.logger import setup_logger
+from shared.singleflight import SingleFlight
 
 logger = setup_logger("gemini_client")
 
+# "=== 3 ===" starts the answer for the 3rd location of a batched prompt
+_SECTION_RE = re.compile(r"^\s*===\s*(\d+)\s*===\s*$", re.MULTILINE)
+MAX_BATCH_OUTPUT_TOKENS = 8192
+
+# Output budget: room for the requested activities, plus the thinking tokens
+# the model has been using (they count against max_output_tokens)
+DEFAULT_ACTIVITY_COUNT = 5   # "3-5 activities"
+TOKENS_PER_ACTIVITY = {"text": 60, "json": 80}
+OUTPUT_TOKENS_OVERHEAD = 64
+MAX_OUTPUT_TOKENS = 4096
+FIXED_OUTPUT_TOKENS = 1024   # when adaptive budgets are off
+
+# Shared instructions. Backends that take a system instruction get it once
+# (context-cached where the model allows); otherwise it starts every prompt.
+PREAMBLE = """You are a travel planning assistant. Based on the weather conditions, suggest activities for travelers.
+
+For each activity:
+- Include an emoji
+- Brief description (1-2 sentences)
+- Why it's good for this weather
+
+Format each activity as:
+🎯 Activity Name
+Description here. Why it's suitable.
+
+Example:
+🏖️ Beach Day
+Enjoy the sunny weather at the beautiful beaches. Perfect for swimming and sunbathing with warm temperatures.
+
+When asked about several numbered locations, start each location's answer with a line "=== N ===" where N is its number, in the same order, followed by its activities.
+"""
+
+STRUCTURED_PREAMBLE = """You are a travel planning assistant. Based on the weather conditions, suggest activities for travelers.
+
+For each activity give an emoji, a short title and a 1-2 sentence description that says why it's good for this weather. When asked about several numbered locations, answer with each location's number and its activities.
+"""
+
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+GEMINI_LATENCY = metrics.histogram("gemini_request_duration_seconds", "Gemini call duration", ["mode"])
+GEMINI_TOKENS = metrics.counter(
+    "gemini_tokens_total", "Tokens reported by Gemini (prompt, output, thinking, cached)", ["mode", "kind"]
+)
+GEMINI_OUTPUT_TOKENS = metrics.histogram(
+    "gemini_output_tokens", "Output tokens per Gemini call", ["mode"], buckets=TOKEN_BUCKETS
+)
+GEMINI_TOKENS_PER_ACTIVITY = metrics.histogram(
+    "gemini_output_tokens_per_activity", "Output tokens per parsed activity, per Gemini call", ["mode"],
+    buckets=(10, 20, 40, 60, 80, 120, 160, 240, 320, 640)
+)
+GEMINI_TRUNCATED = metrics.counter(
+    "gemini_truncated_total", "Gemini answers cut off by max_output_tokens", ["mode"]
+)
+GEMINI_ERRORS = metrics.counter("gemini_errors_total", "Failed Gemini calls", ["mode"])
+GEMINI_IN_FLIGHT = metrics.gauge("gemini_requests_in_flight", "Gemini calls running or queued for a worker")
+
+class TokenUsage:
+    """Running token totals of a GeminiClient (updated from the loop and executor threads)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.thinking_tokens = 0
+        self.cached_tokens = 0
+        self.activities = 0
+        self.seconds = 0.0
+        self.truncated = 0
+    
+    def add(self, usage: Dict[str, Any]):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage["prompt_tokens"]
+            self.output_tokens += usage["output_tokens"]
+            self.thinking_tokens += usage["thinking_tokens"]
+            self.cached_tokens += usage["cached_tokens"]
+            self.activities += usage["activities"]
+            self.seconds += usage["seconds"]
+            self.truncated += usage["truncated"]
+    
+    def per_activity(self, tokens: int) -> float:
+        return tokens / self.activities if self.activities else 0.0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "thinking_tokens": self.thinking_tokens,
+                "cached_tokens": self.cached_tokens,
+                "activities": self.activities,
+                "truncated": self.truncated,
+                "output_tokens_per_activity": round(self.per_activity(self.output_tokens), 1),
+                "thinking_tokens_per_call": round(self.thinking_tokens / self.calls, 1) if self.calls else 0.0,
+                "seconds_per_activity": round(self.seconds / self.activities, 4) if self.activities else 0.0,
+                "output_tokens_per_second": round(self.output_tokens / self.seconds, 1) if self.seconds else 0.0
+            }
+
 class GeminiClient:
     """Client for Google Gemini API"""
     
-    def __init__(self):
-        # Configure Gemini
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        
-        # Create model
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+    def __init__(self, backend=None):
+        # Model backend (Gemini, record/replay or simulator, see backends.py)
+        self.model = backend or create_backend()
         
         # Generation config
         self.generation_config = {
             "temperature": 0.7,
             "top_p": 0.95,
             "top_k": 40,
-            "max_output_tokens": 1024,
+            "max_output_tokens": FIXED_OUTPUT_TOKENS,
         }
         
-        logger.info(f"✅ Gemini client initialized with model: {settings.GEMINI_MODEL}")
+        # Structured output: the model answers with JSON following ACTIVITY_SCHEMA
+        self.structured = settings.GEMINI_RESPONSE_FORMAT == "json"
+        if self.structured:
+            self.generation_config.update(
+                response_mime_type="application/json",
+                response_schema=ACTIVITY_SCHEMA
+            )
+        
+        # Token accounting and output budgets sized to the requested activities
+        self.usage = TokenUsage()
+        self.adaptive_output = settings.GEMINI_ADAPTIVE_OUTPUT_TOKENS
+        self.tokens_per_activity = TOKENS_PER_ACTIVITY["json" if self.structured else "text"]
+        
+        # Send the shared instructions once if the backend takes a system instruction
+        self.preamble = STRUCTURED_PREAMBLE if self.structured else PREAMBLE
+        self.preamble_in_prompt = not hasattr(self.model, "set_system_instruction")
+        if not self.preamble_in_prompt:
+            self.model.set_system_instruction(self.preamble)
+        
+        # The SDK call is blocking: run it on a bounded pool so the event loop
+        # stays free. max_workers is the in-flight generation limit.
+        self.max_concurrency = settings.GEMINI_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="gemini"
+        )
+        
+        # Persistent response cache (shared by all workers on this host)
+        self.cache = None
+        if settings.LLM_CACHE_ENABLED:
+            self.cache = ResponseCache(
+                path=settings.LLM_CACHE_PATH,
+                ttl=settings.LLM_CACHE_TTL,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES
+            )
+        
+        # Identical generations already in flight are shared, not repeated
+        self._inflight = SingleFlight()
+        
+        # Bulk planning: locations per prompt and batch counters
+        self.batch_size = settings.GEMINI_BATCH_SIZE
+        self.batch_calls = 0
+        self.batch_locations = 0   # locations answered by a batched call
+        self.batch_retries = 0     # locations re-requested one by one
+        self.batch_tokens = 0
+        
+        if self.cache:
+            metrics.callback("llm_cache_lookups_total", "counter", "LLM response cache lookups by result", lambda: [
+                ({"result": "hit"}, self.cache.hits),
+                ({"result": "miss"}, self.cache.misses)
+            ])
+            metrics.callback(
+                "llm_cache_hit_ratio", "gauge", "LLM response cache hits over lookups",
+                lambda: self.cache.hits / ((self.cache.hits + self.cache.misses) or 1)
+            )
+        
+        logger.info(
+            "✅ Gemini client initialized with backend: {} (model: {})",
+            getattr(self.model, "name", type(self.model).__name__), settings.GEMINI_MODEL
+        )
     
     async def generate_activities(
         self,
         location: str,
         weather_info: str,
-        additional_context: Optional[str] = None
+        additional_context: Optional[str] = None,
+        use_cache: bool = True,
+        activity_count: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate activity suggestions based on weather
+        
+        Responses are cached by location and bucketed weather; pass
+        use_cache=False to bypass the cache for this call. Concurrent calls
+        with the same key share a single generation. activity_count asks for
+        that many activities instead of 3-5. Generated results carry the
+        call's token usage under "usage".
+        """
+        
+        key = make_cache_key(location, weather_info, additional_context, activity_count)
+        cache_key = None
+        if self.cache and use_cache:
+            cache_key = key
+            cached_text = await self.cache.get_async(cache_key)
+            if cached_text is not None:
+                logger.debug("💾 Cache hit for {} ({})", location, cache_key)
+                activities = self._parse_response(cached_text)
+                activities["cached"] = True
+                return activities
+        
+        return await self._inflight.do(
+            (key, use_cache),
+            lambda: self._generate(location, weather_info, additional_context, cache_key, activity_count)
+        )
+    
+    async def _generate(
+        self,
+        location: str,
+        weather_info: str,
+        additional_context: Optional[str],
+        cache_key: Optional[str],
+        activity_count: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Generate activity suggestions based on weather"""
+        """Call Gemini once and cache a complete, parseable response text under cache_key"""
         
         # Create prompt
-        prompt = self._create_prompt(location, weather_info, additional_context)
+        prompt = self._create_prompt(location, weather_info, additional_context, activity_count)
+        generation_config = dict(
+            self.generation_config,
+            max_output_tokens=self._output_budget(activity_count or DEFAULT_ACTIVITY_COUNT)
+        )
         
         try:
-            logger.info(f"🤖 Generating activities for {location}...")
+            logger.info("🤖 Generating activities for {}...", location)
             
-            # Generate content
-            response = self.model.generate_content(
-                prompt,
-                generation_config=self.generation_config
-            )
+            # Generate content off the event loop
+            response, seconds = await self._call_model(prompt, generation_config, "generate")
             
             # Parse response
-            activities = self._parse_response(response.text)
+            parsed = parse_activities(response.text)
+            activities = self._parse_response(response.text, parsed)
+            activities["usage"] = self._account(
+                response, "generate", activities["count"], seconds, generation_config["max_output_tokens"]
+            )
             
-            logger.info(f"✅ Generated {len(activities['activities'])} activities")
+            # A cut-off or unparseable answer is returned but not replayed from the cache
+            if cache_key and parsed and not self._truncated(response):
+                await self.cache.set_async(cache_key, response.text)
+            
+            logger.info(
+                "✅ Generated {} activities ({} output tokens)",
+                activities["count"], activities["usage"]["output_tokens"]
+            )
             
             return activities
             
@@ -56,78 +271,392 @@ class GeminiClient:
             logger.error(f"❌ Gemini API error: {e}")
             return self._fallback_activities(location, weather_info)
     
+    async def generate_activities_batch(
+        self,
+        items: List[Tuple[str, str]],
+        batch_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate activities for many (location, weather_info) pairs
+        
+        Cached pairs are answered from the cache. The rest are packed
+        `batch_size` locations per prompt and the answer is split back per
+        location; locations missing or unparseable in a batched answer are
+        retried individually. Results are returned in input order.
+        """
+        
+        size = batch_size or self.batch_size
+        if size < 1:
+            raise ValueError("batch_size must be at least 1")
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, Tuple[str, str]] = {}
+        keys = []
+        for location, weather_info in items:
+            key = make_cache_key(location, weather_info)
+            keys.append(key)
+            if key in results or key in pending:
+                continue
+            
+            cached_text = await self.cache.get_async(key) if self.cache and use_cache else None
+            if cached_text is not None:
+                activities = self._parse_response(cached_text)
+                activities["cached"] = True
+                results[key] = activities
+            else:
+                pending[key] = (location, weather_info)
+        
+        pending_items = list(pending.items())
+        chunks = [pending_items[i:i + size] for i in range(0, len(pending_items), size)]
+        for batch in await asyncio.gather(*(self._generate_batch(chunk, use_cache) for chunk in chunks)):
+            results.update(batch)
+        
+        missing = [key for key in pending if key not in results]
+        if missing:
+            logger.warning(f"⚠️ Retrying {len(missing)} location(s) individually")
+            self.batch_retries += len(missing)
+            retried = await asyncio.gather(*(
+                self.generate_activities(*pending[key], use_cache=use_cache) for key in missing
+            ))
+            results.update(zip(missing, retried))
+        
+        return [results[key] for key in keys]
+    
+    async def _generate_batch(
+        self,
+        chunk: List[Tuple[str, Tuple[str, str]]],
+        use_cache: bool
+    ) -> Dict[str, Dict[str, Any]]:
+        """One Gemini call for several locations; returns results for the ones that parsed"""
+        
+        if len(chunk) == 1:
+            key, (location, weather_info) = chunk[0]
+            return {key: await self.generate_activities(location, weather_info, use_cache=use_cache)}
+        
+        prompt = self._create_batch_prompt([item for _, item in chunk])
+        generation_config = dict(
+            self.generation_config,
+            max_output_tokens=self._output_budget(DEFAULT_ACTIVITY_COUNT, locations=len(chunk))
+        )
+        if self.structured:
+            generation_config["response_schema"] = BATCH_SCHEMA
+        
+        self.batch_calls += 1
+        try:
+            logger.info("🤖 Generating activities for a batch of {} locations...", len(chunk))
+            response, seconds = await self._call_model(prompt, generation_config, "batch")
+            text = response.text
+        except Exception as e:
+            logger.error(f"❌ Gemini batch error: {e}")
+            return {}
+        
+        self.batch_tokens += self._total_tokens(response)
+        if text.lstrip().startswith(("[", "{")):
+            sections = self._split_batch_json(text, len(chunk))
+        else:
+            sections = self._split_batch_response(text, len(chunk))
+        
+        # A batch cut off at MAX_TOKENS may end mid-section; answer from it but don't cache it
+        cacheable = self.cache and use_cache and not self._truncated(response)
+        results = {}
+        for index, (key, _) in enumerate(chunk, 1):
+            section = sections.get(index)
+            if not section:
+                continue
+            activities = parse_activities(section)
+            if not activities:
+                continue
+            
+            results[key] = {
+                "activities": activities,
+                "count": len(activities)
+            }
+            if cacheable:
+                await self.cache.set_async(key, section)
+        
+        self._account(
+            response, "batch", sum(result["count"] for result in results.values()),
+            seconds, generation_config["max_output_tokens"]
+        )
+        self.batch_locations += len(results)
+        logger.info("✅ Batch answered {}/{} locations", len(results), len(chunk))
+        return results
+    
+    async def _call_model(self, prompt: str, generation_config: Dict[str, Any], mode: str) -> Tuple[Any, float]:
+        """Run generate_content on the executor, recording latency and errors; returns (response, seconds)"""
+        loop = asyncio.get_running_loop()
+        GEMINI_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            with GEMINI_LATENCY.labels(mode).time():
+                response = await loop.run_in_executor(
+                    self._executor,
+                    functools.partial(
+                        self.model.generate_content,
+                        prompt,
+                        generation_config=generation_config
+                    )
+                )
+        except Exception:
+            GEMINI_ERRORS.labels(mode).inc()
+            raise
+        finally:
+            GEMINI_IN_FLIGHT.dec()
+        return response, time.perf_counter() - started
+    
+    def _output_budget(self, activity_count: int, locations: int = 1) -> int:
+        """max_output_tokens for `activity_count` activities at each of `locations`"""
+        limit = MAX_BATCH_OUTPUT_TOKENS if locations > 1 else MAX_OUTPUT_TOKENS
+        if not self.adaptive_output or self.usage.calls == 0:
+            # Nothing observed yet: thinking models may need far more than the answer
+            return min(FIXED_OUTPUT_TOKENS * locations, limit)
+        
+        per_activity = self.tokens_per_activity
+        if self.usage.activities >= 20:
+            # Learned from the answers so far, with 50% headroom
+            per_activity = max(per_activity, 1.5 * self.usage.per_activity(self.usage.output_tokens))
+        thinking = 1.5 * self.usage.thinking_tokens / self.usage.calls
+        budget = OUTPUT_TOKENS_OVERHEAD * locations + thinking + per_activity * activity_count * locations
+        return min(limit, math.ceil(budget))
+    
+    def _account(self, response, mode: str, activities: int, seconds: float, max_output_tokens: int) -> Dict[str, Any]:
+        """Record a call's token usage in the metrics and totals; returns it for the result"""
+        usage = getattr(response, "usage_metadata", None)
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        record = {
+            "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+            "output_tokens": output_tokens,
+            "thinking_tokens": getattr(usage, "thoughts_token_count", 0) or 0,
+            "cached_tokens": getattr(usage, "cached_content_token_count", 0) or 0,
+            "activities": activities,
+            "output_tokens_per_activity": round(output_tokens / activities, 1) if activities else 0.0,
+            "seconds": round(seconds, 3),
+            "max_output_tokens": max_output_tokens,
+            "truncated": self._truncated(response)
+        }
+        if record["truncated"]:
+            GEMINI_TRUNCATED.labels(mode).inc()
+            logger.warning("⚠️ Gemini answer hit max_output_tokens ({})", max_output_tokens)
+        if usage is None:
+            return record
+        
+        self.usage.add(record)
+        for kind in ("prompt", "output", "thinking", "cached"):
+            GEMINI_TOKENS.labels(mode, kind).inc(record[f"{kind}_tokens"])
+        GEMINI_OUTPUT_TOKENS.labels(mode).observe(output_tokens)
+        if activities:
+            GEMINI_TOKENS_PER_ACTIVITY.labels(mode).observe(output_tokens / activities)
+        return record
+    
+    @staticmethod
+    def _truncated(response) -> bool:
+        candidates = getattr(response, "candidates", None) or []
+        reason = getattr(candidates[0], "finish_reason", None) if candidates else None
+        return getattr(reason, "name", reason) in ("MAX_TOKENS", 2)
+    
+    def close(self):
+        """Close the response cache and let running generations finish (blocking)"""
+        self._executor.shutdown(wait=False)
+        if self.cache:
+            self.cache.close()
+    
+    def usage_stats(self) -> Dict[str, Any]:
+        """Token totals, tokens per activity and the current output budget"""
+        return dict(
+            self.usage.snapshot(),
+            max_output_tokens=self._output_budget(DEFAULT_ACTIVITY_COUNT),
+            preamble_in_prompt=self.preamble_in_prompt,
+            context_cache=getattr(self.model, "cached_content", None)
+        )
+    
+    def batch_stats(self) -> Dict[str, Any]:
+        """Counters for batched generation"""
+        return {
+            "batch_calls": self.batch_calls,
+            "batched_locations": self.batch_locations,
+            "individual_retries": self.batch_retries,
+            "requests_saved": self.batch_locations - self.batch_calls,
+            "tokens": self.batch_tokens,
+            "tokens_per_location": self.batch_tokens / self.batch_locations if self.batch_locations else 0.0
+        }
+    
+    async def stream_activities(
+        self,
+        location: str,
+        weather_info: str,
+        additional_context: Optional[str] = None,
+        use_cache: bool = True,
+        activity_count: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Stream activity suggestions, yielding each one as soon as its block
+        is complete in Gemini's streamed response
+        """
+        
+        cache_key = None
+        if self.cache and use_cache:
+            cache_key = make_cache_key(location, weather_info, additional_context, activity_count)
+            cached_text = await self.cache.get_async(cache_key)
+            if cached_text is not None:
+                logger.debug("💾 Cache hit for {} ({})", location, cache_key)
+                for activity in self._parse_response(cached_text)["activities"]:
+                    yield activity
+                return
+        
+        prompt = self._create_prompt(location, weather_info, additional_context, activity_count)
+        generation_config = dict(
+            self.generation_config,
+            max_output_tokens=self._output_budget(activity_count or DEFAULT_ACTIVITY_COUNT)
+        )
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = {}
+        
+        def produce():
+            """Iterate the blocking SDK stream on the executor, handing chunks to the loop"""
+            chunk = None
+            started = time.perf_counter()
+            try:
+                with GEMINI_LATENCY.labels("stream").time():
+                    stream = self.model.generate_content(
+                        prompt,
+                        generation_config=generation_config,
+                        stream=True
+                    )
+                    for chunk in stream:
+                        if stop.is_set():
+                            break
+                        loop.call_soon_threadsafe(queue.put_nowait, (chunk.text, None))
+            except Exception as e:
+                GEMINI_ERRORS.labels("stream").inc()
+                loop.call_soon_threadsafe(queue.put_nowait, (None, e))
+            else:
+                # The last chunk carries the usage for the whole stream
+                finished.update(chunk=chunk, seconds=time.perf_counter() - started)
+                loop.call_soon_threadsafe(queue.put_nowait, (None, None))
+            finally:
+                GEMINI_IN_FLIGHT.dec()
+        
+        logger.info("🤖 Streaming activities for {}...", location)
+        GEMINI_IN_FLIGHT.inc()
+        loop.run_in_executor(self._executor, produce)
+        
+        parser = ActivityParser()
+        chunks = []
+        count = 0
+        try:
+            while True:
+                text, error = await queue.get()
+                if error is not None:
+                    raise error
+                if text is None:
+                    break
+                chunks.append(text)
+                for activity in parser.feed(text):
+                    count += 1
+                    yield activity
+            
+            for activity in parser.close():
+                count += 1
+                yield activity
+            
+            if cache_key and count and not self._truncated(finished["chunk"]):
+                await self.cache.set_async(cache_key, "".join(chunks))
+            
+            usage = self._account(
+                finished["chunk"], "stream", count, finished["seconds"], generation_config["max_output_tokens"]
+            )
+            logger.info("✅ Streamed {} activities ({} output tokens)", count, usage["output_tokens"])
+            
+        except Exception as e:
+            logger.error(f"❌ Gemini API error while streaming: {e}")
+            if count == 0:
+                for activity in self._fallback_activities(location, weather_info)["activities"]:
+                    yield activity
+        finally:
+            stop.set()
+    
     def _create_prompt(
         self,
         location: str,
         weather_info: str,
-        additional_context: Optional[str]
+        additional_context: Optional[str],
+        activity_count: Optional[int] = None
     ) -> str:
-        """Create prompt for Gemini"""
+        """Create prompt for Gemini (the preamble is included unless sent as the system instruction)"""
         
-        prompt = f"""You are a travel planning assistant. Based on the weather conditions, suggest activities for travelers.
-
-Location: {location}
-Weather: {weather_info}
-"""
+        prompt = self.preamble + "\n" if self.preamble_in_prompt else ""
+        prompt += f"Location: {location}\nWeather: {weather_info}\n"
         
         if additional_context:
             prompt += f"\nAdditional Context: {additional_context}\n"
         
-        prompt += """
-Please suggest 3-5 activities that are suitable for this weather. For each activity:
-- Include an emoji
-- Brief description (1-2 sentences)
-- Why it's good for this weather
-
-Format your response as:
-🎯 Activity Name
-Description here. Why it's suitable.
-
-Example:
-🏖️ Beach Day
-Enjoy the sunny weather at the beautiful beaches. Perfect for swimming and sunbathing with warm temperatures.
-"""
-        
+        prompt += f"\nPlease suggest {activity_count or '3-5'} activities that are suitable for this weather.\n"
         return prompt
     
-    def _parse_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse Gemini response into structured format"""
+    def _create_batch_prompt(self, items: List[Tuple[str, str]]) -> str:
+        """Create one prompt covering several numbered locations"""
         
-        activities = []
-        lines = response_text.strip().split('\n')
+        prompt = self.preamble + "\n" if self.preamble_in_prompt else ""
+        prompt += "Suggest activities for each numbered location below, based on its weather conditions.\n\n"
+        for index, (location, weather_info) in enumerate(items, 1):
+            prompt += f"[{index}] Location: {location}\n    Weather: {weather_info}\n"
         
-        current_activity = None
-        for line in lines:
-            line = line.strip()
-            if not line:
+        prompt += "\nFor each location, suggest 3-5 activities that are suitable for its weather.\n"
+        return prompt
+    
+    @staticmethod
+    def _split_batch_response(response_text: str, count: int) -> Dict[int, str]:
+        """Split a batched answer into {location number: section text}"""
+        parts = _SECTION_RE.split(response_text)
+        sections = {}
+        # parts: [preamble, number, body, number, body, ...]
+        for number, body in zip(parts[1::2], parts[2::2]):
+            index = int(number)
+            if 1 <= index <= count and index not in sections:
+                sections[index] = body.strip()
+        return sections
+    
+    @staticmethod
+    def _split_batch_json(response_text: str, count: int) -> Dict[int, str]:
+        """Split a structured batched answer into {location number: activities JSON}"""
+        try:
+            entries = json.loads(response_text)
+        except json.JSONDecodeError:
+            return {}
+        sections = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict) or not isinstance(entry.get("activities"), list):
                 continue
-            
-            # Check if it's an activity title (has emoji)
-            if any(char for char in line if ord(char) > 127):  # Has emoji
-                if current_activity:
-                    activities.append(current_activity)
-                current_activity = {
-                    "title": line,
-                    "description": ""
-                }
-            elif current_activity:
-                current_activity["description"] += line + " "
-        
-        # Add last activity
-        if current_activity:
-            activities.append(current_activity)
+            index = entry.get("number")
+            if isinstance(index, int) and 1 <= index <= count and index not in sections:
+                sections[index] = json.dumps(entry["activities"], ensure_ascii=False)
+        return sections
+    
+    @staticmethod
+    def _total_tokens(response) -> int:
+        usage = getattr(response, "usage_metadata", None)
+        return getattr(usage, "total_token_count", 0) or 0
+    
+    def _parse_response(self, response_text: str, activities: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Parse a Gemini response (structured JSON or activity text) into structured format"""
+        
+        if activities is None:
+            activities = parse_activities(response_text)
         
         # If parsing failed, return raw text
         if not activities:
             activities = [{
                 "title": "📋 Suggested Activities",
-                "description": response_text
+                "description": response_text.strip()
             }]
         
         return {
             "activities": activities,
-            "count": len(activities),
-            "raw_response": response_text
+            "count": len(activities)
         }
     
     def _fallback_activities(
@@ -175,5 +704,5 @@ Enjoy the sunny weather at the beautiful beaches. Perfect for swimming and sunba
         return {
             "activities": activities,
             "count": len(activities),
-            "raw_response": "Fallback activities generated"
+            "fallback": True
         }
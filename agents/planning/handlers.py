@@ -1,32 +1,35 @@
 from typing import Dict, Any, Optional
 from .gemini_client import GeminiClient
 from shared.logger import setup_logger
+from shared.payloads import PayloadError, PlanningRequest
 
 logger = setup_logger("planning_handler")
 
 class PlanningHandler:
     """Handles planning-related requests"""
     
-    def __init__(self):
-        self.gemini_client = GeminiClient()
+    def __init__(self, gemini_client: Optional[GeminiClient] = None):
+        # Share the agent's client (and its executor and cache) when given one
+        self.gemini_client = gemini_client or GeminiClient()
         logger.info("✅ Planning handler initialized")
     
-    async def handle_request(self, text: str) -> Dict[str, Any]:
+    async def handle_request(self, text: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Main handler for planning requests
         
         Args:
             text: Request text (format: "Plan for {location} with weather: {weather}")
+            payload: Optional structured PlanningRequest dict, preferred over text
         
         Returns:
             Dict with activities and metadata
         """
         try:
             # Parse the request
-            location, weather_info = self._parse_request(text)
+            location, weather_info = self._parse_request(text, payload)
             
-            logger.info(f"📋 Planning for: {location}")
-            logger.info(f"☁️ Weather: {weather_info}")
+            logger.info("📋 Planning for: {}", location)
+            logger.debug("☁️ Weather: {}", weather_info)
             
             # Generate activities using Gemini
             result = await self.gemini_client.generate_activities(
@@ -54,8 +57,15 @@ class PlanningHandler:
                 "response": f"Sorry, I couldn't generate activity suggestions. Error: {str(e)}"
             }
     
-    def _parse_request(self, text: str) -> tuple[str, str]:
-        """Parse location and weather from request text"""
+    def _parse_request(self, text: str, payload: Optional[Dict[str, Any]] = None) -> tuple[str, str]:
+        """Parse location and weather from the structured payload or request text"""
+        
+        if payload is not None:
+            try:
+                request = PlanningRequest.from_dict(payload)
+                return request.location, request.weather_info
+            except (PayloadError, KeyError) as e:
+                logger.warning(f"⚠️ Ignoring invalid planning payload: {e}")
         
         # Expected format: "Plan for {location} with weather: {weather_info}"
         if "with weather:" in text:
@@ -0,0 +1,201 @@
+"""Parsing of Gemini activity text"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Pictographic emoji (U+1F300-U+1FAFF) plus the older weather, travel and
+# sport symbols an activity title may start with (☀ ☁ ☂ ☃ ☔ ☕ ♨ ⚓ ⚡ ⚽ ⚾
+# ⛄ ⛅ ⛈ ⛩ ⛪ ⛰-⛵ ⛷-⛺ ✈). Bullets and arrows (▪ ► ★ ✓ ➤) are not emoji.
+_EMOJI = (
+    "\U0001f300-\U0001faff"
+    "\u2600-\u2603\u2614\u2615\u2668\u2693\u26a1\u26bd\u26be\u26c4\u26c5\u26c8"
+    "\u26e9\u26ea\u26f0-\u26f5\u26f7-\u26fa\u2708"
+)
+
+# A title line starts with an emoji, possibly after list or markdown markers
+# ("1. ", "- ", "**", "### "). Accented letters (Đà Nẵng) are not emoji.
+_TITLE_RE = re.compile(rf"^[\s#*\-•\d.)]*[{_EMOJI}]")
+
+# Structured output: a JSON array of activities
+ACTIVITY_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "emoji": {"type": "string"},
+            "title": {"type": "string"},
+            "description": {"type": "string"},
+        },
+        "required": ["emoji", "title", "description"],
+    },
+}
+
+# Structured output for batched prompts: activities per location number
+BATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "number": {"type": "integer"},
+            "activities": ACTIVITY_SCHEMA,
+        },
+        "required": ["number", "activities"],
+    },
+}
+
+_decoder = json.JSONDecoder()
+
+def activity_from_json(item: Any) -> Optional[Dict[str, str]]:
+    """Activity dict from one structured-output item, or None if it is invalid"""
+    if not isinstance(item, dict):
+        return None
+    title = item.get("title")
+    description = item.get("description")
+    if not isinstance(title, str) or not title.strip() or not isinstance(description, str):
+        return None
+    emoji = item.get("emoji")
+    title = title.strip()
+    if isinstance(emoji, str) and emoji.strip() and not title.startswith(emoji.strip()):
+        title = f"{emoji.strip()} {title}"
+    return {"title": title, "description": description.strip()}
+
+class ActivityStreamParser:
+    """
+    Incrementally parse activity blocks from (possibly streamed) response text.
+    
+    A line starting with an emoji starts a new activity; following lines are
+    its description. A block is emitted as soon as the next title starts, or
+    on close() for the last one.
+    """
+    
+    def __init__(self):
+        self._buffer = ""
+        self._title: Optional[str] = None
+        self._description: List[str] = []
+    
+    def feed(self, text: str) -> List[Dict[str, str]]:
+        """Add a chunk of text, returning activities completed by it"""
+        self._buffer += text
+        if "\n" not in text:
+            return []
+        *lines, self._buffer = self._buffer.split("\n")
+        return self._consume(lines)
+    
+    def close(self) -> List[Dict[str, str]]:
+        """Flush the remaining text, returning the last activities"""
+        completed = self._consume([self._buffer])
+        self._buffer = ""
+        if self._title is not None:
+            completed.append(self._finish())
+        return completed
+    
+    def _finish(self) -> Dict[str, str]:
+        activity = {"title": self._title, "description": " ".join(self._description)}
+        self._title = None
+        self._description = []
+        return activity
+    
+    def _consume(self, lines: List[str]) -> List[Dict[str, str]]:
+        completed = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if _TITLE_RE.match(line):
+                if self._title is not None:
+                    completed.append(self._finish())
+                self._title = line
+            elif self._title is not None:
+                self._description.append(line)
+        return completed
+
+class ActivityJSONStreamParser:
+    """
+    Incrementally parse a structured-output JSON array of activities.
+    
+    Each array element is decoded once, as soon as it is complete in the
+    buffer; invalid elements are skipped. A wrapping object
+    ({"activities": [...]}) is accepted too.
+    """
+    
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+        self._done = False
+    
+    def feed(self, text: str) -> List[Dict[str, str]]:
+        """Add a chunk of text, returning activities completed by it"""
+        self._buffer += text
+        return self._consume()
+    
+    def close(self) -> List[Dict[str, str]]:
+        """Return activities still in the buffer (none for well-formed JSON)"""
+        completed = self._consume()
+        self._buffer = ""
+        return completed
+    
+    def _consume(self) -> List[Dict[str, str]]:
+        completed = []
+        if self._done:
+            return completed
+        buffer = self._buffer
+        position = 0
+        if not self._started:
+            position = buffer.find("[")
+            if position < 0:
+                return completed
+            self._started = True
+            position += 1
+        
+        length = len(buffer)
+        while position < length:
+            char = buffer[position]
+            if char in " \t\r\n,":
+                position += 1
+                continue
+            if char == "]":
+                self._done = True
+                break
+            if buffer.find("}", position) < 0:
+                break   # element not complete yet
+            try:
+                item, position = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break   # element not complete yet
+            activity = activity_from_json(item)
+            if activity:
+                completed.append(activity)
+        
+        self._buffer = buffer[position:]
+        return completed
+
+class ActivityParser:
+    """
+    Streaming parser for either format: structured JSON when the response
+    starts with "[" or "{", activity text otherwise
+    """
+    
+    def __init__(self):
+        self._parser = None
+        self._pending = ""
+    
+    def feed(self, text: str) -> List[Dict[str, str]]:
+        if self._parser is None:
+            self._pending += text
+            head = self._pending.lstrip()
+            if not head:
+                return []
+            self._parser = ActivityJSONStreamParser() if head[0] in "[{" else ActivityStreamParser()
+            text, self._pending = self._pending, ""
+        return self._parser.feed(text)
+    
+    def close(self) -> List[Dict[str, str]]:
+        if self._parser is None:
+            return []
+        return self._parser.close()
+
+def parse_activities(text: str) -> List[Dict[str, str]]:
+    """Activities in a complete response, in either format"""
+    parser = ActivityParser()
+    return parser.feed(text) + parser.close()
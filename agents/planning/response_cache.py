@@ -0,0 +1,177 @@
+"""Persistent cache of Gemini responses, shared across Planning Agent processes"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from shared.locations import location_key
+from shared.weather import weather_signature
+
+def make_cache_key(
+    location: str,
+    weather_info: str,
+    additional_context: Optional[str] = None,
+    activity_count: Optional[int] = None
+) -> str:
+    """Cache key: canonical location ID + bucketed weather signature"""
+    key = f"{location_key(location)}|{weather_signature(weather_info)}"
+    if additional_context:
+        key += "|ctx:" + hashlib.sha1(additional_context.encode("utf-8")).hexdigest()[:16]
+    if activity_count:
+        key += f"|n:{activity_count}"
+    return key
+
+class ResponseCache:
+    """
+    SQLite-backed cache of raw LLM response text with TTL and size-based eviction.
+    
+    Uses WAL mode so several worker processes can read and write the same
+    file. Each thread gets its own connection. The async methods run the
+    SQLite calls on the cache's own threads, so a writer holding the file
+    lock in another process never stalls the event loop.
+    
+    Reads only refresh a row's LRU timestamp once per `touch_interval`
+    seconds, so most hits are read-only. Eviction runs when the row count
+    goes over max_entries and trims it to `1 - evict_fraction` of that, so
+    it does not run again on the next insert.
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl: float,
+        max_entries: int,
+        touch_interval: float = 60.0,
+        evict_fraction: float = 0.1
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.evict_fraction = evict_fraction
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-cache")
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            # Rows as of the last count; other processes' inserts are found at the next count
+            self._size = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Used by this thread only, but closed from close() on another one
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    async def get_async(self, key: str) -> Optional[str]:
+        """get() on the cache's threads"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.get, key)
+    
+    async def set_async(self, key: str, response: str):
+        """set() on the cache's threads"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.set, key, response)
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None if missing or expired (blocking)"""
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT response, created_at, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None or now - row[1] >= self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            
+            if now - row[2] >= self.touch_interval:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return row[0]
+    
+    def set(self, key: str, response: str):
+        """Store response text, evicting least recently used rows once over max_entries (blocking)"""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+        with self._lock:
+            self._size += 1
+            over = self._size > self.max_entries
+        if over:
+            self._evict()
+    
+    def _evict(self):
+        keep = int(self.max_entries * (1 - self.evict_fraction))
+        with self._connection() as conn:
+            size = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if size > self.max_entries:
+                deleted = conn.execute(
+                    """
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (keep,)
+                ).rowcount
+                size -= deleted
+                self.evictions += deleted
+        with self._lock:
+            self._size = size
+    
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM responses")
+        with self._lock:
+            self._size = 0
+    
+    def close(self):
+        """Stop the cache's threads and close every connection (blocking)"""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and the shared entry count"""
+        size = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -1,7 +1,14 @@
 """Weather Agent Module"""
 
-from .agent import weather_agent
-from .handlers import WeatherHandler
-from .config import AGENT_CARD
+from shared.lazy import lazy_exports
 
-__all__ = ["weather_agent", "WeatherHandler", "AGENT_CARD"]
+# Imported on first access: importing the package builds no handler or server
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "create_weather_agent": ".agent",
+    "weather_agent": ".agent",
+    "WeatherAgent": ".agent",
+    "WeatherHandler": ".handlers",
+    "AGENT_CARD": ".config",
+})
+
+__all__ = ["create_weather_agent", "weather_agent", "WeatherAgent", "WeatherHandler", "AGENT_CARD"]
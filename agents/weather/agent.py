@@ -1,61 +1,81 @@
 import asyncio
-from python_a2a import AgentCard, A2AServer, run_server
+from datetime import date
+from typing import Optional
+from python_a2a import AgentCard, A2AServer
 from agents.weather.config import AGENT_CARD
 from agents.weather.handlers import WeatherHandler
-from shared.logger import setup_logger
+from shared.asgi import run_asgi_server, to_response_message
+from shared.logger import LogSampler, setup_logger
+from shared.payloads import (
+    Forecast, ForecastRequest, PayloadError, WeatherBatch, WeatherReport, WeatherRequest, message_payload
+)
+from shared.resilience import Deadline
 from config.setting import settings
 
 logger = setup_logger("weather_agent")
-
-# Create handler
-handler = WeatherHandler()
+request_logs = LogSampler(logger)
 
 class WeatherAgent(A2AServer):
     """Weather Agent Server"""
     
+    def __init__(self, agent_card: AgentCard, handler: WeatherHandler, **kwargs):
+        super().__init__(agent_card=agent_card, **kwargs)
+        self.handler = handler
+    
+    def setup_asgi_routes(self, app):
+        """Register the weather cache stats endpoint"""
+        
+        @app.get("/a2a/cache/stats")
+        async def cache_stats():
+            return self.handler.cache_stats()
+    
+    async def close(self):
+        """Release the handler's connections when the ASGI server shuts down"""
+        await self.handler.close()
+    
     def handle_message(self, message):
-        """Handle incoming weather requests"""
+        """
+        Handle incoming weather requests (synchronous python_a2a entry point).
+        
+        The ASGI server awaits _async_handle_message directly; this is only
+        used when the agent is driven through python_a2a's Flask server.
+        """
         try:
-            # Get or create event loop
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            # Run async handler
-            return loop.run_until_complete(self._async_handle_message(message))
+            result = asyncio.run(self._async_handle_message(message))
+            return to_response_message(result, message)
         except Exception as e:
             logger.error(f"❌ Error in handle_message: {e}")
-            return {
-                "text": f"Sorry, I couldn't process your request",
-                "role": "agent",
-                "error": str(e)
-            }
+            return to_response_message(
+                {"text": "Sorry, I couldn't process your request", "error": str(e)},
+                message
+            )
     
     async def _async_handle_message(self, message):
         """Async implementation of message handler"""
         try:
-            location = message.content.text
-            logger.info(f"📍 Received weather request for: {location}")
+            payload = message_payload(message)
+            if payload is not None and payload.get("kind") == WeatherRequest.KIND:
+                return await self._handle_bulk(WeatherRequest.from_dict(payload), message)
+            if payload is not None and payload.get("kind") == ForecastRequest.KIND:
+                return await self._handle_forecast(ForecastRequest.from_dict(payload), message)
             
-            # Get weather data
-            weather_data = await handler.get_weather(location)
+            location = message.content.text
+            log = request_logs.for_request()
+            log.info("📍 Received weather request for: {}", location)
             
-            # Format response
-            response_text = (
-                f"Weather in {weather_data['location']}:\n"
-                f"🌡️ Temperature: {weather_data['temperature']}\n"
-                f"☁️ Condition: {weather_data['condition']}\n"
-                f"💧 Humidity: {weather_data['humidity']}"
-            )
+            # Get weather data, giving up once the caller's deadline has passed
+            deadline = Deadline.from_message(message)
+            lookup = self.handler.get_weather(location)
+            weather_data = await (deadline.run(lookup) if deadline else lookup)
+            report = WeatherReport.from_weather_data(weather_data)
             
-            logger.info(f"✅ Returning weather data: {weather_data['summary']}")
+            log.info("✅ Returning weather data: {}", weather_data["summary"])
             
             return {
-                "text": response_text,
+                "text": report.to_display_text(),
                 "role": "agent",
-                "metadata": weather_data
+                "metadata": weather_data,
+                "data": report.to_dict()
             }
             
         except Exception as e:
@@ -65,14 +85,78 @@ class WeatherAgent(A2AServer):
                 "role": "agent",
                 "error": str(e)
             }
+    
+    async def _handle_bulk(self, request: WeatherRequest, message):
+        """Weather for several locations in one message, with per-location errors"""
+        if len(request.locations) > settings.WEATHER_BULK_MAX_LOCATIONS:
+            raise PayloadError(
+                f"too many locations: {len(request.locations)} (max {settings.WEATHER_BULK_MAX_LOCATIONS})"
+            )
+        log = request_logs.for_request()
+        log.info("📍 Received bulk weather request for {} location(s)", len(request.locations))
+        
+        # Locations still pending at the caller's deadline come back as errors
+        results = await self.handler.get_weather_many(request.locations, deadline=Deadline.from_message(message))
+        batch = WeatherBatch()
+        for location, weather_data in results.items():
+            if "error" in weather_data:
+                batch.errors[location] = weather_data["error"]
+            else:
+                batch.reports[location] = WeatherReport.from_weather_data(weather_data)
+        
+        log.info("✅ Returning weather for {} location(s), {} failed", len(batch.reports), len(batch.errors))
+        lines = [report.to_display_text() for report in batch.reports.values()]
+        lines += [f"❌ {location}: {error}" for location, error in batch.errors.items()]
+        return {
+            "text": "\n\n".join(lines),
+            "role": "agent",
+            "data": batch.to_dict()
+        }
+    
+    async def _handle_forecast(self, request: ForecastRequest, message):
+        """Daily forecast for a date range in one message"""
+        if request.days > settings.WEATHER_FORECAST_MAX_DAYS:
+            raise PayloadError(f"too many days: {request.days} (max {settings.WEATHER_FORECAST_MAX_DAYS})")
+        log = request_logs.for_request()
+        log.info("📍 Received forecast request for {}: {} day(s) from {}", request.location, request.days, request.start)
+        
+        deadline = Deadline.from_message(message)
+        lookup = self.handler.get_forecast(request.location, date.fromisoformat(request.start), request.days)
+        days = await (deadline.run(lookup) if deadline else lookup)
+        forecast = Forecast(
+            location=days[0]["location"] if days else request.location,
+            start=request.start,
+            days=[WeatherReport.from_weather_data(weather_data) for weather_data in days]
+        )
+        
+        log.info("✅ Returning forecast for {} of {} day(s)", len(forecast.days), request.days)
+        return {
+            "text": forecast.to_display_text(),
+            "role": "agent",
+            "data": forecast.to_dict()
+        }
 
-# Create agent card
-agent_card = AgentCard(**AGENT_CARD)
+def create_weather_agent(handler: Optional[WeatherHandler] = None) -> WeatherAgent:
+    """Build the Weather Agent server (and its weather handler)"""
+    return WeatherAgent(
+        agent_card=AgentCard(**AGENT_CARD),
+        handler=handler or WeatherHandler()
+    )
 
-# Create A2A server
-weather_agent = WeatherAgent(agent_card=agent_card)
+_default_agent: Optional[WeatherAgent] = None
+
+def __getattr__(name: str):
+    # weather_agent is built on first access rather than at import time
+    global _default_agent
+    if name == "weather_agent":
+        if _default_agent is None:
+            _default_agent = create_weather_agent()
+        return _default_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
+    weather_agent = create_weather_agent()
+    
     logger.info("=" * 60)
     logger.info("🌤️  WEATHER AGENT STARTING")
     logger.info(f"📡 URL: {settings.WEATHER_AGENT_URL}")
@@ -80,7 +164,7 @@ if __name__ == "__main__":
     logger.info("=" * 60)
     
     try:
-        run_server(
+        run_asgi_server(
             weather_agent,
             host="0.0.0.0",
             port=settings.WEATHER_AGENT_PORT
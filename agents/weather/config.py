@@ -20,3 +20,14 @@ MOCK_WEATHER_DATA = {
     "hue": {"temp": 26, "condition": "Partly Cloudy", "humidity": 78},
     "nha trang": {"temp": 29, "condition": "Sunny", "humidity": 70},
 }
+
+# Day-to-day variation of the mock weather in forecasts (condition None keeps the usual one)
+MOCK_FORECAST_PATTERN = [
+    {"condition": None, "temp": 0, "humidity": 0},
+    {"condition": None, "temp": 1, "humidity": 0},
+    {"condition": "Light Rain", "temp": -2, "humidity": 10},
+    {"condition": None, "temp": 0, "humidity": -5},
+    {"condition": "Thunderstorm", "temp": -3, "humidity": 12},
+    {"condition": None, "temp": 1, "humidity": 0},
+    {"condition": "Light Rain", "temp": -1, "humidity": 8},
+]
@@ -1,66 +1,326 @@
-import requests
-from typing import Dict, Any
+import asyncio
+import zlib
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from config.setting import settings
-from agents.weather.config import MOCK_WEATHER_DATA
+from agents.weather.config import MOCK_FORECAST_PATTERN, MOCK_WEATHER_DATA
+from shared import metrics
+from shared.cache import TTLCache
+from shared.http import PooledHTTPClient
+from shared.locations import get_resolver
+from shared.payloads import WeatherReport
+from shared.singleflight import SingleFlight
 from shared.logger import setup_logger
+from shared.resilience import Deadline
 
 logger = setup_logger("weather_agent")
 
+UPSTREAM_LATENCY = metrics.histogram("weather_upstream_duration_seconds", "Weather provider request duration")
+UPSTREAM_ERRORS = metrics.counter("weather_upstream_errors_total", "Failed weather provider requests")
+BULK_LOCATIONS = metrics.counter(
+    "weather_bulk_locations_total", "Distinct places in bulk weather requests by outcome", ["outcome"]
+)
+
 class WeatherHandler:
     """Handles weather-related requests"""
     
     def __init__(self):
         self.api_key = settings.WEATHER_API_KEY
         self.api_url = settings.WEATHER_API_URL
+        self.forecast_url = settings.WEATHER_FORECAST_URL
         self.use_mock = not self.api_key  # Use mock if no API key
+        
+        # Keep-alive connection pool for the weather provider
+        self.http = PooledHTTPClient(
+            pool_size=settings.WEATHER_HTTP_POOL_SIZE,
+            per_host_limit=settings.WEATHER_HTTP_PER_HOST_LIMIT,
+            keepalive_timeout=settings.WEATHER_HTTP_KEEPALIVE,
+            timeout=settings.WEATHER_HTTP_TIMEOUT,
+            connect_timeout=settings.WEATHER_HTTP_CONNECT_TIMEOUT
+        )
+        
+        # Spellings of a place ("Đà Nẵng", "Danang") share one canonical ID
+        self.locations = get_resolver()
+        
+        # Weather cache keyed on canonical location ID (TTL + LRU, stale-while-revalidate)
+        self.cache = TTLCache(
+            max_size=settings.WEATHER_CACHE_MAX_SIZE,
+            ttl=settings.WEATHER_CACHE_TTL,
+            stale_ttl=settings.WEATHER_CACHE_STALE_TTL
+        )
+        # Provider forecasts per canonical ID ({date: weather}), refreshed with the weather TTL
+        self.forecast_cache = TTLCache(max_size=settings.WEATHER_CACHE_MAX_SIZE, ttl=settings.WEATHER_CACHE_TTL)
+        # Concurrent misses/refreshes for the same location share one upstream call
+        self._inflight = SingleFlight()
+        self.bulk_concurrency = settings.WEATHER_BULK_CONCURRENCY
+        
+        # Cache counters are read at scrape time
+        metrics.callback("weather_cache_lookups_total", "counter", "Weather cache lookups by result", lambda: [
+            ({"result": "hit"}, self.cache.hits),
+            ({"result": "stale"}, self.cache.stale_hits),
+            ({"result": "miss"}, self.cache.misses)
+        ])
+        metrics.callback(
+            "weather_cache_hit_ratio", "gauge", "Fresh and stale hits over lookups",
+            lambda: self.cache.stats()["hit_rate"]
+        )
+        metrics.callback("weather_cache_entries", "gauge", "Entries in the weather cache", lambda: len(self.cache))
     
     async def get_weather(self, location: str) -> Dict[str, Any]:
         """Get weather for location"""
-        location_lower = location.lower().strip()
+        location_id = self.locations.key(location)
+        
+        entry = self.cache.get(location_id)
+        if entry is not None:
+            if not self.cache.is_fresh(entry):
+                # Serve stale data now, refresh it in the background
+                self._schedule_refresh(location, location_id)
+            return entry.value
+        
+        return await self._inflight.do(location_id, lambda: self._load(location, location_id))
+    
+    async def get_weather_many(
+        self,
+        locations: Sequence[str],
+        max_concurrency: Optional[int] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get weather for many locations, keyed by location as given
+        
+        Spellings of the same place share one lookup. Cached places are
+        answered straight away (stale ones are refreshed in the background);
+        the rest are fetched concurrently, at most `max_concurrency` at a
+        time (default WEATHER_BULK_CONCURRENCY), through the same
+        single-flight as get_weather. A location that fails, or is still
+        being fetched when the deadline passes, maps to {"error": message}.
+        """
+        limit = self.bulk_concurrency if max_concurrency is None else max_concurrency
+        if limit < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {limit}")
+        
+        ids: Dict[str, str] = {}
+        for location in dict.fromkeys(locations):
+            ids[location] = self.locations.key(location) if location.strip() else ""
+        
+        weather: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        missing: Dict[str, str] = {}   # canonical ID -> location to fetch it with
+        for location, location_id in ids.items():
+            if not location_id or location_id in weather or location_id in missing:
+                continue
+            entry = self.cache.get(location_id)
+            if entry is None:
+                missing[location_id] = location
+                continue
+            if not self.cache.is_fresh(entry):
+                self._schedule_refresh(location, location_id)
+            weather[location_id] = entry.value
+        BULK_LOCATIONS.labels("cached").inc(len(weather))
+        
+        if missing:
+            semaphore = asyncio.Semaphore(limit)
+            
+            async def fetch(location_id: str, location: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._inflight.do(location_id, lambda: self._load(location, location_id))
+            
+            tasks = {
+                location_id: asyncio.create_task(fetch(location_id, location))
+                for location_id, location in missing.items()
+            }
+            _, pending = await asyncio.wait(tasks.values(), timeout=deadline.remaining() if deadline else None)
+            for location_id, task in tasks.items():
+                if task in pending:
+                    # The shared load keeps running and still fills the cache
+                    task.cancel()
+                    errors[location_id] = "deadline exceeded"
+                elif task.exception() is not None:
+                    errors[location_id] = str(task.exception()) or type(task.exception()).__name__
+                else:
+                    weather[location_id] = task.result()
+            BULK_LOCATIONS.labels("fetched").inc(len(missing) - len(errors))
+            BULK_LOCATIONS.labels("failed").inc(len(errors))
         
+        logger.debug(
+            "🌤️ Bulk weather: {} location(s), {} fetched, {} failed",
+            len(ids), len(missing), len(errors)
+        )
+        return {
+            location: weather[location_id] if location_id in weather else {"error": errors.get(location_id, "empty location")}
+            for location, location_id in ids.items()
+        }
+    
+    async def get_forecast(self, location: str, start: date, days: int) -> List[Dict[str, Any]]:
+        """
+        Daily weather for `days` days from `start`, one weather dict per day
+        (with its "date"), from a single provider call per place.
+        
+        Provider forecasts are cached per canonical ID and shared by
+        concurrent requests; the list stops at the last day the provider
+        covers, and at WEATHER_FORECAST_MAX_DAYS whatever the caller asks.
+        """
+        days = min(days, settings.WEATHER_FORECAST_MAX_DAYS)
+        location_id = self.locations.key(location)
+        dates = [start + timedelta(days=offset) for offset in range(days)]
         if self.use_mock:
-            logger.info(f"Using mock weather data for: {location}")
-            return self._get_mock_weather(location_lower)
+            return [self._get_mock_forecast(location_id, day) for day in dates]
+        
+        entry = self.forecast_cache.get(location_id)
+        if entry is not None:
+            daily = entry.value
         else:
-            logger.info(f"Fetching real weather data for: {location}")
-            return await self._get_real_weather(location)
+            daily = await self._inflight.do(f"forecast:{location_id}", lambda: self._load_forecast(location, location_id))
+        
+        forecast = []
+        for day in dates:
+            if day.isoformat() not in daily:
+                break
+            forecast.append(daily[day.isoformat()])
+        return forecast
+    
+    async def close(self):
+        """Close the provider connection pool on the running loop"""
+        await self.http.close()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Weather cache hit/miss/eviction counters"""
+        stats = self.cache.stats()
+        stats["inflight"] = self._inflight.stats()
+        stats["locations"] = self.locations.stats()
+        return stats
+    
+    async def _load(self, location: str, location_id: str) -> Dict[str, Any]:
+        """Fetch weather and cache it when it came from the real source"""
+        weather, cacheable = await self._fetch_weather(location, location_id)
+        if cacheable:
+            self.cache.set(location_id, weather)
+        return weather
+    
+    async def _fetch_weather(self, location: str, location_id: str) -> Tuple[Dict[str, Any], bool]:
+        """Fetch weather from the source, returning (weather, cacheable)"""
+        if self.use_mock:
+            logger.debug("Using mock weather data for: {}", location)
+            return self._get_mock_weather(location_id), True
+        
+        # Known places are queried by canonical name and country
+        place = self.locations.get(location_id)
+        logger.debug("Fetching real weather data for: {}", location)
+        try:
+            return await self._get_real_weather(place.query if place else location), True
+        except Exception as e:
+            logger.error(f"Error fetching weather: {e}")
+            # Fallback to mock, but don't cache it over real data
+            return self._get_mock_weather(location_id), False
     
-    def _get_mock_weather(self, location: str) -> Dict[str, Any]:
+    async def _load_forecast(self, location: str, location_id: str) -> Dict[str, Dict[str, Any]]:
+        place = self.locations.get(location_id)
+        try:
+            daily = await self._get_real_forecast(place.query if place else location)
+        except Exception as e:
+            logger.error(f"Error fetching forecast: {e}")
+            # Fallback to mock for the provider's horizon, but don't cache it
+            today = date.today()
+            return {
+                day.isoformat(): self._get_mock_forecast(location_id, day)
+                for day in (today + timedelta(days=offset) for offset in range(settings.WEATHER_FORECAST_MAX_DAYS))
+            }
+        self.forecast_cache.set(location_id, daily)
+        return daily
+    
+    def _schedule_refresh(self, location: str, location_id: str):
+        """Start one background refresh per stale key"""
+        if not self._inflight.in_flight(location_id):
+            self._inflight.start(location_id, lambda: self._load(location, location_id))
+    
+    def _get_mock_weather(self, location_id: str) -> Dict[str, Any]:
         """Get mock weather data"""
-        weather = MOCK_WEATHER_DATA.get(location)
+        weather = MOCK_WEATHER_DATA.get(location_id)
         
         if not weather:
             # Default weather for unknown locations
             weather = {"temp": 25, "condition": "Partly Cloudy", "humidity": 70}
         
+        place = self.locations.get(location_id)
         return {
-            "location": location.title(),
+            "location": place.name if place else location_id.title(),
             "temperature": f"{weather['temp']}°C",
             "condition": weather["condition"],
             "humidity": f"{weather['humidity']}%",
             "summary": f"{weather['condition']}, {weather['temp']}°C"
         }
     
+    def _get_mock_forecast(self, location_id: str, day: date) -> Dict[str, Any]:
+        """Mock weather for one day: the usual mock weather with a repeating variation"""
+        weather = self._get_mock_weather(location_id)
+        base = WeatherReport.from_weather_data(weather)
+        variation = MOCK_FORECAST_PATTERN[(day.toordinal() + zlib.crc32(location_id.encode())) % len(MOCK_FORECAST_PATTERN)]
+        condition = variation["condition"] or base.condition
+        temperature = base.temperature + variation["temp"]
+        humidity = min(100, base.humidity + variation["humidity"])
+        return {
+            **weather,
+            "date": day.isoformat(),
+            "temperature": f"{temperature:g}°C",
+            "condition": condition,
+            "humidity": f"{humidity:g}%",
+            "summary": f"{condition}, {temperature:g}°C"
+        }
+    
     async def _get_real_weather(self, location: str) -> Dict[str, Any]:
         """Get real weather from API (OpenWeatherMap example)"""
+        params = {
+            "q": location,
+            "appid": self.api_key,
+            "units": "metric"
+        }
         try:
-            params = {
-                "q": location,
-                "appid": self.api_key,
-                "units": "metric"
-            }
-            response = requests.get(self.api_url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                "location": data["name"],
-                "temperature": f"{data['main']['temp']}°C",
-                "condition": data["weather"][0]["main"],
-                "humidity": f"{data['main']['humidity']}%",
-                "summary": f"{data['weather'][0]['main']}, {data['main']['temp']}°C"
+            with UPSTREAM_LATENCY.time():
+                data = await self.http.get_json(self.api_url, params=params)
+        except Exception:
+            UPSTREAM_ERRORS.inc()
+            raise
+        
+        return {
+            "location": data["name"],
+            "temperature": f"{data['main']['temp']}°C",
+            "condition": data["weather"][0]["main"],
+            "humidity": f"{data['main']['humidity']}%",
+            "summary": f"{data['weather'][0]['main']}, {data['main']['temp']}°C"
+        }
+    
+    async def _get_real_forecast(self, location: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Daily forecast from the 3-hourly OpenWeatherMap forecast: mean
+        temperature and humidity and the most frequent condition per date
+        """
+        params = {
+            "q": location,
+            "appid": self.api_key,
+            "units": "metric"
+        }
+        try:
+            with UPSTREAM_LATENCY.time():
+                data = await self.http.get_json(self.forecast_url, params=params)
+        except Exception:
+            UPSTREAM_ERRORS.inc()
+            raise
+        
+        slots = defaultdict(list)
+        for slot in data["list"]:
+            slots[slot["dt_txt"][:10]].append(slot)
+        daily = {}
+        for day, entries in sorted(slots.items()):
+            temperature = round(sum(entry["main"]["temp"] for entry in entries) / len(entries), 1)
+            humidity = round(sum(entry["main"]["humidity"] for entry in entries) / len(entries))
+            condition = Counter(entry["weather"][0]["main"] for entry in entries).most_common(1)[0][0]
+            daily[day] = {
+                "location": data["city"]["name"],
+                "date": day,
+                "temperature": f"{temperature}°C",
+                "condition": condition,
+                "humidity": f"{humidity}%",
+                "summary": f"{condition}, {temperature}°C"
             }
-        except Exception as e:
-            logger.error(f"Error fetching weather: {e}")
-            # Fallback to mock
-            return self._get_mock_weather(location.lower())
+        return daily
@@ -0,0 +1 @@
+"""Benchmarks and load-test tools for the A2A travel agents"""
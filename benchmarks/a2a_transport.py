@@ -0,0 +1,198 @@
+"""
+A2A transport: python_a2a's A2AClient vs the shared keep-alive pool.
+
+Starts a stub A2A agent (--latency ms per task; with --agent-capacity it
+serves at most that many tasks at once and queues the rest, like an agent
+in front of a rate-limited model) and, at each --concurrency level, sends
+--requests tasks with:
+- A2AClient, the previous behavior: requests.post in an executor thread
+  (executor sized to the concurrency), a new connection per call,
+- PooledA2AClient over its own PooledHTTPClient (--pool-size connections).
+Reports per-request p50/p99 latency, throughput, connections opened and
+sockets left in TIME_WAIT (Linux). Then runs the pooled client once more
+with a pool smaller than the concurrency, sampling open and waiting
+connections while it runs.
+
+Checks that the pooled client opens at most one connection per concurrent
+call, is not slower than A2AClient at p50, never goes over its pool size
+and leaves no call waiting. Exits non-zero if a check fails.
+
+    uv run python -m benchmarks.a2a_transport --requests 1000 --concurrency 1,10,50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from aiohttp import web
+from benchmarks.stubs import AgentStub, StubServer
+
+def time_wait(port: int) -> Optional[int]:
+    """Client sockets to `port` in TIME_WAIT, from /proc/net/tcp (None if unavailable)"""
+    count = 0
+    for name in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(name) as file:
+                next(file)
+                for line in file:
+                    fields = line.split()
+                    count += fields[3] == "06" and int(fields[2].rsplit(":", 1)[1], 16) == port
+        except OSError:
+            if name.endswith("tcp"):
+                return None
+    return count
+
+def limit_capacity(app: web.Application, capacity: int) -> web.Application:
+    """Serve at most `capacity` tasks of a stub agent at once; the rest wait their turn"""
+    slots = asyncio.Semaphore(capacity)
+    
+    @web.middleware
+    async def bounded(request: web.Request, handler):
+        if not request.path.endswith("/tasks/send"):
+            return await handler(request)
+        async with slots:
+            return await handler(request)
+    
+    app.middlewares.append(bounded)
+    return app
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def load(client: Any, total: int, concurrency: int) -> Tuple[List[float], float]:
+    """Send `total` tasks from `concurrency` workers; per-request latencies and wall time"""
+    from python_a2a import Message, MessageRole, Task, TextContent
+    
+    latencies: List[float] = []
+    pending = iter(range(total))
+    
+    async def worker():
+        for _ in pending:
+            message = Message(content=TextContent(text="ping"), role=MessageRole.USER)
+            started = time.perf_counter()
+            await client.send_task_async(Task(message=message.to_dict()))
+            latencies.append(time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+async def sample_pool(transport: Any, peaks: Dict[str, int], stop: asyncio.Event):
+    while not stop.is_set():
+        stats = transport.stats()
+        for state in ("open", "waiting"):
+            peaks[state] = max(peaks[state], stats[state])
+        await asyncio.sleep(0.002)
+
+def report(label: str, latencies: List[float], elapsed: float, created: Any, lingering: Any):
+    print(
+        f"{label:>16} | {statistics.median(latencies) * 1000:>7.2f} | {percentile(latencies, 99) * 1000:>7.2f} | "
+        f"{len(latencies) / elapsed:>7.0f} | {created:>7} | {lingering if lingering is not None else 'n/a':>9}"
+    )
+
+async def run(
+    total: int,
+    levels: List[int],
+    latency_ms: float,
+    pool_size: int,
+    keepalive: float,
+    agent_capacity: int = 0
+) -> bool:
+    from python_a2a import A2AClient
+    from shared.a2a_client import PooledA2AClient
+    from shared.http import PooledHTTPClient
+    
+    ok = True
+    stub = AgentStub("stub", latency_ms=latency_ms)
+    app = stub.app()
+    if agent_capacity:
+        limit_capacity(app, agent_capacity)
+    server = StubServer(app).start()
+    endpoint = f"{server.url}/a2a"
+    loop = asyncio.get_running_loop()
+    
+    try:
+        capacity = f", {agent_capacity} served at once" if agent_capacity else ""
+        print(f"{total} tasks per run, stub latency {latency_ms:.0f} ms{capacity}\n")
+        print(f"{'client':>16} | {'p50 ms':>7} | {'p99 ms':>7} | {'req/s':>7} | {'opened':>7} | {'TIME_WAIT':>9}")
+        print("-" * 70)
+        for concurrency in levels:
+            print(f"concurrency {concurrency}")
+            
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+            loop.set_default_executor(executor)
+            client = A2AClient(endpoint)
+            await load(client, concurrency, concurrency)   # warm up the executor threads
+            calls, waiting_before = stub.calls, time_wait(server.port)
+            latencies, elapsed = await load(client, total, concurrency)
+            waiting_after = time_wait(server.port)
+            lingering = max(0, waiting_after - waiting_before) if waiting_after is not None else None
+            report("A2AClient", latencies, elapsed, stub.calls - calls, lingering)
+            plain_p50 = statistics.median(latencies)
+            executor.shutdown(wait=False)
+            
+            transport = PooledHTTPClient(pool_size=pool_size, keepalive_timeout=keepalive)
+            client = PooledA2AClient(endpoint, transport=transport)
+            waiting_before = time_wait(server.port)
+            latencies, elapsed = await load(client, total, concurrency)
+            waiting_after = time_wait(server.port)
+            stats = transport.stats()
+            lingering = max(0, waiting_after - waiting_before) if waiting_after is not None else None
+            report("PooledA2AClient", latencies, elapsed, stats["created"], lingering)
+            await transport.close()
+            
+            if stats["created"] > min(concurrency, pool_size):
+                print(f"FAIL: pooled client opened {stats['created']} connections for {concurrency} concurrent calls")
+                ok = False
+            if statistics.median(latencies) > plain_p50:
+                print("FAIL: pooled client is slower than A2AClient at p50")
+                ok = False
+        
+        # A pool smaller than the concurrency: calls queue for a connection
+        concurrency, limit = max(levels), max(1, min(pool_size, max(levels) // 5))
+        transport = PooledHTTPClient(pool_size=limit, keepalive_timeout=keepalive)
+        client = PooledA2AClient(endpoint, transport=transport)
+        peaks = {"open": 0, "waiting": 0}
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_pool(transport, peaks, stop))
+        latencies, elapsed = await load(client, total, concurrency)
+        stop.set()
+        await sampler
+        stats = transport.stats()
+        await transport.close()
+        print(
+            f"\npool of {limit} at concurrency {concurrency}: p50 {statistics.median(latencies) * 1000:.2f} ms, "
+            f"peak {peaks['open']} open / {peaks['waiting']} waiting, {stats['created']} opened, "
+            f"{stats['idle']} idle and {stats['waiting']} waiting at the end"
+        )
+        if peaks["open"] > limit or stats["created"] > limit:
+            print(f"FAIL: pool went over its limit of {limit} connections")
+            ok = False
+        if stats["waiting"] or stats["in_use"]:
+            print("FAIL: calls still holding or waiting for a connection after the run")
+            ok = False
+    finally:
+        server.stop()
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Tasks sent per run")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--latency", type=float, default=5.0, help="Stub agent latency in ms")
+    parser.add_argument("--pool-size", type=int, default=100, help="Connection pool size")
+    parser.add_argument("--keepalive", type=float, default=60.0, help="Idle connection keep-alive in seconds")
+    parser.add_argument(
+        "--agent-capacity", type=int, default=0,
+        help="Tasks the stub agent serves at once, the rest queue (0 = unlimited)"
+    )
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+    sys.exit(0 if asyncio.run(run(args.requests, levels, args.latency, args.pool_size, args.keepalive, args.agent_capacity)) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Agent load test: do concurrent A2A requests actually overlap?
+
+Serves the Weather Agent on the ASGI stack with an upstream that sleeps for
+`--latency` ms, fires `--requests` concurrent A2A tasks at /a2a/tasks/send
+and reports wall time and the peak number of requests in flight inside the
+handler. With full overlap wall time stays close to one request's latency.
+
+Pass --flask to run the same load against python_a2a's Flask server.
+
+    uv run python -m benchmarks.agent_load --requests 50 --latency 200
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+import uuid
+import aiohttp
+from benchmarks.stubs import UvicornServer, free_port
+from agents.weather.agent import create_weather_agent
+from shared.asgi import create_asgi_app
+
+weather_agent = create_weather_agent()
+handler = weather_agent.handler
+
+class InFlightProbe:
+    """Replaces the weather upstream with a sleep and tracks concurrency"""
+    
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+    
+    async def fetch(self, location: str, location_id: str):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        try:
+            await asyncio.sleep(self.latency)
+            return handler._get_mock_weather(location_id), False
+        finally:
+            with self._lock:
+                self.current -= 1
+
+def start_flask(port: int):
+    from python_a2a.server.http import create_flask_app
+    app = create_flask_app(weather_agent)
+    thread = threading.Thread(
+        target=app.run,
+        kwargs={"host": "127.0.0.1", "port": port, "threaded": True},
+        daemon=True
+    )
+    thread.start()
+    time.sleep(1.0)
+    return f"http://127.0.0.1:{port}"
+
+async def send(session: aiohttp.ClientSession, url: str, location: str):
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tasks/send",
+        "params": {
+            "id": str(uuid.uuid4()),
+            "message": {"content": {"type": "text", "text": location}, "role": "user"}
+        }
+    }
+    async with session.post(f"{url}/a2a/tasks/send", json=payload) as response:
+        response.raise_for_status()
+        return await response.json()
+
+async def run(url: str, total: int, probe: InFlightProbe):
+    connector = aiohttp.TCPConnector(limit=total)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await send(session, url, "warmup")
+        probe.peak = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(send(session, url, f"city-{i}") for i in range(total)))
+        return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="Concurrent requests")
+    parser.add_argument("--latency", type=float, default=200.0, help="Upstream latency in ms")
+    parser.add_argument("--flask", action="store_true", help="Use python_a2a's Flask server instead")
+    args = parser.parse_args()
+    
+    probe = InFlightProbe(args.latency)
+    handler._fetch_weather = probe.fetch
+    
+    server = None
+    if args.flask:
+        url = start_flask(free_port())
+    else:
+        server = UvicornServer(create_asgi_app(weather_agent)).start()
+        url = server.url
+    
+    try:
+        elapsed = asyncio.run(run(url, args.requests, probe))
+    finally:
+        if server:
+            server.stop()
+    
+    serial = args.requests * args.latency / 1000
+    print(f"server: {'flask' if args.flask else 'asgi'}")
+    print(f"requests: {args.requests}, upstream latency: {args.latency:.0f} ms")
+    print(f"wall time: {elapsed:.2f}s (fully serialized would be {serial:.2f}s)")
+    print(f"throughput: {args.requests / elapsed:.1f} req/s")
+    print(f"peak in-flight inside handler: {probe.peak}")
+
+if __name__ == "__main__":
+    main()
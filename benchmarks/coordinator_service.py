@@ -0,0 +1,183 @@
+"""
+Coordinator service under overload: admission control vs none.
+
+Serves agents.coordinator.service in front of stub Weather and Planning
+agents (--weather-ms / --planning-ms per call) and sends POST /plan at a
+fixed arrival rate (--rate per second for --duration seconds, open loop)
+well above what --max-in-flight trips at a time can serve. Runs twice:
+- no admission control: every request is accepted and queues somewhere,
+- --max-in-flight slots, --max-queue waiting, --max-wait seconds at most.
+Reports accepted/shed requests, p50/p99 latency of accepted requests and
+of 429 answers, and the peak coordinator_queue_depth scraped from /metrics.
+
+Checks that with admission control the accepted p99 stays under
+--max-p99-ms and below the run without it, that excess requests get 429
+with Retry-After quickly, and that queue depth and wait time show up in
+/metrics. Exits non-zero if a check fails.
+
+    uv run python -m benchmarks.coordinator_service --rate 200 --duration 3
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from typing import Any, Dict, List
+import aiohttp
+from benchmarks.stubs import AgentStub, StubServer, UvicornServer
+from shared.logger import configure_logging
+from shared.resilience import AdmissionController
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def metric_value(text: str, name: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(name + " ") or line.startswith(name + "{"):
+            return float(line.rsplit(" ", 1)[1])
+    return math.nan
+
+async def drive(url: str, rate: float, duration: float) -> Dict[str, Any]:
+    """Open-loop POST /plan at `rate` per second, scraping /metrics meanwhile"""
+    accepted, shed, failed = [], [], 0
+    retry_after_missing = 0
+    peak_depth = 0.0
+    
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        async def one(index: int):
+            nonlocal failed, retry_after_missing
+            started = time.perf_counter()
+            try:
+                async with session.post(f"{url}/plan", json={"location": f"City {index}", "timeout": 60}) as response:
+                    await response.read()
+                    elapsed = time.perf_counter() - started
+                    if response.status == 200:
+                        accepted.append(elapsed)
+                    elif response.status == 429:
+                        shed.append(elapsed)
+                        retry_after_missing += "Retry-After" not in response.headers
+                    else:
+                        failed += 1
+            except Exception:
+                failed += 1
+        
+        async def scrape(stop: asyncio.Event):
+            nonlocal peak_depth
+            while not stop.is_set():
+                async with session.get(f"{url}/metrics") as response:
+                    peak_depth = max(peak_depth, metric_value(await response.text(), "coordinator_queue_depth"))
+                await asyncio.sleep(0.05)
+        
+        stop = asyncio.Event()
+        scraper = asyncio.create_task(scrape(stop))
+        started = time.perf_counter()
+        tasks = []
+        for index in range(int(rate * duration)):
+            delay = started + index / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(index)))
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+        stop.set()
+        await scraper
+        async with session.get(f"{url}/metrics") as response:
+            exposition = await response.text()
+    
+    return {
+        "accepted": accepted,
+        "shed": shed,
+        "failed": failed,
+        "retry_after_missing": retry_after_missing,
+        "peak_depth": peak_depth,
+        "wait_count": metric_value(exposition, "coordinator_queue_wait_seconds_count"),
+        "wall": wall
+    }
+
+def serve(weather_url: str, planning_url: str, admission: AdmissionController) -> UvicornServer:
+    from agents.coordinator.orchestrator import TravelOrchestrator
+    from agents.coordinator.service import create_app
+    
+    orchestrator = TravelOrchestrator([weather_url], [planning_url])
+    return UvicornServer(create_app(orchestrator, admission)).start()
+
+def report(mode: str, result: Dict[str, Any]):
+    accepted, shed = result["accepted"], result["shed"]
+    print(
+        f"{mode:>16} | {len(accepted):>8} | {len(shed):>5} | {result['failed']:>6} | "
+        f"{percentile(accepted, 50) * 1000:>7.0f} | {percentile(accepted, 99) * 1000:>7.0f} | "
+        f"{percentile(shed, 99) * 1000:>8.1f} | {result['peak_depth']:>10.0f}"
+    )
+
+async def run(args) -> bool:
+    ok = True
+    weather = StubServer(AgentStub("weather", latency_ms=args.weather_ms).app()).start()
+    planning = StubServer(AgentStub("planning", latency_ms=args.planning_ms).app()).start()
+    capacity = args.max_in_flight / ((args.weather_ms + args.planning_ms) / 1000)
+    print(
+        f"{int(args.rate * args.duration)} requests at {args.rate:.0f}/s; "
+        f"{args.max_in_flight} slots serve about {capacity:.0f}/s\n"
+    )
+    print(f"{'mode':>16} | {'accepted':>8} | {'429s':>5} | {'failed':>6} | {'p50 ms':>7} | {'p99 ms':>7} | {'429 p99':>8} | {'peak queue':>10}")
+    print("-" * 90)
+    
+    try:
+        unbounded = AdmissionController(max_in_flight=10**6, max_queue=0, max_wait=math.inf)
+        server = serve(weather.url, planning.url, unbounded)
+        try:
+            baseline = await drive(server.url, args.rate, args.duration)
+        finally:
+            server.stop()
+        report("no admission", baseline)
+        
+        admission = AdmissionController(args.max_in_flight, args.max_queue, args.max_wait)
+        server = serve(weather.url, planning.url, admission)
+        try:
+            shedding = await drive(server.url, args.rate, args.duration)
+        finally:
+            server.stop()
+        report("admission", shedding)
+    finally:
+        weather.stop()
+        planning.stop()
+    
+    p99 = percentile(shedding["accepted"], 99) * 1000
+    print(f"\nadmission stats: {admission.stats()}")
+    if p99 > args.max_p99_ms or p99 >= percentile(baseline["accepted"], 99) * 1000:
+        print(f"FAIL: accepted p99 {p99:.0f} ms, budget {args.max_p99_ms:.0f} ms and below the run without admission")
+        ok = False
+    if not shedding["shed"] or shedding["retry_after_missing"]:
+        print("FAIL: expected 429 answers, all with Retry-After")
+        ok = False
+    if percentile(shedding["shed"], 99) * 1000 > args.max_shed_ms:
+        print(f"FAIL: 429 answers slower than {args.max_shed_ms:.0f} ms")
+        ok = False
+    if shedding["failed"]:
+        print(f"FAIL: {shedding['failed']} requests failed with admission control")
+        ok = False
+    if not shedding["peak_depth"] > 0 or not shedding["wait_count"] > 0:
+        print("FAIL: coordinator_queue_depth / coordinator_queue_wait_seconds missing from /metrics")
+        ok = False
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=200.0, help="Requests per second")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds of arrivals")
+    parser.add_argument("--weather-ms", type=float, default=20.0, help="Stub Weather Agent latency")
+    parser.add_argument("--planning-ms", type=float, default=100.0, help="Stub Planning Agent latency")
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--max-wait", type=float, default=0.5, help="Seconds a request may wait for a slot")
+    parser.add_argument("--max-p99-ms", type=float, default=1500.0, help="p99 of accepted requests with admission control")
+    parser.add_argument("--max-shed-ms", type=float, default=200.0, help="p99 of 429 answers")
+    args = parser.parse_args()
+    configure_logging(level="WARNING")
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+if __name__ == "__main__":
+    main()
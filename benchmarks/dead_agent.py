@@ -0,0 +1,69 @@
+"""
+Cost of a dead Planning Agent per trip: blind retries vs circuit breaker.
+
+Starts a healthy stub Weather Agent and a stub Planning Agent that always
+returns HTTP 500, then plans `--trips` trips one after another. The
+"blind" run disables the breaker and retry budget and retries every error
+with un-jittered 1 s / 2 s backoff, like the previous retry_async; the
+"breaker" run uses the orchestrator's defaults. Also plans one trip
+against a planning agent slower than the trip deadline.
+
+    uv run python -m benchmarks.dead_agent --trips 10
+"""
+
+import argparse
+import asyncio
+import time
+from agents.coordinator.orchestrator import TravelOrchestrator
+from benchmarks.stubs import AgentStub, StubServer
+from shared.resilience import CircuitBreaker
+
+async def plan_many(orchestrator: TravelOrchestrator, trips: int):
+    latencies = []
+    for _ in range(trips):
+        started = time.perf_counter()
+        await orchestrator.plan_trip("Hanoi")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def blind(orchestrator: TravelOrchestrator) -> TravelOrchestrator:
+    """Retry every error with fixed 1 s / 2 s backoff, no breaker and no budget"""
+    orchestrator.planning_breaker = CircuitBreaker("planning", failure_threshold=10 ** 9)
+    orchestrator.retry_budget = None
+    orchestrator.retryable_errors = (Exception,)
+    orchestrator.retry_config = dict(orchestrator.retry_config, max_delay=None, jitter=False)
+    return orchestrator
+
+async def run(trips: int, timeout: float):
+    weather = StubServer(AgentStub("weather", latency_ms=10).app()).start()
+    dead = StubServer(AgentStub("planning-dead", latency_ms=10, fail=True).app()).start()
+    slow = StubServer(AgentStub("planning-slow", latency_ms=timeout * 3000).app()).start()
+    try:
+        print(f"{'mode':>8} | {'trips':>5} | {'mean s':>7} | {'max s':>7} | {'total s':>7}")
+        print("-" * 48)
+        
+        latencies = await plan_many(blind(TravelOrchestrator([weather.url], [dead.url])), trips)
+        print(f"{'blind':>8} | {trips:>5} | {sum(latencies) / trips:>7.2f} | {max(latencies):>7.2f} | {sum(latencies):>7.2f}")
+        
+        orchestrator = TravelOrchestrator([weather.url], [dead.url])
+        latencies = await plan_many(orchestrator, trips)
+        print(f"{'breaker':>8} | {trips:>5} | {sum(latencies) / trips:>7.2f} | {max(latencies):>7.2f} | {sum(latencies):>7.2f}")
+        print(f"\nresilience: {orchestrator.resilience_stats()}")
+        
+        orchestrator = TravelOrchestrator([weather.url], [slow.url])
+        started = time.perf_counter()
+        result = await orchestrator.plan_trip("Hanoi", timeout=timeout)
+        print(f"\nslow agent, {timeout:.1f} s deadline: gave up after {time.perf_counter() - started:.2f} s ({result['errors']})")
+    finally:
+        for server in (weather, dead, slow):
+            server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trips", type=int, default=10, help="Trips planned one after another")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Trip deadline for the slow agent run, seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.trips, args.timeout))
+
+if __name__ == "__main__":
+    main()
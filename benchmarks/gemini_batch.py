@@ -0,0 +1,112 @@
+"""
+Bulk planning: one Gemini call per location vs batched multi-location prompts.
+
+A local fake model answers both prompt shapes and reports approximate token
+usage (~4 characters per token), so no API key or network is needed. Use
+--drop-every to make the model skip some locations in batched answers and
+exercise the individual retry path.
+
+    uv run python -m benchmarks.gemini_batch --locations 200 --batch-size 5 --latency 100
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from agents.planning.gemini_client import GeminiClient
+
+_BATCH_ITEM_RE = re.compile(r"^\[(\d+)\] Location: (.+)$", re.MULTILINE)
+
+ACTIVITIES = """🏛️ Old Quarter Walk
+Stroll the historic streets. Mild weather makes walking pleasant.
+
+☕ Egg Coffee Tasting
+Try the local speciality in a cozy cafe.
+
+🚲 Lakeside Cycling
+Ride around the lake while it is not too hot.
+"""
+
+class FakeUsage:
+    def __init__(self, prompt: str, text: str):
+        self.prompt_token_count = len(prompt) // 4
+        self.candidates_token_count = len(text) // 4
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+class FakeResponse:
+    def __init__(self, prompt: str, text: str):
+        self.text = text
+        self.usage_metadata = FakeUsage(prompt, text)
+
+class FakeModel:
+    """Answers single and batched prompts after sleeping for `latency_ms`"""
+    
+    def __init__(self, latency_ms: float, drop_every: int = 0):
+        self.latency = latency_ms / 1000
+        self.drop_every = drop_every
+        self.calls = 0
+        self.tokens = 0
+        self._answered = 0
+    
+    def generate_content(self, prompt, generation_config=None):
+        time.sleep(self.latency)
+        self.calls += 1
+        
+        items = _BATCH_ITEM_RE.findall(prompt)
+        if not items:
+            text = ACTIVITIES
+        else:
+            sections = []
+            for number, _ in items:
+                self._answered += 1
+                if self.drop_every and self._answered % self.drop_every == 0:
+                    continue
+                sections.append(f"=== {number} ===\n{ACTIVITIES}")
+            text = "\n".join(sections)
+        
+        response = FakeResponse(prompt, text)
+        self.tokens += response.usage_metadata.total_token_count
+        return response
+
+def make_items(count: int):
+    return [(f"city-{i}", f"Temperature: {20 + i % 15}°C, Condition: Cloudy, Humidity: 70%") for i in range(count)]
+
+async def run_mode(items, latency_ms: float, batch_size: int, drop_every: int):
+    model = FakeModel(latency_ms, drop_every)
+    client = GeminiClient(backend=model)
+    
+    start = time.perf_counter()
+    if batch_size > 1:
+        results = await client.generate_activities_batch(items, batch_size=batch_size, use_cache=False)
+    else:
+        results = await asyncio.gather(*(
+            client.generate_activities(location, weather, use_cache=False) for location, weather in items
+        ))
+    elapsed = time.perf_counter() - start
+    
+    assert len(results) == len(items) and all(result["count"] for result in results)
+    return model, client, elapsed
+
+async def run(locations: int, batch_size: int, latency_ms: float, drop_every: int):
+    items = make_items(locations)
+    print(f"locations: {locations}, fake model latency: {latency_ms:.0f} ms, batch size: {batch_size}")
+    print(f"{'mode':>12} | {'model calls':>11} | {'tokens/location':>15} | {'elapsed s':>9}")
+    print("-" * 58)
+    
+    for label, size in (("individual", 1), ("batched", batch_size)):
+        model, client, elapsed = await run_mode(items, latency_ms, size, drop_every)
+        print(f"{label:>12} | {model.calls:>11} | {model.tokens / locations:>15.1f} | {elapsed:>9.2f}")
+    
+    print(f"\nbatch stats: {client.batch_stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=200, help="Locations to plan")
+    parser.add_argument("--batch-size", type=int, default=5, help="Locations per batched prompt")
+    parser.add_argument("--latency", type=float, default=100.0, help="Fake model latency in ms")
+    parser.add_argument("--drop-every", type=int, default=0, help="Omit every Nth location from batched answers")
+    args = parser.parse_args()
+    asyncio.run(run(args.locations, args.batch_size, args.latency, args.drop_every))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Planning throughput with a blocking model call: inline vs off-loop executor.
+
+Uses a local fake model whose generate_content sleeps for N ms (blocking,
+like the real SDK), so no API key or network is needed.
+
+    uv run python -m benchmarks.gemini_concurrency --latency 200 --requests 32
+"""
+
+import argparse
+import asyncio
+import time
+from agents.planning.gemini_client import GeminiClient
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16]
+
+FAKE_RESPONSE = """🏛️ Old Quarter Walk
+Stroll the historic streets. Mild weather makes walking pleasant.
+
+☕ Egg Coffee Tasting
+Try the local speciality in a cozy cafe.
+"""
+
+class FakeResponse:
+    text = FAKE_RESPONSE
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel; blocks for `latency_ms`"""
+    
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+    
+    def generate_content(self, prompt, generation_config=None):
+        time.sleep(self.latency)
+        return FakeResponse()
+
+async def inline_generate(client: GeminiClient, location: str):
+    """The previous implementation: the blocking call runs on the event loop"""
+    response = client.model.generate_content(location, generation_config=client.generation_config)
+    return client._parse_response(response.text)
+
+async def offloop_generate(client: GeminiClient, location: str):
+    """The current implementation"""
+    return await client.generate_activities(location, "Temperature: 22°C, Condition: Cloudy", use_cache=False)
+
+async def run_level(generate, client: GeminiClient, total: int, concurrency: int) -> float:
+    """Issue `total` generations with `concurrency` callers, return generations/second"""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def one(i: int):
+        async with semaphore:
+            await generate(client, f"city-{i}")
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start)
+
+async def run(total: int, latency_ms: float):
+    client = GeminiClient(backend=FakeModel(latency_ms))
+    ideal_single = 1000 / latency_ms
+    
+    print(f"fake model latency: {latency_ms:.0f} ms, in-flight limit: {client.max_concurrency}")
+    print(f"{'concurrency':>12} | {'inline gen/s':>13} | {'off-loop gen/s':>15} | {'ideal gen/s':>12}")
+    print("-" * 62)
+    for concurrency in CONCURRENCY_LEVELS:
+        inline = await run_level(inline_generate, client, total, concurrency)
+        offloop = await run_level(offloop_generate, client, total, concurrency)
+        ideal = ideal_single * min(concurrency, client.max_concurrency)
+        print(f"{concurrency:>12} | {inline:>13.1f} | {offloop:>15.1f} | {ideal:>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=32, help="Generations per concurrency level")
+    parser.add_argument("--latency", type=float, default=100.0, help="Fake model latency in ms")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.latency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Startup cost: import time per module and agent construction time.
+
+Each measurement runs in a fresh interpreter under `python -X importtime`
+and reports the module's cumulative import time, the slowest modules it
+pulls in and whether it loaded one of the heavy dependencies (Gemini SDK,
+python_a2a, FastAPI). Agent packages and the Gemini client must stay
+under --budget-ms without loading those; the agent servers (which need
+python_a2a) are checked against --agent-budget-ms when given. Exits
+non-zero if a budget is exceeded.
+
+    uv run python -m benchmarks.import_time --budget-ms 300 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+
+HEAVY = ("google.generativeai", "python_a2a", "fastapi")
+
+# Modules that must import without the heavy dependencies
+LIGHT_MODULES = [
+    "agents.planning",
+    "agents.weather",
+    "agents.coordinator",
+    "agents.planning.backends",
+    "agents.planning.gemini_client",
+]
+
+# Importing the module and building the server, with the simulator backend
+AGENTS = {
+    "planning agent": "from agents.planning.agent import create_planning_agent; create_planning_agent()",
+    "weather agent": "from agents.weather.agent import create_weather_agent; create_weather_agent()",
+}
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def run_probe(code: str) -> Tuple[float, List[str], List[Tuple[float, str]]]:
+    """(wall seconds, heavy modules loaded, [(cumulative ms, module)]) in a fresh interpreter"""
+    env = dict(os.environ, LLM_BACKEND="simulator", LOG_LEVEL="WARNING")
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(code=code, heavy=HEAVY)],
+        capture_output=True, text=True, env=env, check=True
+    )
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    
+    # "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative) / 1000, name[1:].rstrip()))
+    return result["seconds"], result["heavy"], modules
+
+def slowest_imports(modules: List[Tuple[float, str]], root: str, limit: int) -> List[Tuple[float, str]]:
+    """Slowest modules imported directly by `root` (importtime lists children before their parent)"""
+    children = []
+    for ms, name in modules:
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            if name == root:
+                return sorted(children, reverse=True)[:limit]
+            children = []
+        elif depth == 1:
+            children.append((ms, name.strip()))
+    return []
+
+def measure(code: str, repeat: int) -> Tuple[float, List[str], List[Tuple[float, str]]]:
+    """Best of `repeat` runs (the first run also warms the bytecode cache)"""
+    runs = [run_probe(code) for _ in range(repeat)]
+    return min(runs, key=lambda run: run[0])
+
+def run(budget_ms: float, agent_budget_ms: Optional[float], repeat: int, show: int) -> bool:
+    ok = True
+    print(f"{'import':>32} | {'ms':>8} | {'budget':>7} | heavy modules loaded")
+    print("-" * 80)
+    for module in LIGHT_MODULES:
+        seconds, heavy, _ = measure(f"import {module}", repeat)
+        ms = seconds * 1000
+        passed = ms <= budget_ms and not heavy
+        ok &= passed
+        print(f"{module:>32} | {ms:>8.1f} | {budget_ms:>7.0f} | {', '.join(heavy) or '-'}{'' if passed else '  FAIL'}")
+    
+    print()
+    for name, code in AGENTS.items():
+        seconds, heavy, modules = measure(code, repeat)
+        ms = seconds * 1000
+        passed = agent_budget_ms is None or ms <= agent_budget_ms
+        ok &= passed
+        budget = f"{agent_budget_ms:>7.0f}" if agent_budget_ms is not None else f"{'-':>7}"
+        print(f"{name:>32} | {ms:>8.1f} | {budget} | {', '.join(heavy) or '-'}{'' if passed else '  FAIL'}")
+        for module_ms, module in slowest_imports(modules, code.split()[1], show):
+            print(f"{module:>36} {module_ms:>8.1f} ms")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="Import budget for packages and the Gemini client")
+    parser.add_argument("--agent-budget-ms", type=float, default=None, help="Budget for importing and building each agent")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument("--show", type=int, default=5, help="Slowest imports listed per agent module")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.budget_ms, args.agent_budget_ms, args.repeat, args.show) else 1)
+
+if __name__ == "__main__":
+    main()
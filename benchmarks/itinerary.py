@@ -0,0 +1,107 @@
+"""
+Multi-day itineraries: one forecast call and one planning call per weather group.
+
+Starts both agents in this process (mock forecast, fake Gemini model with
+--latency ms per call, LLM cache off) and, for each location, plans a
+--days day itinerary three ways:
+- one plan_trip per day, one after the other (what N-day trips cost before),
+- one planning call per day of the forecast, all days concurrently (no grouping),
+- TravelOrchestrator.plan_itinerary: days with equivalent weather grouped,
+  groups planned concurrently.
+Reports wall time and model calls for each, next to a single plan_trip.
+
+Checks that every itinerary day is planned with consecutive dates, that
+plan_itinerary makes exactly one model call per distinct weather group,
+and that its wall time stays within --max-ratio of a single plan_trip.
+Exits non-zero if a check fails.
+
+    uv run python -m benchmarks.itinerary --days 7 --latency 300
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from benchmarks.load_test import start_agents
+from shared.logger import configure_logging
+
+LOCATIONS = ["Da Nang", "Hanoi", "Hue"]
+
+async def run(days: int, latency_ms: float, max_ratio: float) -> bool:
+    ok = True
+    weather, planning, model, _ = start_agents(SimpleNamespace(
+        llm_cache=False,
+        gemini_concurrency=days * 2,
+        weather_cache=True,
+        gemini_latency_ms=latency_ms,
+        gemini_jitter_ms=0.0,
+        output_tokens=300,
+        ms_per_token=0.0,
+        gemini_fail_rate=0.0,
+        seed=0
+    ))
+    from agents.coordinator.orchestrator import TravelOrchestrator
+    orchestrator = TravelOrchestrator([weather.url], [planning.url])
+    start = date.today()
+    
+    async def timed(call):
+        calls = model.calls
+        started = time.perf_counter()
+        result = await call
+        return result, time.perf_counter() - started, model.calls - calls
+    
+    try:
+        await orchestrator.plan_trip(LOCATIONS[0])   # warm up clients and connections
+        print(f"{days}-day trips, model latency {latency_ms:.0f} ms\n")
+        print(f"{'location':>10} | {'mode':>22} | {'wall s':>6} | {'model calls':>11}")
+        print("-" * 60)
+        for location in LOCATIONS:
+            _, single, _ = await timed(orchestrator.plan_trip(location))
+            print(f"{location:>10} | {'single plan_trip':>22} | {single:>6.2f} | {1:>11}")
+            
+            async def sequential():
+                for _ in range(days):
+                    await orchestrator.plan_trip(location)
+            
+            _, elapsed, calls = await timed(sequential())
+            print(f"{'':>10} | {'plan_trip per day':>22} | {elapsed:>6.2f} | {calls:>11}")
+            
+            forecast = await orchestrator._get_forecast(location, start, days)
+            _, elapsed, calls = await timed(asyncio.gather(*(
+                orchestrator._get_activities(location, report.to_text(), report, additional_context=f"Day {offset + 1}")
+                for offset, report in enumerate(forecast.days)
+            )))
+            print(f"{'':>10} | {'per day, concurrent':>22} | {elapsed:>6.2f} | {calls:>11}")
+            
+            result, elapsed, calls = await timed(orchestrator.plan_itinerary(location, days, start=start))
+            print(f"{'':>10} | {'plan_itinerary':>22} | {elapsed:>6.2f} | {calls:>11}")
+            
+            expected_dates = [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+            dates = [day["date"] for day in result["itinerary"]]
+            if not result["success"] or dates != expected_dates or not all(day["activities"] for day in result["itinerary"]):
+                print(f"FAIL: {location}: itinerary incomplete ({result['errors']})")
+                ok = False
+            if calls != result["planning_calls"]:
+                print(f"FAIL: {location}: {calls} model calls for {result['planning_calls']} weather groups")
+                ok = False
+            if elapsed > single * max_ratio:
+                print(f"FAIL: {location}: itinerary took {elapsed / single:.1f}x a single trip (max {max_ratio}x)")
+                ok = False
+    finally:
+        weather.stop()
+        planning.stop()
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7, help="Trip length")
+    parser.add_argument("--latency", type=float, default=300.0, help="Fake model latency per call in ms")
+    parser.add_argument("--max-ratio", type=float, default=1.6, help="Itinerary wall time over a single plan_trip")
+    args = parser.parse_args()
+    configure_logging(level="WARNING")
+    sys.exit(0 if asyncio.run(run(args.days, args.latency, args.max_ratio)) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Record/replay and simulator backends.
+
+Records the simulator through RecordingBackend (plain and streamed calls),
+then replays the recording at latency scale 1 and 0 and checks that the
+answers are identical, parse into activities and take the recorded time
+(scaled). Also runs a GeminiClient on the replayed recording. Exits
+non-zero if a check fails.
+
+    uv run python -m benchmarks.llm_backends --prompts 20 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from agents.planning.backends import RecordingBackend, ReplayBackend, ReplayMissError, SimulatorBackend
+from agents.planning.parser import ActivityStreamParser
+
+WEATHERS = ["Sunny, 31°C", "Light rain, 24°C", "Cloudy, 22°C", "Clear sky, 27°C"]
+
+def prompts(count: int):
+    return [
+        f"Location: City {i}\nWeather: {WEATHERS[i % len(WEATHERS)]}\n\nPlease suggest 3-5 activities."
+        for i in range(count)
+    ]
+
+def parse(text: str):
+    parser = ActivityStreamParser()
+    return parser.feed(text) + parser.close()
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+def run(count: int, latency_ms: float, tokens_per_second: float) -> bool:
+    ok = True
+    
+    def check(condition: bool, message: str):
+        nonlocal ok
+        if not condition:
+            print(f"FAIL: {message}")
+            ok = False
+    
+    simulator = SimulatorBackend(latency_ms=latency_ms, tokens_per_second=tokens_per_second)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "recording.jsonl"
+        recorder = RecordingBackend(simulator, path)
+        
+        recorded = []
+        record_time = 0.0
+        for prompt in prompts(count):
+            (response, elapsed) = timed(lambda: recorder.generate_content(prompt))
+            recorded.append(response.text)
+            record_time += elapsed
+        (streamed, stream_time) = timed(lambda: "".join(c.text for c in recorder.generate_content(prompts(1)[0], stream=True)))
+        check(recorder.recorded == count + 1, f"{recorder.recorded} calls recorded, expected {count + 1}")
+        check(all(3 <= len(parse(text)) <= 5 for text in recorded), "simulator answers should parse into 3-5 activities")
+        check(recorded == [simulator.answer(p) for p in prompts(count)], "simulator should be deterministic")
+        
+        print(f"{'mode':>12} | {'calls':>5} | {'total s':>7} | {'ms/call':>7}")
+        print("-" * 42)
+        print(f"{'record':>12} | {count:>5} | {record_time:>7.2f} | {record_time / count * 1000:>7.1f}")
+        
+        for scale in (1.0, 0.0):
+            replay = ReplayBackend(path, latency_scale=scale)
+            replayed = []
+            replay_time = 0.0
+            for prompt in prompts(count):
+                (response, elapsed) = timed(lambda: replay.generate_content(prompt))
+                replayed.append(response.text)
+                replay_time += elapsed
+            print(f"{f'replay x{scale:g}':>12} | {count:>5} | {replay_time:>7.2f} | {replay_time / count * 1000:>7.1f}")
+            
+            check(replayed == recorded, f"replay x{scale:g} answers differ from the recording")
+            if scale:
+                check(abs(replay_time - record_time) <= 0.2 * record_time + 0.05,
+                      f"replay x1 took {replay_time:.2f}s, recording took {record_time:.2f}s")
+            else:
+                check(replay_time < 0.1 * record_time, f"replay x0 took {replay_time:.2f}s")
+            
+            # The second recording of prompt 0 is the streamed one
+            (text, elapsed) = timed(lambda: "".join(c.text for c in replay.generate_content(prompts(1)[0], stream=True)))
+            check(text == streamed, f"replay x{scale:g} stream differs from the recording")
+            if scale:
+                check(elapsed >= 0.8 * stream_time, f"stream replayed in {elapsed:.2f}s, recorded in {stream_time:.2f}s")
+            
+            try:
+                replay.generate_content("Location: Nowhere\nWeather: Sunny")
+                check(False, "unknown prompt should raise ReplayMissError")
+            except ReplayMissError:
+                pass
+        
+        # GeminiClient on the recording: same activities as the simulator produced
+        from config.setting import settings
+        settings.LLM_CACHE_ENABLED = False
+        from agents.planning.gemini_client import GeminiClient
+        client = GeminiClient(backend=SimulatorBackend(latency_ms=0, tokens_per_second=0))
+        prompt = client._create_prompt("Da Nang", "Sunny, 31°C", None)
+        RecordingBackend(client.model, path).generate_content(prompt)
+        client.model = ReplayBackend(path, latency_scale=0)
+        result = asyncio.run(client.generate_activities("Da Nang", "Sunny, 31°C"))
+        check(result["activities"] == parse(simulator.answer(prompt)), "GeminiClient on replay returned other activities")
+        print(f"\nGeminiClient on replay: {result['count']} activities for Da Nang")
+    
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=20, help="Distinct prompts recorded")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulator time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0, help="Simulator generation speed")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.prompts, args.latency_ms, args.tokens_per_second) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Offline load test of the whole system: coordinator -> Weather Agent ->
+Planning Agent, with no API key or network.
+
+Starts both agents in this process on local ports (mock weather data, a
+fake Gemini model with configurable latency and output size) and drives
+TravelOrchestrator.plan_trip with trips from a JSONL workload, either at a
+fixed arrival rate (--rate, open loop) or with a fixed number of trips in
+flight (--concurrency, closed loop). Each workload line is
+{"location": "Hanoi"} with an optional "timeout" in seconds; the file is
+replayed in order and repeated until --requests trips have been sent.
+
+Prints a JSON summary: throughput, error rate and p50/p95/p99 latency for
+the weather step, the planning step and the whole trip. With --max-p99-ms
+or --max-error-rate, exits non-zero when the run is worse.
+
+    uv run python -m benchmarks.load_test --workload benchmarks/workload.jsonl --concurrency 20 --requests 500
+    uv run python -m benchmarks.load_test --rate 50 --requests 1000 --gemini-latency-ms 300 --output-tokens 400
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from benchmarks.stubs import UvicornServer
+from config.setting import settings
+from shared.logger import configure_logging
+
+ACTIVITY = "{emoji} Activity {index}\n{body}\n\n"
+EMOJIS = ["🏛️", "☕", "🚲", "🍜", "🏖️", "🎨"]
+
+class FakeResponse:
+    """generate_content result with usage metadata (~4 characters per token)"""
+    
+    def __init__(self, prompt: str, text: str):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=len(prompt) // 4,
+            candidates_token_count=len(text) // 4,
+            total_token_count=(len(prompt) + len(text)) // 4
+        )
+
+class LoadTestModel:
+    """
+    Fake genai.GenerativeModel. Each call blocks (like the SDK) for
+    latency_ms plus up to jitter_ms, plus ms_per_token for every output
+    token, and answers about `output_tokens` tokens (~4 characters each)
+    spread over `activities` activities. fail_rate makes calls raise.
+    """
+    
+    def __init__(
+        self,
+        latency_ms: float,
+        jitter_ms: float = 0.0,
+        output_tokens: int = 300,
+        ms_per_token: float = 0.0,
+        activities: int = 4,
+        fail_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_token = ms_per_token
+        self.fail_rate = fail_rate
+        self._random = random.Random(seed)
+        body = "Lorem ipsum dolor sit amet. " * max(1, output_tokens * 4 // activities // 28)
+        self.text = "".join(
+            ACTIVITY.format(emoji=EMOJIS[i % len(EMOJIS)], index=i + 1, body=body.strip())
+            for i in range(activities)
+        )
+        self.output_tokens = len(self.text) // 4
+        self.calls = 0
+        self.failures = 0
+    
+    def _wait(self):
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms) + self.ms_per_token * self.output_tokens
+        time.sleep(delay / 1000)
+        self.calls += 1
+        if self.fail_rate and self._random.random() < self.fail_rate:
+            self.failures += 1
+            raise RuntimeError("fake Gemini failure")
+    
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        if stream:
+            return self._stream(prompt)
+        self._wait()
+        return FakeResponse(prompt, self.text)
+    
+    def _stream(self, prompt):
+        self._wait()
+        blocks = self.text.split("\n\n")
+        for i, block in enumerate(blocks):
+            last = i == len(blocks) - 1
+            yield FakeResponse(prompt, block if last else block + "\n\n")
+
+def load_workload(path: Optional[Path]) -> List[Dict[str, Any]]:
+    """Trips from a JSONL file, or one trip per mock weather location"""
+    if path is None:
+        from agents.weather.config import MOCK_WEATHER_DATA
+        return [{"location": location.title()} for location in MOCK_WEATHER_DATA]
+    
+    trips = []
+    with open(path, encoding="utf-8") as workload:
+        for number, line in enumerate(workload, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            trip = json.loads(line)
+            if not isinstance(trip, dict) or not trip.get("location"):
+                raise ValueError(f"{path}:{number}: expected an object with a location")
+            trips.append(trip)
+    if not trips:
+        raise ValueError(f"{path}: no trips")
+    return trips
+
+def start_agents(args):
+    """Start both agents on local ports with mock weather and the fake model"""
+    settings.GEMINI_API_KEY = settings.GEMINI_API_KEY or "offline-load-test"
+    settings.LLM_CACHE_ENABLED = args.llm_cache
+    settings.GEMINI_MAX_CONCURRENCY = args.gemini_concurrency
+    
+    from shared.asgi import create_asgi_app
+    from agents.weather.agent import create_weather_agent
+    from agents.planning.agent import create_planning_agent
+    from agents.planning.gemini_client import GeminiClient
+    
+    weather_agent = create_weather_agent()
+    weather_agent.handler.use_mock = True
+    if not args.weather_cache:
+        weather_agent.handler.cache.max_size = 0
+    model = LoadTestModel(
+        args.gemini_latency_ms,
+        args.gemini_jitter_ms,
+        args.output_tokens,
+        args.ms_per_token,
+        fail_rate=args.gemini_fail_rate,
+        seed=args.seed
+    )
+    client = GeminiClient(backend=model)
+    planning_agent = create_planning_agent(client)
+    
+    weather = UvicornServer(create_asgi_app(weather_agent)).start()
+    planning = UvicornServer(create_asgi_app(planning_agent)).start()
+    return weather, planning, model, client
+
+def create_orchestrator(weather_url: str, planning_url: str):
+    from agents.coordinator.orchestrator import TravelOrchestrator
+    
+    class TimedOrchestrator(TravelOrchestrator):
+        """Records the duration and outcome of each step"""
+        
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.latencies: Dict[str, List[float]] = defaultdict(list)
+            self.errors: Dict[str, int] = defaultdict(int)
+        
+        async def _timed(self, stage: str, call):
+            started = time.perf_counter()
+            try:
+                result = await call
+            except Exception:
+                self.errors[stage] += 1
+                raise
+            self.latencies[stage].append(time.perf_counter() - started)
+            return result
+        
+        async def _get_weather(self, *args, **kwargs):
+            return await self._timed("weather", super()._get_weather(*args, **kwargs))
+        
+        async def _get_activities(self, *args, **kwargs):
+            return await self._timed("planning", super()._get_activities(*args, **kwargs))
+    
+    return TimedOrchestrator([weather_url], [planning_url])
+
+def percentile(ordered: List[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def summarize(latencies: List[float], errors: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    summary: Dict[str, Any] = {"count": len(ordered), "errors": errors}
+    if ordered:
+        summary.update({
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2)
+        })
+    return summary
+
+async def drive(orchestrator, trips: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    """Send args.requests trips at args.rate per second or args.concurrency at a time"""
+    trip_latencies: List[float] = []
+    failures = 0
+    
+    async def one(trip: Dict[str, Any]):
+        nonlocal failures
+        started = time.perf_counter()
+        result = await orchestrator.plan_trip(trip["location"], timeout=trip.get("timeout"))
+        if result["success"]:
+            trip_latencies.append(time.perf_counter() - started)
+        else:
+            failures += 1
+    
+    schedule = [trips[i % len(trips)] for i in range(args.requests)]
+    started = time.perf_counter()
+    if args.rate:
+        # Open loop: start trips on schedule whether or not earlier ones finished
+        tasks = []
+        for i, trip in enumerate(schedule):
+            delay = started + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(trip)))
+        await asyncio.gather(*tasks)
+    else:
+        queue = iter(schedule)
+        
+        async def worker():
+            for trip in queue:
+                await one(trip)
+        
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "requests": args.requests,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "error_rate": round(failures / args.requests, 4),
+        "stages": {
+            "weather": summarize(orchestrator.latencies["weather"], orchestrator.errors["weather"]),
+            "planning": summarize(orchestrator.latencies["planning"], orchestrator.errors["planning"]),
+            "trip": summarize(trip_latencies, failures)
+        }
+    }
+
+async def run(args) -> Dict[str, Any]:
+    trips = load_workload(args.workload)
+    weather, planning, model, client = start_agents(args)
+    try:
+        # The A2A client is blocking underneath; give it enough threads
+        in_flight = args.concurrency if not args.rate else max(16, int(args.rate * 2))
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=in_flight * 2))
+        
+        orchestrator = create_orchestrator(weather.url, planning.url)
+        if args.warmup:
+            await asyncio.gather(*(
+                orchestrator.plan_trip(trips[i % len(trips)]["location"]) for i in range(args.warmup)
+            ))
+            orchestrator.latencies.clear()
+            orchestrator.errors.clear()
+            model.calls = model.failures = 0
+            client.usage = type(client.usage)()
+        
+        report = await drive(orchestrator, trips, args)
+    finally:
+        weather.stop()
+        planning.stop()
+    
+    report["config"] = {
+        "mode": "rate" if args.rate else "concurrency",
+        "rate": args.rate,
+        "concurrency": None if args.rate else args.concurrency,
+        "workload": str(args.workload) if args.workload else None,
+        "workload_trips": len(trips),
+        "gemini_latency_ms": args.gemini_latency_ms,
+        "gemini_jitter_ms": args.gemini_jitter_ms,
+        "gemini_concurrency": args.gemini_concurrency,
+        "output_tokens": model.output_tokens,
+        "llm_cache": args.llm_cache,
+        "weather_cache": args.weather_cache
+    }
+    # Failed generations are answered with fallback activities, not errors
+    report["gemini"] = {"calls": model.calls, "failures": model.failures, "usage": client.usage_stats()}
+    return report
+
+def check(report: Dict[str, Any], args) -> List[str]:
+    problems = []
+    trip = report["stages"]["trip"]
+    if args.max_p99_ms is not None and trip.get("p99_ms", float("inf")) > args.max_p99_ms:
+        problems.append(f"trip p99 {trip.get('p99_ms')} ms > {args.max_p99_ms} ms")
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        problems.append(f"error rate {report['error_rate']} > {args.max_error_rate}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workload", type=Path, help="JSONL file of trips (default: the mock weather locations)")
+    parser.add_argument("--requests", type=int, default=200, help="Trips to send")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--rate", type=float, help="Trips started per second (open loop)")
+    load.add_argument("--concurrency", type=int, default=10, help="Trips in flight (closed loop)")
+    parser.add_argument("--warmup", type=int, default=0, help="Trips planned before measuring")
+    parser.add_argument("--gemini-latency-ms", type=float, default=200.0, help="Fake model latency per call")
+    parser.add_argument("--gemini-jitter-ms", type=float, default=50.0, help="Extra random latency, up to this")
+    parser.add_argument("--ms-per-token", type=float, default=0.0, help="Extra latency per output token")
+    parser.add_argument("--output-tokens", type=int, default=300, help="Approximate output tokens per answer")
+    parser.add_argument("--gemini-fail-rate", type=float, default=0.0, help="Fraction of model calls that fail")
+    parser.add_argument("--gemini-concurrency", type=int, default=settings.GEMINI_MAX_CONCURRENCY, help="Gemini worker threads")
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the LLM response cache on")
+    parser.add_argument("--no-weather-cache", dest="weather_cache", action="store_false", help="Disable the weather cache")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for latency jitter and failures")
+    parser.add_argument("--output", type=Path, help="Also write the JSON summary to this file")
+    parser.add_argument("--max-p99-ms", type=float, help="Fail if the trip p99 is above this")
+    parser.add_argument("--max-error-rate", type=float, help="Fail if the error rate is above this")
+    args = parser.parse_args()
+    if args.requests < 1 or (args.rate is not None and args.rate <= 0) or args.concurrency < 1:
+        parser.error("--requests, --rate and --concurrency must be positive")
+    
+    configure_logging(level="ERROR")
+    report = asyncio.run(run(args))
+    problems = check(report, args)
+    report["passed"] = not problems
+    
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
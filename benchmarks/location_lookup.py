@@ -0,0 +1,215 @@
+"""
+Location resolution cost over a large gazetteer.
+
+Builds a synthetic gazetteer of accented Vietnamese-style place names
+(--places, default 100k) and times LocationResolver lookups per query kind:
+exact accented names, unaccented/compact spellings, names with qualifiers
+(", Vietnam", "City"), unique prefixes, one-letter typos (trigram index)
+and unknown names. Lookups are timed with the memo disabled, then again
+through the memo. A linear edit-distance scan over every spelling is timed
+on a few typos for comparison, and the old `lower().strip()` exact lookup is
+reported for how many spellings it would resolve.
+
+Typos are only kept when the misspelling is one edit away from a single
+place and long enough for one edit to count as a typo, so the right answer
+is well defined. Checks that spelling variants and unknown names resolve
+correctly, that typos do in at least --min-fuzzy-accuracy of cases, that
+prefix and typo matches keep their own cache key, and the uncached p99 of
+indexed lookups (--budget-us) and of fuzzy ones (--fuzzy-budget-ms). Exits
+non-zero if a check fails.
+
+    uv run python -m benchmarks.location_lookup --places 100000 --queries 2000
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from shared.locations import LOCATIONS, Location, LocationResolver, fold
+
+INITIALS = ["B", "C", "Ch", "D", "Đ", "G", "Gi", "H", "Kh", "L", "M", "N", "Ng", "Nh", "Ph", "Qu", "S", "T", "Th", "Tr", "V", "X"]
+RHYMES = ["a", "à", "ạ", "ắc", "ăn", "ân", "ầu", "ê", "ền", "i", "inh", "ình", "o", "ồ", "ôn", "ơ", "ớn", "u", "ùng", "ư", "ương", "ướng", "yên", "oai", "uy", "iêm"]
+
+def syllable(rng: random.Random) -> str:
+    return rng.choice(INITIALS) + rng.choice(RHYMES)
+
+def build_gazetteer(count: int, seed: int) -> List[Location]:
+    """`count` places whose folded spellings are unique, one or two with an ASCII alias"""
+    rng = random.Random(seed)
+    seen = {fold(spelling).replace(" ", "") for location in LOCATIONS for spelling in (location.id, location.name, *location.aliases)}
+    places = []
+    while len(places) < count:
+        name = " ".join(syllable(rng) for _ in range(rng.choice((2, 2, 3, 3, 4))))
+        key = fold(name).replace(" ", "")
+        if key in seen:
+            continue
+        seen.add(key)
+        places.append(Location(id=f"place-{len(places)}", name=name, country="VN"))
+    return places
+
+def one_edit(key: str) -> Set[str]:
+    """Strings one deletion, replacement or insertion away from key"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    variants = set()
+    for i in range(len(key) + 1):
+        if i < len(key):
+            variants.add(key[:i] + key[i + 1:])
+            variants.update(key[:i] + char + key[i + 1:] for char in letters)
+        variants.update(key[:i] + char + key[i:] for char in letters)
+    return variants
+
+def unknown_name(rng: random.Random) -> str:
+    """A name built from letters no gazetteer syllable uses"""
+    return " ".join(
+        "".join(rng.choice("fjwz") + rng.choice("aeiou") for _ in range(rng.randint(2, 3))).title()
+        for _ in range(2)
+    )
+
+def typo(name: str, rng: random.Random) -> str:
+    """Replace, drop or double one letter of the folded name"""
+    letters = list(fold(name))
+    positions = [i for i, char in enumerate(letters) if char != " "]
+    i = rng.choice(positions)
+    edit = rng.choice(("replace", "drop", "double"))
+    if edit == "replace":
+        letters[i] = rng.choice("abcdeghiklmnopqrstuvxy")
+    elif edit == "drop":
+        del letters[i]
+    else:
+        letters.insert(i, letters[i])
+    return "".join(letters)
+
+def build_queries(places: List[Location], resolver: LocationResolver, count: int, seed: int) -> Dict[str, List[Tuple[str, Optional[str]]]]:
+    """{kind: [(query, expected location ID or None)]}"""
+    rng = random.Random(seed)
+    sample = rng.sample(places, count)
+    queries = {
+        "exact, accented": [(place.name, place.id) for place in sample],
+        "unaccented": [(fold(place.name).upper(), place.id) for place in sample],
+        "compact": [(fold(place.name).replace(" ", ""), place.id) for place in sample],
+        "qualified": [(f"{place.name} City, Việt Nam", place.id) for place in sample],
+        "prefix": [],
+        "typo": [],
+        "unknown": [(unknown_name(rng), None) for _ in sample],
+    }
+    for place in sample:
+        # The name without its last two letters, when no other place starts that way
+        key = fold(place.name).replace(" ", "")
+        if len(key) > 8 and resolver._prefix(key[:-2]) is place:
+            queries["prefix"].append((key[:-2], place.id))
+        misspelled = typo(place.name, rng)
+        compact = misspelled.replace(" ", "")
+        neighbours = {resolver._by_key.get(variant) for variant in one_edit(compact)}
+        if compact != key and neighbours - {None} == {place} and resolver._typo_distance(compact, key) is not None:
+            queries["typo"].append((misspelled, place.id))
+    return queries
+
+def timed(lookup: Callable[[str], Optional[Location]], queries: List[Tuple[str, Optional[str]]]) -> Tuple[List[float], int]:
+    """(per-lookup microseconds, correct lookups)"""
+    durations = []
+    correct = 0
+    for query, expected in queries:
+        started = time.perf_counter()
+        location = lookup(query)
+        durations.append((time.perf_counter() - started) * 1e6)
+        correct += (location.id if location else None) == expected
+    return durations, correct
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def linear_scan(resolver: LocationResolver) -> Callable[[str], Optional[Location]]:
+    """Closest spelling within typo distance over every spelling, without the index"""
+    def lookup(text: str) -> Optional[Location]:
+        query = fold(text).replace(" ", "")
+        best, best_distance = None, None
+        for key in resolver._keys:
+            distance = resolver._typo_distance(query, key)
+            if distance is not None and (best_distance is None or distance < best_distance):
+                best, best_distance = key, distance
+        return resolver._by_key[best] if best else None
+    return lookup
+
+def run(
+    places_count: int,
+    query_count: int,
+    budget_us: float,
+    fuzzy_budget_ms: float,
+    min_fuzzy_accuracy: float,
+    seed: int
+) -> bool:
+    ok = True
+    places = build_gazetteer(places_count, seed)
+    started = time.perf_counter()
+    resolver = LocationResolver([*LOCATIONS, *places], memo_size=0)
+    build_seconds = time.perf_counter() - started
+    stats = resolver.stats()
+    print(
+        f"gazetteer: {stats['locations']} places, {stats['spellings']} spellings, "
+        f"{stats['trigrams']} trigrams, indexed in {build_seconds:.2f}s\n"
+    )
+    
+    queries = build_queries(places, resolver, query_count, seed)
+    resolver.resolve("warm up the prefix index")
+    old_index = {fold(place.name): place for place in places}
+    
+    print(f"{'query':>16} | {'n':>5} | {'p50 us':>7} | {'p99 us':>7} | {'memo us':>7} | {'correct':>7} | {'lower().strip()':>15}")
+    print("-" * 84)
+    memoized = LocationResolver([*LOCATIONS, *places], memo_size=query_count * 8)
+    uncached = {"indexed": [], "fuzzy": []}
+    for kind, items in queries.items():
+        durations, correct = timed(resolver.resolve, items)
+        uncached["fuzzy" if kind in ("typo", "unknown") else "indexed"] += durations
+        timed(memoized.resolve, items)
+        memo_durations, _ = timed(memoized.resolve, items)
+        old_correct = sum(
+            (old_index[query.lower().strip()].id if query.lower().strip() in old_index else None) == expected
+            for query, expected in items
+        )
+        accuracy = correct / len(items)
+        print(
+            f"{kind:>16} | {len(items):>5} | {percentile(durations, 50):>7.1f} | {percentile(durations, 99):>7.1f} | "
+            f"{percentile(memo_durations, 50):>7.2f} | {accuracy:>6.1%} | {old_correct / len(items):>14.1%}"
+        )
+        required = min_fuzzy_accuracy if kind == "typo" else 1.0
+        if accuracy < required:
+            print(f"FAIL: {kind} resolved {accuracy:.1%} correctly, need {required:.0%}")
+            ok = False
+        if kind in ("prefix", "typo"):
+            shared = sum(resolver.key(query) == expected for query, expected in items)
+            if shared:
+                print(f"FAIL: {shared} {kind} queries share the canonical cache key")
+                ok = False
+    
+    print()
+    for path, budget in (("indexed", budget_us), ("fuzzy", fuzzy_budget_ms * 1000)):
+        p99 = percentile(uncached[path], 99)
+        print(f"uncached {path} lookups: p99 {p99:.1f} us (budget {budget:.0f} us)")
+        if p99 > budget:
+            print(f"FAIL: uncached {path} lookup p99 over budget")
+            ok = False
+    
+    scan_queries = queries["typo"][:20]
+    scan_durations, _ = timed(linear_scan(resolver), scan_queries)
+    index_durations, _ = timed(resolver.resolve, scan_queries)
+    print(
+        f"typos, linear scan: {percentile(scan_durations, 50) / 1000:.1f} ms/lookup vs "
+        f"{percentile(index_durations, 50):.1f} us with the trigram index"
+    )
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--places", type=int, default=100_000, help="Places in the synthetic gazetteer")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries per kind")
+    parser.add_argument("--budget-us", type=float, default=200.0, help="p99 of an uncached exact/variant/prefix lookup")
+    parser.add_argument("--fuzzy-budget-ms", type=float, default=20.0, help="p99 of an uncached typo or unknown lookup")
+    parser.add_argument("--min-fuzzy-accuracy", type=float, default=0.9, help="Typos that must resolve to the right place")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.places, args.queries, args.budget_us, args.fuzzy_budget_ms, args.min_fuzzy_accuracy, args.seed) else 1)
+
+if __name__ == "__main__":
+    main()
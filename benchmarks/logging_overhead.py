@@ -0,0 +1,134 @@
+"""
+Per-request logging cost in the calling thread: the previous logger setup
+vs the queued one.
+
+"before" rebuilds the old setup_logger (synchronous stdout and rotating,
+zip-compressed file sinks) and logs one simulated trip the old way: eager
+f-strings at INFO, including the weather and prompt text. "after" uses
+shared.logger (queued sinks, deferred formatting, bulky text at DEBUG),
+then the same with LOG_SAMPLE_EVERY=10 and with LOG_LEVEL=WARNING. Sinks
+write to a temporary directory; stdout is redirected there as well.
+Requests are spaced `--gap-ms` apart, like requests waiting on agents,
+which gives the writer threads room to run.
+
+    uv run python -m benchmarks.logging_overhead --requests 10000 --gap-ms 1
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from loguru import logger
+from config.setting import settings
+from shared import logger as shared_logger
+
+WEATHER = "Temperature: 28°C, Condition: Sunny, Humidity: 70%"
+PROMPT = "Location: Da Nang\nWeather: " + WEATHER + "\n\n" + "Please suggest 3-5 activities. " * 20
+
+def old_setup(log_dir: Path):
+    """The logger setup before the rework, with synchronous sinks"""
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> | <level>{message}</level>",
+        level="INFO",
+        colorize=True
+    )
+    logger.add(
+        log_dir / "before.log",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} | {message}",
+        level="INFO",
+        rotation="10 MB",
+        retention="7 days",
+        compression="zip"
+    )
+    return logger
+
+def old_request(log, location: str):
+    log.info("=" * 60)
+    log.info(f"🚀 Starting trip planning for: {location}")
+    log.info("=" * 60)
+    log.info(f"\n📍 STEP 1: Querying Weather Agent...")
+    log.info(f"📍 Received weather request for: {location}")
+    log.info(f"Using mock weather data for: {location.lower()}")
+    log.info(f"   ✅ Weather: {WEATHER}")
+    log.info(f"\n📍 STEP 2: Querying Planning Agent...")
+    log.info(f"📋 Received planning request for: {location}")
+    log.info(f"☁️ Weather: {PROMPT}")
+    log.info(f"   ✅ Activities: {4} suggestions")
+    log.info(f"\n✅ Trip planning completed successfully!")
+
+def new_request(sampler: "shared_logger.LogSampler", location: str):
+    log = sampler.for_request()
+    log.info("=" * 60)
+    log.info("🚀 Starting trip planning for: {}", location)
+    log.info("=" * 60)
+    log.info("\n📍 STEP 1: Querying Weather Agent...")
+    log.info("📍 Received weather request for: {}", location)
+    log.debug("Using mock weather data for: {}", location)
+    log.opt(lazy=True).info("   ✅ Weather: {}", lambda: WEATHER)
+    log.info("\n📍 STEP 2: Querying Planning Agent...")
+    log.info("📋 Received planning request for: {}", location)
+    log.debug("☁️ Weather: {}", PROMPT)
+    log.opt(lazy=True).info("   ✅ Activities: {} suggestions", lambda: 4)
+    log.info("\n✅ Trip planning completed successfully!")
+
+def measure(request, requests: int, gap: float):
+    latencies = []
+    for i in range(requests):
+        started = time.perf_counter()
+        request(f"Location {i % 50}")
+        latencies.append(time.perf_counter() - started)
+        # A real request spends most of its time waiting on the agents
+        time.sleep(gap)
+    started = time.perf_counter()
+    shared_logger.flush_logs()
+    drain = time.perf_counter() - started
+    latencies.sort()
+    return (
+        sum(latencies) / requests * 1e6,
+        latencies[int(requests * 0.99)] * 1e6,
+        latencies[-1] * 1e3,
+        drain
+    )
+
+def run(requests: int, gap: float):
+    console = sys.stdout
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        settings.LOG_DIR = log_dir
+        sys.stdout = open(log_dir / "stdout.log", "w", encoding="utf-8")
+        results = []
+        try:
+            log = old_setup(log_dir)
+            results.append(("before", measure(lambda location: old_request(log, location), requests, gap)))
+            
+            for name, level, every in [
+                ("after", "INFO", 1),
+                ("after, 1/10 sampled", "INFO", 10),
+                ("after, WARNING", "WARNING", 1),
+            ]:
+                shared_logger.configure_logging(level=level, levels="")
+                sampler = shared_logger.LogSampler(shared_logger.setup_logger("after"), every=every)
+                results.append((name, measure(lambda location: new_request(sampler, location), requests, gap)))
+        finally:
+            logger.remove()
+            sys.stdout.close()
+            sys.stdout = console
+    
+    print(f"{requests} simulated requests, 12 log calls each, {gap * 1000:.1f} ms apart\n")
+    print(f"{'setup':>20} | {'mean us':>8} | {'p99 us':>8} | {'max ms':>7} | {'drain s':>7}")
+    print("-" * 64)
+    for name, (mean, p99, worst, drain) in results:
+        print(f"{name:>20} | {mean:>8.1f} | {p99:>8.1f} | {worst:>7.1f} | {drain:>7.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000, help="Simulated requests per setup")
+    parser.add_argument("--gap-ms", type=float, default=1.0, help="Idle time between requests (agent calls)")
+    args = parser.parse_args()
+    run(args.requests, args.gap_ms / 1000)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Cost of recording metrics and of rendering /metrics.
+
+Times counter increments, labelled histogram observations and the time()
+context manager against an empty loop, from one thread and from several,
+then renders a registry with many series. Also checks that the totals
+add up after concurrent recording; exits non-zero if they don't.
+
+    uv run python -m benchmarks.metrics_overhead --ops 200000 --threads 4
+"""
+
+import argparse
+import sys
+import threading
+import time
+from shared.metrics import Registry
+
+def per_op_ns(func, ops: int) -> float:
+    started = time.perf_counter()
+    func(ops)
+    return (time.perf_counter() - started) / ops * 1e9
+
+def run(ops: int, threads: int, series: int) -> bool:
+    registry = Registry()
+    counter = registry.counter("bench_total", "Counter", ["route"])
+    histogram = registry.histogram("bench_seconds", "Histogram", ["route"])
+    counter_child = counter.labels("plan")
+    histogram_child = histogram.labels("plan")
+    
+    def empty(n):
+        for _ in range(n):
+            pass
+    
+    def inc(n):
+        for _ in range(n):
+            counter_child.inc()
+    
+    def observe(n):
+        for _ in range(n):
+            histogram_child.observe(0.042)
+    
+    def labels_then_observe(n):
+        for _ in range(n):
+            histogram.labels("plan").observe(0.042)
+    
+    def timed(n):
+        for _ in range(n):
+            with histogram_child.time():
+                pass
+    
+    baseline = per_op_ns(empty, ops)
+    print(f"{'operation':>28} | {'ns/op':>8}")
+    print("-" * 40)
+    for name, func in [
+        ("counter.inc", inc),
+        ("histogram.observe", observe),
+        ("labels(...).observe", labels_then_observe),
+        ("with histogram.time()", timed),
+    ]:
+        print(f"{name:>28} | {per_op_ns(func, ops) - baseline:>8.0f}")
+    
+    # Concurrent recording from several threads must not lose updates
+    before_count = counter_child.get()
+    workers = [threading.Thread(target=lambda: (inc(ops), observe(ops))) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    print(f"{f'{threads} threads inc+observe':>28} | {elapsed / (ops * threads * 2) * 1e9:>8.0f}")
+    
+    ok = True
+    expected = before_count + ops * threads
+    if counter_child.get() != expected:
+        print(f"FAIL: counter is {counter_child.get()}, expected {expected}")
+        ok = False
+    counts, _ = histogram_child.snapshot()
+    if sum(counts) != ops * (threads + 3):
+        print(f"FAIL: histogram count is {sum(counts)}, expected {ops * (threads + 3)}")
+        ok = False
+    
+    for i in range(series):
+        histogram.labels(f"route-{i}").observe(i / series)
+        counter.labels(f"route-{i}").inc()
+    started = time.perf_counter()
+    text = registry.render()
+    elapsed = time.perf_counter() - started
+    print(f"\nrender: {series + 1} series per metric, {len(text.splitlines())} lines in {elapsed * 1000:.1f} ms")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=200000, help="Operations per measurement")
+    parser.add_argument("--threads", type=int, default=4, help="Threads recording concurrently")
+    parser.add_argument("--series", type=int, default=1000, help="Label combinations rendered")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.ops, args.threads, args.series) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Parse cost of Gemini answers: activity text vs structured JSON.
+
+Builds answers with 3-5 activities whose descriptions mention accented
+Vietnamese place names, in both formats, and times per answer:
+- the previous text parser (any non-ASCII character starts a title),
+- the emoji-anchored text parser, on the whole answer and streamed,
+- the structured JSON parser, on the whole answer and streamed.
+Checks that the new parsers find exactly the activities that were written
+(the previous one is reported, not checked) and compares answer sizes.
+Exits non-zero if a check fails.
+
+    uv run python -m benchmarks.parse_cost --responses 2000 --chunk 32
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, List
+from agents.planning.backends import estimate_tokens
+from agents.planning.parser import ActivityParser, parse_activities
+
+PLACES = ["Đà Nẵng", "Hội An", "Huế", "Hà Nội", "Sa Pa", "Phú Quốc", "Nha Trang", "Đà Lạt"]
+ACTIVITIES = [
+    ("🏖️", "Beach Morning", "Swim at Mỹ Khê beach in {place} before the midday heat."),
+    ("🍜", "Street Food Tour", "Try bún chả and bánh mì in the old quarter of {place}."),
+    ("🏯", "Temple Visit", "Visit the pagodas around {place}; the covered halls stay cool."),
+    ("🚴", "Countryside Ride", "Cycle through the rice fields outside {place} in the morning."),
+    ("☕", "Cafe Afternoon", "Order cà phê sữa đá in a riverside cafe in {place}."),
+    ("🛶", "Boat Trip", "Take a basket boat ride near {place} while the sea is calm."),
+]
+
+def build_answers(count: int, seed: int):
+    """[(text answer, JSON answer, expected activities)]"""
+    rng = random.Random(seed)
+    answers = []
+    for _ in range(count):
+        place = rng.choice(PLACES)
+        picks = rng.sample(ACTIVITIES, rng.randint(3, 5))
+        items = [
+            {"emoji": emoji, "title": title, "description": description.format(place=place)}
+            for emoji, title, description in picks
+        ]
+        # Text answers often wrap the description over two lines
+        text = "\n\n".join(
+            f"{item['emoji']} {item['title']}\n{item['description']}\nGood for {place} today."
+            for item in items
+        )
+        expected = [
+            {"title": f"{item['emoji']} {item['title']}", "description": f"{item['description']} Good for {place} today."}
+            for item in items
+        ]
+        for item, activity in zip(items, expected):
+            item["description"] = activity["description"]
+        answers.append((text, json.dumps(items, ensure_ascii=False), expected))
+    return answers
+
+def old_parse(text: str) -> List[Dict[str, str]]:
+    """The text parser before the rework"""
+    activities = []
+    current = None
+    for line in text.strip().split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if any(ord(char) > 127 for char in line):
+            if current:
+                activities.append(current)
+            current = {"title": line, "description": ""}
+        elif current:
+            current["description"] += line + " "
+    if current:
+        activities.append(current)
+    return activities
+
+def streamed(chunk: int):
+    def parse(text: str) -> List[Dict[str, str]]:
+        parser = ActivityParser()
+        activities = []
+        for start in range(0, len(text), chunk):
+            activities += parser.feed(text[start:start + chunk])
+        return activities + parser.close()
+    return parse
+
+def per_answer_us(parse, answers: List[str]) -> float:
+    started = time.perf_counter()
+    for answer in answers:
+        parse(answer)
+    return (time.perf_counter() - started) / len(answers) * 1e6
+
+def run(count: int, chunk: int, seed: int) -> bool:
+    answers = build_answers(count, seed)
+    texts = [text for text, _, _ in answers]
+    jsons = [data for _, data, _ in answers]
+    expected = [activities for _, _, activities in answers]
+    ok = True
+    
+    print(f"{count} answers, {sum(len(e) for e in expected)} activities, streamed in {chunk}-character chunks\n")
+    print(f"{'parser':>24} | {'us/answer':>9} | {'activities found':>16}")
+    print("-" * 58)
+    for name, parse, inputs, checked in [
+        ("text, previous", old_parse, texts, False),
+        ("text", parse_activities, texts, True),
+        ("text, streamed", streamed(chunk), texts, True),
+        ("json", parse_activities, jsons, True),
+        ("json, streamed", streamed(chunk), jsons, True),
+        ("json.loads only", json.loads, jsons, False),
+    ]:
+        found = [parse(answer) for answer in inputs]
+        correct = sum(result == want for result, want in zip(found, expected))
+        summary = f"{sum(len(result) for result in found)} ({correct}/{count} exact)"
+        if name == "json.loads only":
+            summary = "-"
+        print(f"{name:>24} | {per_answer_us(parse, inputs):>9.1f} | {summary:>16}")
+        if checked and correct != count:
+            print(f"FAIL: {name} parsed {count - correct} answer(s) incorrectly")
+            ok = False
+    
+    text_tokens = sum(estimate_tokens(text) for text in texts) / count
+    json_tokens = sum(estimate_tokens(data) for data in jsons) / count
+    print(f"\nanswer size: text ~{text_tokens:.0f} tokens, json ~{json_tokens:.0f} tokens (4 characters/token)")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=2000, help="Answers parsed per parser")
+    parser.add_argument("--chunk", type=int, default=32, help="Characters per streamed chunk")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.responses, args.chunk, args.seed) else 1)
+
+if __name__ == "__main__":
+    main()
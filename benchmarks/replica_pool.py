@@ -0,0 +1,104 @@
+"""
+Replica load balancing against several local stub agents.
+
+Starts four stub A2A agents on different ports - fast, slow, fast with a
+slow tail (every Nth request), and dead (HTTP 500) - and routes the same
+load through ReplicaPool with each strategy, with and without hedging.
+Reports latency percentiles, errors and how requests were distributed.
+Exits non-zero if the dead replica is not ejected or the latency-aware
+strategy does not favour the fast replica.
+
+    uv run python -m benchmarks.replica_pool --requests 300 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from python_a2a import Message, MessageRole, Task, TextContent
+from agents.coordinator.balancer import ReplicaPool
+from benchmarks.stubs import AgentStub, StubServer
+
+SCENARIOS = [
+    ("least_outstanding", False),
+    ("ewma", False),
+    ("ewma", True),
+]
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def run_scenario(urls, strategy: str, hedge: bool, total: int, concurrency: int):
+    pool = ReplicaPool(urls, strategy=strategy, hedge=hedge, eject_after=3, eject_seconds=60)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    
+    async def one(i: int):
+        nonlocal errors
+        message = Message(content=TextContent(text=f"request {i}"), role=MessageRole.USER)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await pool.call(lambda replica: replica.client.send_task_async(Task(message=message.to_dict())))
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    return pool, latencies, errors, elapsed
+
+async def run(total: int, concurrency: int) -> bool:
+    # The A2A client is blocking underneath; give it enough threads
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 3))
+    
+    stubs = [
+        AgentStub("fast", latency_ms=20),
+        AgentStub("slow", latency_ms=150),
+        AgentStub("tail", latency_ms=20, tail_ms=600, tail_every=5),
+        AgentStub("dead", latency_ms=5, fail=True),
+    ]
+    servers = [StubServer(stub.app()).start() for stub in stubs]
+    urls = [server.url for server in servers]
+    names = {server.url: stub.name for server, stub in zip(servers, stubs)}
+    
+    ok = True
+    try:
+        print(f"replicas: {', '.join(f'{stub.name}={url}' for stub, url in zip(stubs, urls))}")
+        print(f"{'strategy':>18} | {'hedge':>5} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'errors':>6} | {'hedges':>6} | requests per replica")
+        print("-" * 120)
+        for strategy, hedge in SCENARIOS:
+            pool, latencies, errors, elapsed = await run_scenario(urls, strategy, hedge, total, concurrency)
+            stats = pool.stats()
+            spread = {names[replica["url"]]: replica["requests"] for replica in stats["replicas"]}
+            ejected = [names[replica["url"]] for replica in stats["replicas"] if replica["ejected"]]
+            print(
+                f"{strategy:>18} | {'on' if hedge else 'off':>5} | {percentile(latencies, 50) * 1000:>7.0f} | "
+                f"{percentile(latencies, 95) * 1000:>7.0f} | {percentile(latencies, 99) * 1000:>7.0f} | "
+                f"{errors:>6} | {stats['hedges']:>6} | {spread} ejected={ejected}"
+            )
+            
+            if ejected != ["dead"]:
+                print(f"   FAIL: expected only the dead replica to be ejected, got {ejected}")
+                ok = False
+            if strategy == "ewma" and spread["fast"] <= spread["slow"]:
+                print("   FAIL: ewma should send more requests to the fast replica than the slow one")
+                ok = False
+    finally:
+        for server in servers:
+            server.stop()
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.requests, args.concurrency)) else 1)
+
+if __name__ == "__main__":
+    main()
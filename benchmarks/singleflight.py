@@ -0,0 +1,111 @@
+"""
+Check single-flight coalescing: N concurrent identical requests must reach
+the upstream (weather API / Gemini) exactly once.
+
+Upstreams are replaced with local counting fakes, so no API key or network
+is needed. Exits non-zero if any check fails.
+
+    uv run python -m benchmarks.singleflight --requests 50 --latency 100
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from agents.planning.gemini_client import GeminiClient
+from agents.weather.handlers import WeatherHandler
+from benchmarks.gemini_concurrency import FakeModel
+from shared.singleflight import SingleFlight
+
+class CountingModel(FakeModel):
+    """FakeModel that counts generate_content calls"""
+    
+    def __init__(self, latency_ms: float):
+        super().__init__(latency_ms)
+        self.calls = 0
+    
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        return super().generate_content(prompt, generation_config)
+
+async def check_weather(total: int, latency_ms: float) -> bool:
+    handler = WeatherHandler()
+    handler.use_mock = False
+    handler.cache.clear()
+    calls = 0
+    
+    async def fake_real_weather(location: str):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(latency_ms / 1000)
+        return {"location": location, "temperature": 27.5, "condition": "Clouds", "humidity": 72}
+    
+    handler._get_real_weather = fake_real_weather
+    
+    start = time.perf_counter()
+    results = await asyncio.gather(*(handler.get_weather(" Hanoi ") for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    
+    ok = calls == 1 and all(result is results[0] for result in results)
+    print(f"weather: {total} concurrent requests -> {calls} upstream call(s) in {elapsed * 1000:.0f} ms "
+          f"[{'ok' if ok else 'FAIL'}]")
+    return ok
+
+async def check_gemini(total: int, latency_ms: float) -> bool:
+    model = CountingModel(latency_ms)
+    client = GeminiClient(backend=model)
+    weather = "Temperature: 22°C, Condition: Cloudy, Humidity: 70%"
+    
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        client.generate_activities("Hanoi", weather, use_cache=False) for _ in range(total)
+    ))
+    elapsed = time.perf_counter() - start
+    
+    ok = model.calls == 1 and all(result["count"] == results[0]["count"] for result in results)
+    print(f"gemini:  {total} concurrent requests -> {model.calls} generate_content call(s) in {elapsed * 1000:.0f} ms "
+          f"[{'ok' if ok else 'FAIL'}]")
+    return ok
+
+async def check_failure_propagation(total: int, latency_ms: float) -> bool:
+    flight = SingleFlight()
+    calls = 0
+    
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(latency_ms / 1000)
+        raise RuntimeError("upstream down")
+    
+    results = await asyncio.gather(*(flight.do("key", failing) for _ in range(total)), return_exceptions=True)
+    failures = sum(isinstance(result, RuntimeError) for result in results)
+    
+    # The key is released once the call settles, so the next caller retries
+    retried = False
+    try:
+        await flight.do("key", failing)
+    except RuntimeError:
+        retried = calls == 2
+    
+    ok = calls == 2 and failures == total and retried
+    print(f"errors:  {total} concurrent waiters -> {failures} received the failure, key released: {retried} "
+          f"[{'ok' if ok else 'FAIL'}]")
+    return ok
+
+async def run(total: int, latency_ms: float) -> bool:
+    results = [
+        await check_weather(total, latency_ms),
+        await check_gemini(total, latency_ms),
+        await check_failure_propagation(total, latency_ms)
+    ]
+    return all(results)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="Concurrent identical requests")
+    parser.add_argument("--latency", type=float, default=100.0, help="Fake upstream latency in ms")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.requests, args.latency)) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Local stub servers used by the benchmarks"""
+
+import asyncio
+import socket
+import threading
+import time
+from aiohttp import web
+
+def free_port() -> int:
+    """Pick a free localhost TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class StubServer:
+    """Run an aiohttp application on localhost in a background thread"""
+    
+    def __init__(self, app: web.Application, port: int = 0):
+        self.app = app
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        runner = web.AppRunner(self.app, access_log=None)
+        self._loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", self.port)
+        self._loop.run_until_complete(site.start())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(runner.cleanup())
+    
+    def start(self) -> "StubServer":
+        self._thread.start()
+        self._ready.wait()
+        return self
+    
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+def weather_stub_app(latency_ms: float = 0.0) -> web.Application:
+    """OpenWeatherMap-shaped stub: GET /weather?q=<city>"""
+    
+    async def weather(request: web.Request) -> web.Response:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        city = request.query.get("q", "Unknown")
+        return web.json_response({
+            "name": city.title(),
+            "main": {"temp": 27.5, "humidity": 72},
+            "weather": [{"main": "Clouds"}]
+        })
+    
+    app = web.Application()
+    app.router.add_get("/weather", weather)
+    return app
+
+class UvicornServer:
+    """Run an ASGI application with uvicorn on localhost in a background thread"""
+    
+    def __init__(self, app, port: int = 0):
+        import uvicorn
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="error", lifespan="on")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+    
+    def start(self) -> "UvicornServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+    
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+class AgentStub:
+    """
+    Minimal A2A agent: answers POST /a2a/tasks/send after `latency_ms`.
+    
+    Every `tail_every`-th request takes an extra `tail_ms`; with fail=True
+    every request returns HTTP 500.
+    """
+    
+    def __init__(self, name: str, latency_ms: float = 0.0, tail_ms: float = 0.0, tail_every: int = 0, fail: bool = False):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.tail_ms = tail_ms
+        self.tail_every = tail_every
+        self.fail = fail
+        self.calls = 0
+    
+    def app(self) -> web.Application:
+        async def agent_card(request: web.Request) -> web.Response:
+            return web.json_response({
+                "name": self.name,
+                "description": "Benchmark stub agent",
+                "url": str(request.url.origin()),
+                "version": "1.0.0",
+                "capabilities": {}
+            })
+        
+        async def tasks_send(request: web.Request) -> web.Response:
+            self.calls += 1
+            data = await request.json()
+            delay = self.latency_ms
+            if self.tail_every and self.calls % self.tail_every == 0:
+                delay += self.tail_ms
+            if delay:
+                await asyncio.sleep(delay / 1000)
+            if self.fail:
+                return web.json_response({"error": "stub failure"}, status=500)
+            
+            params = data.get("params", data)
+            return web.json_response({
+                "jsonrpc": "2.0",
+                "id": data.get("id", 1),
+                "result": {
+                    "id": params.get("id"),
+                    "status": {"state": "completed"},
+                    "artifacts": [{"parts": [{"type": "text", "text": f"reply from {self.name}"}]}]
+                }
+            })
+        
+        app = web.Application()
+        app.router.add_get("/a2a/agent.json", agent_card)
+        app.router.add_post("/a2a/tasks/send", tasks_send)
+        return app
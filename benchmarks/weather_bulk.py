@@ -0,0 +1,157 @@
+"""
+Bulk weather: one A2A message per city vs WeatherRequest batches.
+
+Runs the Weather Agent (ASGI) in front of an OpenWeatherMap-shaped stub
+with --latency ms per call and asks it for --cities cities (plus a few
+other spellings of the same places) in three ways:
+- one A2A message per location, --concurrency at a time (previous behaviour),
+- TravelOrchestrator.get_weather_many: WEATHER_BULK_MAX_LOCATIONS per message,
+- the same again with a warm cache.
+Reports A2A round trips, upstream calls and wall time, and checks that the
+bulk answers match the per-location ones. A last run gives a handful of
+places a slow upstream and a short deadline: those must come back as
+per-location errors while the others succeed. Exits non-zero if a check
+fails.
+
+    uv run python -m benchmarks.weather_bulk --cities 500 --latency 20
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from agents.coordinator.orchestrator import TravelOrchestrator
+from agents.weather.agent import create_weather_agent
+from agents.weather.handlers import WeatherHandler
+from benchmarks.stubs import StubServer, UvicornServer, weather_stub_app
+from config.setting import settings
+from shared.asgi import create_asgi_app
+from shared.resilience import Deadline
+
+# Several spellings of three places: one upstream call per place
+SPELLINGS = ["Đà Nẵng", "Danang", "da nang, vietnam", "Hà Nội", "Hanoi", "Sài Gòn", "Ho Chi Minh City"]
+
+class Counters:
+    """A2A messages handled by the agent and calls made to the provider"""
+    
+    def __init__(self, agent, handler: WeatherHandler):
+        self.messages = 0
+        self.upstream = 0
+        handle = agent._async_handle_message
+        fetch = handler._get_real_weather
+        
+        async def counted_handle(message):
+            self.messages += 1
+            return await handle(message)
+        
+        async def counted_fetch(location):
+            self.upstream += 1
+            return await fetch(location)
+        
+        agent._async_handle_message = counted_handle
+        handler._get_real_weather = counted_fetch
+    
+    def reset(self):
+        self.messages = 0
+        self.upstream = 0
+
+async def one_by_one(orchestrator: TravelOrchestrator, locations, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def get(location):
+        async with semaphore:
+            _, report = await orchestrator._get_weather(location)
+            return location, report
+    
+    return dict(await asyncio.gather(*(get(location) for location in locations)))
+
+async def check_deadline(latency_ms: float) -> bool:
+    """Slow places past the deadline are per-location errors; the others succeed"""
+    handler = WeatherHandler()
+    handler.use_mock = False
+    slow = {"Slow City 1", "Slow City 2", "Slow City 3"}
+    
+    async def fetch(location):
+        await asyncio.sleep(1.0 if location in slow else latency_ms / 1000)
+        return {"location": location, "temperature": "27°C", "condition": "Clouds", "humidity": "70%", "summary": "Clouds"}
+    
+    handler._get_real_weather = fetch
+    locations = [f"Fast City {i}" for i in range(20)] + sorted(slow)
+    results = await handler.get_weather_many(locations, deadline=Deadline(0.3))
+    failed = {location for location, result in results.items() if "error" in result}
+    ok = failed == slow and len(results) == len(locations)
+    print(f"deadline: {len(failed)} of {len(locations)} locations failed ({sorted(failed)}) [{'ok' if ok else 'FAIL'}]")
+    return ok
+
+async def run(cities: int, latency_ms: float, concurrency: int) -> bool:
+    ok = True
+    locations = [f"City {i:04d}" for i in range(cities)] + SPELLINGS
+    places = cities + 3
+    
+    upstream = StubServer(weather_stub_app(latency_ms)).start()
+    handler = WeatherHandler()
+    handler.api_key = "bench"
+    handler.api_url = f"{upstream.url}/weather"
+    handler.use_mock = False
+    agent = create_weather_agent(handler)
+    counters = Counters(agent, handler)
+    server = UvicornServer(create_asgi_app(agent)).start()
+    orchestrator = TravelOrchestrator([server.url], [server.url])
+    
+    try:
+        print(f"{len(locations)} locations ({places} places), upstream latency {latency_ms:.0f} ms\n")
+        print(f"{'mode':>22} | {'A2A msgs':>8} | {'upstream':>8} | {'wall s':>7}")
+        print("-" * 56)
+        
+        def report(mode: str, started: float):
+            print(f"{mode:>22} | {counters.messages:>8} | {counters.upstream:>8} | {time.perf_counter() - started:>7.2f}")
+        
+        handler.cache.clear()
+        counters.reset()
+        started = time.perf_counter()
+        single = await one_by_one(orchestrator, locations, concurrency)
+        report(f"one per message (x{concurrency})", started)
+        
+        handler.cache.clear()
+        counters.reset()
+        started = time.perf_counter()
+        bulk = await orchestrator.get_weather_many(locations)
+        report("bulk", started)
+        expected_messages = math.ceil(len(locations) / settings.WEATHER_BULK_MAX_LOCATIONS)
+        if counters.messages != expected_messages or counters.upstream != places:
+            print(f"FAIL: expected {expected_messages} message(s) and {places} upstream calls")
+            ok = False
+        
+        counters.reset()
+        started = time.perf_counter()
+        await orchestrator.get_weather_many(locations)
+        report("bulk, warm cache", started)
+        if counters.upstream:
+            print("FAIL: warm bulk request called the provider")
+            ok = False
+        
+        mismatched = [
+            location for location in locations
+            if location not in bulk or single.get(location) != bulk[location][1]
+        ]
+        print(f"\nbulk answers matching per-location ones: {len(locations) - len(mismatched)}/{len(locations)}")
+        if mismatched:
+            print(f"FAIL: mismatched {mismatched[:5]}")
+            ok = False
+    finally:
+        server.stop()
+        upstream.stop()
+    
+    return await check_deadline(latency_ms) and ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=500, help="Distinct cities requested")
+    parser.add_argument("--latency", type=float, default=20.0, help="Weather provider latency in ms")
+    parser.add_argument("--concurrency", type=int, default=20, help="Messages in flight for the one-per-message run")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.cities, args.latency, args.concurrency)) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Weather upstream throughput: blocking `requests` vs the pooled async client.
+
+Runs WeatherHandler's real-API path against a local stub weather server at
+several concurrency levels.
+
+    uv run python -m benchmarks.weather_http --requests 500 --latency 20
+"""
+
+import argparse
+import asyncio
+import time
+import requests
+from agents.weather.handlers import WeatherHandler
+from benchmarks.stubs import StubServer, weather_stub_app
+
+CONCURRENCY_LEVELS = [1, 10, 100]
+
+def make_handler(api_url: str) -> WeatherHandler:
+    """WeatherHandler pointed at the stub server"""
+    handler = WeatherHandler()
+    handler.api_key = "benchmark"
+    handler.api_url = api_url
+    handler.use_mock = False
+    return handler
+
+async def blocking_fetch(handler: WeatherHandler, location: str):
+    """The previous implementation: requests.get inside the coroutine"""
+    params = {"q": location, "appid": handler.api_key, "units": "metric"}
+    response = requests.get(handler.api_url, params=params, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+async def pooled_fetch(handler: WeatherHandler, location: str):
+    """The current implementation"""
+    return await handler._get_real_weather(location)
+
+async def run_level(fetch, handler: WeatherHandler, total: int, concurrency: int) -> float:
+    """Issue `total` requests with `concurrency` workers, return requests/second"""
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(f"city-{i % 50}")
+    
+    async def worker():
+        while not queue.empty():
+            await fetch(handler, queue.get_nowait())
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+async def run(total: int, api_url: str):
+    handler = make_handler(api_url)
+    
+    # Warm up the pool so connection setup is not counted against level 1
+    await pooled_fetch(handler, "warmup")
+    
+    print(f"{'concurrency':>12} | {'blocking req/s':>15} | {'pooled req/s':>13} | {'speedup':>8}")
+    print("-" * 58)
+    for concurrency in CONCURRENCY_LEVELS:
+        blocking = await run_level(blocking_fetch, handler, total, concurrency)
+        pooled = await run_level(pooled_fetch, handler, total, concurrency)
+        print(f"{concurrency:>12} | {blocking:>15.1f} | {pooled:>13.1f} | {pooled / blocking:>7.1f}x")
+    
+    await handler.http.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per concurrency level")
+    parser.add_argument("--latency", type=float, default=20.0, help="Stub server latency in ms")
+    args = parser.parse_args()
+    
+    server = StubServer(weather_stub_app(args.latency)).start()
+    try:
+        asyncio.run(run(args.requests, f"{server.url}/weather"))
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,11 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+def _url_list(value: str, default: str) -> list:
+    """Comma-separated URLs, or [default] when unset"""
+    urls = [url.strip().rstrip("/") for url in (value or "").split(",") if url.strip()]
+    return urls or [default]
+
 class Settings:
     """Application settings"""
     
@@ -15,30 +20,125 @@ class Settings:
     # Gemini
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))  # in-flight generations
+    GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "5"))  # locations per batched prompt
+    # "text" (emoji-formatted activities) or "json" (structured output following a schema)
+    GEMINI_RESPONSE_FORMAT = os.getenv("GEMINI_RESPONSE_FORMAT", "text").lower()
+    # Size max_output_tokens to the requested activities (learned from observed usage)
+    GEMINI_ADAPTIVE_OUTPUT_TOKENS = os.getenv("GEMINI_ADAPTIVE_OUTPUT_TOKENS", "true").lower() == "true"
+    # Context-cache the shared instructions for this many seconds (0 = off). Only
+    # pays off once they reach Gemini's minimum cacheable size; shorter ones are sent per call
+    GEMINI_CONTEXT_CACHE_TTL = float(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "0"))
+    
+    # LLM backend: "gemini", "record" (gemini + save answers), "replay" or "simulator"
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+    LLM_RECORD_PATH = Path(os.getenv("LLM_RECORD_PATH", str(BASE_DIR / ".cache" / "llm_recording.jsonl")))
+    LLM_REPLAY_PATH = Path(os.getenv("LLM_REPLAY_PATH", str(BASE_DIR / ".cache" / "llm_recording.jsonl")))
+    LLM_REPLAY_LATENCY_SCALE = float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1.0"))  # 0 = no delay
+    LLM_SIM_LATENCY_MS = float(os.getenv("LLM_SIM_LATENCY_MS", "300"))  # time to first token
+    LLM_SIM_TOKENS_PER_SECOND = float(os.getenv("LLM_SIM_TOKENS_PER_SECOND", "200"))
+    LLM_SIM_SEED = int(os.getenv("LLM_SIM_SEED", "0"))
+    
+    # Gemini response cache (SQLite, shared by Planning Agent workers)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(BASE_DIR / ".cache" / "llm_responses.sqlite3")))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
     
     # Weather API
     WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
     WEATHER_API_URL = os.getenv("WEATHER_API_URL", "")
+    # Daily forecast endpoint (default: WEATHER_API_URL with /weather -> /forecast) and days it serves
+    WEATHER_FORECAST_URL = os.getenv("WEATHER_FORECAST_URL", "") or WEATHER_API_URL.replace("/weather", "/forecast")
+    WEATHER_FORECAST_MAX_DAYS = int(os.getenv("WEATHER_FORECAST_MAX_DAYS", "16"))
+    
+    # Weather API connection pool
+    WEATHER_HTTP_POOL_SIZE = int(os.getenv("WEATHER_HTTP_POOL_SIZE", "100"))
+    WEATHER_HTTP_PER_HOST_LIMIT = int(os.getenv("WEATHER_HTTP_PER_HOST_LIMIT", "20"))
+    WEATHER_HTTP_KEEPALIVE = float(os.getenv("WEATHER_HTTP_KEEPALIVE", "30"))
+    WEATHER_HTTP_TIMEOUT = float(os.getenv("WEATHER_HTTP_TIMEOUT", "5"))
+    WEATHER_HTTP_CONNECT_TIMEOUT = float(os.getenv("WEATHER_HTTP_CONNECT_TIMEOUT", "2"))
+    
+    # Weather cache (seconds); stale entries are served while refreshing
+    WEATHER_CACHE_MAX_SIZE = int(os.getenv("WEATHER_CACHE_MAX_SIZE", "1024"))
+    WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+    WEATHER_CACHE_STALE_TTL = float(os.getenv("WEATHER_CACHE_STALE_TTL", "1800"))
+    
+    # Bulk weather: upstream fetches in flight per request, locations per A2A message
+    WEATHER_BULK_CONCURRENCY = int(os.getenv("WEATHER_BULK_CONCURRENCY", "20"))
+    WEATHER_BULK_MAX_LOCATIONS = int(os.getenv("WEATHER_BULK_MAX_LOCATIONS", "100"))
+    
+    # Location resolution: extra gazetteer (JSONL), memo size and fuzzy match similarity (1 - edits / length)
+    LOCATION_GAZETTEER_PATH = os.getenv("LOCATION_GAZETTEER_PATH", "")
+    LOCATION_MEMO_SIZE = int(os.getenv("LOCATION_MEMO_SIZE", "4096"))
+    LOCATION_FUZZY_THRESHOLD = float(os.getenv("LOCATION_FUZZY_THRESHOLD", "0.8"))
     
     # Agent ports
     WEATHER_AGENT_PORT = int(os.getenv("WEATHER_AGENT_PORT", "5001"))
     PLANNING_AGENT_PORT = int(os.getenv("PLANNING_AGENT_PORT", "5002"))
     COORDINATOR_PORT = int(os.getenv("COORDINATOR_PORT", "5003"))
     
+    # Coordinator
+    COORDINATOR_MAX_CONCURRENCY = int(os.getenv("COORDINATOR_MAX_CONCURRENCY", "5"))
+    # Fetch weather for multi-location runs in bulk requests before planning
+    COORDINATOR_BULK_WEATHER = os.getenv("COORDINATOR_BULK_WEATHER", "true").lower() == "true"
+    # Coordinator service: /plan requests handled at once, waiting, and max seconds waiting
+    COORDINATOR_MAX_IN_FLIGHT = int(os.getenv("COORDINATOR_MAX_IN_FLIGHT", "32"))
+    COORDINATOR_MAX_QUEUE = int(os.getenv("COORDINATOR_MAX_QUEUE", "64"))
+    COORDINATOR_QUEUE_TIMEOUT = float(os.getenv("COORDINATOR_QUEUE_TIMEOUT", "5"))
+    # Multi-day itineraries: longest trip and activities planned per day
+    COORDINATOR_MAX_TRIP_DAYS = int(os.getenv("COORDINATOR_MAX_TRIP_DAYS", "14"))
+    COORDINATOR_ACTIVITIES_PER_DAY = int(os.getenv("COORDINATOR_ACTIVITIES_PER_DAY", "3"))
+    
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    # Per-module overrides, e.g. "agents.planning=DEBUG,shared.asgi=WARNING"
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+    # Log the info/debug lines of 1 in N requests (1 = every request)
+    LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1"))
     
     # Agent URLs
     WEATHER_AGENT_URL = f"http://localhost:{WEATHER_AGENT_PORT}"
     PLANNING_AGENT_URL = f"http://localhost:{PLANNING_AGENT_PORT}"
     
-    @classmethod
-    def validate(cls):
-        """Validate required settings"""
-        if not cls.GEMINI_API_KEY:
+    # Agent replicas used by the coordinator (comma-separated base URLs)
+    WEATHER_AGENT_URLS = _url_list(os.getenv("WEATHER_AGENT_URLS", ""), WEATHER_AGENT_URL)
+    PLANNING_AGENT_URLS = _url_list(os.getenv("PLANNING_AGENT_URLS", ""), PLANNING_AGENT_URL)
+    
+    # Replica load balancing: "least_outstanding" or "ewma" (latency)
+    AGENT_LB_STRATEGY = os.getenv("AGENT_LB_STRATEGY", "least_outstanding")
+    AGENT_EJECT_AFTER = int(os.getenv("AGENT_EJECT_AFTER", "3"))  # consecutive failures
+    AGENT_EJECT_SECONDS = float(os.getenv("AGENT_EJECT_SECONDS", "30"))
+    # Hedging: send a duplicate to another replica once a call exceeds the p95 latency
+    AGENT_HEDGE_ENABLED = os.getenv("AGENT_HEDGE_ENABLED", "false").lower() == "true"
+    AGENT_HEDGE_PERCENTILE = float(os.getenv("AGENT_HEDGE_PERCENTILE", "95"))
+    
+    # Keep-alive connection pool shared by every A2A client in the process
+    # (false = python_a2a's default: a new connection per call)
+    A2A_POOLED_TRANSPORT = os.getenv("A2A_POOLED_TRANSPORT", "true").lower() == "true"
+    A2A_POOL_SIZE = int(os.getenv("A2A_POOL_SIZE", "100"))
+    A2A_POOL_PER_HOST_LIMIT = int(os.getenv("A2A_POOL_PER_HOST_LIMIT", "0"))  # 0 = no per-agent limit
+    A2A_TIMEOUT = float(os.getenv("A2A_TIMEOUT", "30"))
+    A2A_CONNECT_TIMEOUT = float(os.getenv("A2A_CONNECT_TIMEOUT", "2"))
+    # Idle connections are kept A2A_KEEPALIVE seconds by the client and
+    # AGENT_KEEPALIVE seconds by the agents; keep the client's shorter so
+    # it never reuses a connection the agent is closing
+    A2A_KEEPALIVE = float(os.getenv("A2A_KEEPALIVE", "60"))
+    AGENT_KEEPALIVE = float(os.getenv("AGENT_KEEPALIVE", "75"))
+    
+    def validate(self):
+        """Validate required settings (including values overridden on the instance)"""
+        if self.LLM_BACKEND not in ("gemini", "record", "replay", "simulator"):
+            raise ValueError(f"Unknown LLM_BACKEND: {self.LLM_BACKEND}")
+        if self.GEMINI_RESPONSE_FORMAT not in ("text", "json"):
+            raise ValueError(f"Unknown GEMINI_RESPONSE_FORMAT: {self.GEMINI_RESPONSE_FORMAT}")
+        if not 0 < self.LOCATION_FUZZY_THRESHOLD <= 1:
+            raise ValueError("LOCATION_FUZZY_THRESHOLD must be in (0, 1]")
+        # Only the backends that call Gemini need a key
+        if self.LLM_BACKEND in ("gemini", "record") and not self.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY is required in .env file")
         
         # Create log directory
-        cls.LOG_DIR.mkdir(exist_ok=True)
+        self.LOG_DIR.mkdir(exist_ok=True)
 
 settings = Settings()
@@ -0,0 +1,163 @@
+"""A2A clients sharing one process-wide keep-alive connection pool"""
+
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+import aiohttp
+from python_a2a import A2AClient, AgentCard, Task
+from python_a2a.exceptions import A2AConnectionError, A2AResponseError
+from python_a2a.models import TaskState, TaskStatus
+from shared import metrics
+from shared.http import PooledHTTPClient
+from config.setting import settings
+
+class PooledA2AClient(A2AClient):
+    """
+    A2AClient whose async calls go through a shared PooledHTTPClient.
+    
+    python_a2a's send_task_async runs a blocking requests.post in the
+    default executor, opening (and leaving in TIME_WAIT) one connection per
+    call. Here tasks are posted from the event loop over pooled keep-alive
+    connections, and streams borrow the same pool. Creating the client makes
+    no request: the agent card is either passed in or fetched through the
+    pool before the first stream, which is the only path that reads it.
+    """
+    
+    def __init__(
+        self,
+        endpoint_url: str,
+        transport: Optional[PooledHTTPClient] = None,
+        agent_card: Optional[AgentCard] = None,
+        **kwargs
+    ):
+        self.transport = transport or get_transport()
+        self._task_endpoint: Optional[str] = None   # the endpoint that answered last
+        self._card_loaded = agent_card is not None
+        self._card = agent_card
+        super().__init__(endpoint_url, **kwargs)
+    
+    def _fetch_agent_card(self) -> AgentCard:
+        # Called by A2AClient.__init__, which would block on requests.get here.
+        # Without a card it keeps a placeholder until load_agent_card().
+        if self._card is None:
+            raise A2AConnectionError("Agent card not fetched yet")
+        return self._card
+    
+    async def load_agent_card(self) -> AgentCard:
+        """Fetch the agent card once through the pool and apply its protocol hints"""
+        if self._card_loaded:
+            return self.agent_card
+        for url in (
+            f"{self.endpoint_url}/.well-known/agent.json",
+            f"{self.endpoint_url}/agent.json",
+            f"{self.endpoint_url}/a2a/agent.json"
+        ):
+            try:
+                data = await self.transport.get_json(url)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                continue
+            if isinstance(data, dict):
+                card = AgentCard.from_dict(data)
+                card.url = self.endpoint_url
+                capabilities = card.capabilities if isinstance(card.capabilities, dict) else {}
+                if capabilities.get("google_a2a_compatible") or capabilities.get("parts_array_format"):
+                    self._use_google_a2a = self._protocol_detected = True
+                self.agent_card = card
+                break
+        # One attempt, as A2AClient makes: the placeholder stays if it failed
+        self._card_loaded = True
+        return self.agent_card
+    
+    async def check_streaming_support(self) -> bool:
+        # First step of stream_response/stream_task: the card decides the message format
+        await self.load_agent_card()
+        return await super().check_streaming_support()
+    
+    def _task_endpoints(self) -> List[str]:
+        """Same endpoints, in the same order, as A2AClient._send_task"""
+        if self._task_endpoint:
+            return [self._task_endpoint]
+        if self.endpoint_url.endswith(("/tasks/send", "/a2a/tasks/send")):
+            return [self.endpoint_url]
+        return [f"{self.endpoint_url}/tasks/send", f"{self.endpoint_url}/a2a/tasks/send"]
+    
+    async def send_task_async(self, task: Task) -> Task:
+        request_data = {"jsonrpc": "2.0", "id": 1, "method": "tasks/send", "params": task.to_dict()}
+        error: Exception = A2AConnectionError("No task endpoints available")
+        for endpoint in self._task_endpoints():
+            try:
+                data = await self.transport.post_json(endpoint, request_data, headers=self.headers)
+            except aiohttp.ClientResponseError as e:
+                error = A2AResponseError(f"{endpoint}: HTTP {e.status} {e.message}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = A2AConnectionError(f"{endpoint}: {e or type(e).__name__}")
+            except ValueError:
+                error = A2AResponseError(f"{endpoint}: response is not valid JSON")
+            else:
+                self._task_endpoint = endpoint
+                return self._read_response(task, data)
+        raise error
+    
+    @staticmethod
+    def _read_response(task: Task, data: Any) -> Task:
+        """Task from a tasks/send answer, as A2AClient._send_task reads it"""
+        result = data.get("result", {}) if isinstance(data, dict) else {}
+        if not result and isinstance(data, dict) and "text" in data:
+            text = data["text"]
+        else:
+            try:
+                return Task.from_dict(result)
+            except Exception:
+                text = str(result)
+        task.artifacts = [{"parts": [{"type": "text", "text": text}]}]
+        task.status = TaskStatus(state=TaskState.COMPLETED)
+        return task
+    
+    def _create_aiohttp_session(self) -> aiohttp.ClientSession:
+        # Used by stream_response/stream_task: closing it keeps the pool open
+        return self.transport.borrow_session(
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+def create_a2a_client(endpoint_url: str) -> A2AClient:
+    """A2A client on the shared transport, or a plain A2AClient if A2A_POOLED_TRANSPORT is off"""
+    if settings.A2A_POOLED_TRANSPORT:
+        return PooledA2AClient(endpoint_url, timeout=settings.A2A_TIMEOUT)
+    return A2AClient(endpoint_url, timeout=settings.A2A_TIMEOUT)
+
+_transport: Optional[PooledHTTPClient] = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> PooledHTTPClient:
+    """Process-wide A2A transport, sized by the A2A_* settings"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                transport = PooledHTTPClient(
+                    pool_size=settings.A2A_POOL_SIZE,
+                    per_host_limit=settings.A2A_POOL_PER_HOST_LIMIT,
+                    keepalive_timeout=settings.A2A_KEEPALIVE,
+                    timeout=settings.A2A_TIMEOUT,
+                    connect_timeout=settings.A2A_CONNECT_TIMEOUT
+                )
+                metrics.callback(
+                    "a2a_pool_connections", "gauge", "A2A transport connections by state (waiting = calls queued for one)",
+                    lambda: [({"state": state}, transport.stats()[state]) for state in ("open", "idle", "in_use", "waiting")]
+                )
+                metrics.callback(
+                    "a2a_pool_connections_total", "counter", "A2A connections opened and reused",
+                    lambda: [({"event": "created"}, transport.created), ({"event": "reused"}, transport.reused)]
+                )
+                _transport = transport
+    return _transport
+
+def transport_stats() -> Dict[str, Any]:
+    """Pool stats of the shared transport (empty until it is first used)"""
+    return _transport.stats() if _transport is not None else {}
+
+async def close_transport():
+    """Close the shared transport's pool on the running loop, before the loop ends"""
+    if _transport is not None:
+        await _transport.close()
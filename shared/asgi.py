@@ -0,0 +1,303 @@
+"""Serve A2A agents from a long-lived event loop on FastAPI + uvicorn"""
+
+import json
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from python_a2a import A2AServer, Conversation, Message, MessageRole, Task, TextContent
+from python_a2a.models import TaskState, TaskStatus
+from python_a2a.server.base import BaseA2AServer
+from shared import metrics
+from shared.a2a_client import close_transport
+from shared.cache import TTLCache
+from shared.logger import setup_logger
+from config.setting import settings
+
+logger = setup_logger("asgi")
+
+REQUEST_LATENCY = metrics.histogram("a2a_request_duration_seconds", "A2A request handling duration", ["agent", "kind"])
+REQUESTS_IN_FLIGHT = metrics.gauge("a2a_requests_in_flight", "A2A requests being handled", ["agent"])
+
+TASK_HISTORY = 1024   # finished tasks kept for tasks/get, tasks/cancel and tasks/resubscribe
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def to_response_message(result: Dict[str, Any], request: Message) -> Message:
+    """Convert an agent handler result ({"text", "role", ...}) into an A2A message"""
+    return Message(
+        content=TextContent(text=result.get("text", "")),
+        role=MessageRole.AGENT,
+        parent_message_id=request.message_id,
+        conversation_id=request.conversation_id
+    )
+
+def _is_google_message(data: Any) -> bool:
+    return isinstance(data, dict) and "parts" in data and "role" in data and "content" not in data
+
+def _supports_streaming(agent: A2AServer) -> bool:
+    return type(agent).stream_response is not BaseA2AServer.stream_response
+
+def _rpc_error(rpc_id: Any, code: int, message: str, status_code: int) -> JSONResponse:
+    return JSONResponse(
+        {"jsonrpc": "2.0", "id": rpc_id, "error": {"code": code, "message": message}},
+        status_code=status_code
+    )
+
+def _sse(event: str, rpc_id: Any, data: Dict[str, Any]) -> str:
+    return f"event: {event}\nid: {rpc_id}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def create_asgi_app(agent: A2AServer) -> FastAPI:
+    """
+    Build a FastAPI app exposing the same A2A routes as python_a2a's Flask
+    server: messages and conversations, tasks/send, tasks/get, tasks/cancel
+    and tasks/stream (sendSubscribe, resubscribe) with and without the /a2a
+    prefix, message streaming, the agent card, and CORS with OPTIONS
+    preflight. Requests are handled by awaiting `agent._async_handle_message`
+    directly on the server's event loop, so concurrent requests overlap.
+    Tasks run to completion within the request; the last TASK_HISTORY are
+    kept for tasks/get, tasks/cancel and tasks/resubscribe.
+    
+    A handler result may carry a structured payload under "data" and an
+    error message under "error"; task responses return them as "data" and
+    "error" parts after the text part.
+    
+    Agents can register extra routes by defining `setup_asgi_routes(app)`
+    and release pooled sessions and cache handles by defining an async
+    `close()`, awaited at shutdown along with the shared A2A transport.
+    Metrics for the whole process are served at /metrics.
+    """
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        # Sessions are bound to this loop: close them before uvicorn ends it
+        if hasattr(agent, "close"):
+            await agent.close()
+        await close_transport()
+    
+    app = FastAPI(title=agent.agent_card.name, docs_url=None, redoc_url=None, lifespan=lifespan)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_methods=["GET", "POST", "OPTIONS"],
+        allow_headers=["Content-Type", "Authorization"]
+    )
+    tasks = TTLCache(max_size=TASK_HISTORY, ttl=float("inf"))
+    in_flight = REQUESTS_IN_FLIGHT.labels(agent.agent_card.name)
+    message_latency = REQUEST_LATENCY.labels(agent.agent_card.name, "message")
+    task_latency = REQUEST_LATENCY.labels(agent.agent_card.name, "task")
+    stream_latency = REQUEST_LATENCY.labels(agent.agent_card.name, "stream")
+    
+    def use_google_format(is_google: bool) -> bool:
+        return is_google or getattr(agent, "_use_google_a2a", False)
+    
+    async def handle(message: Message) -> Message:
+        with in_flight.track_inprogress(), message_latency.time():
+            result = await agent._async_handle_message(message)
+        return to_response_message(result, message)
+    
+    def task_dict(task: Task, is_google: bool = False) -> Dict[str, Any]:
+        return task.to_google_a2a() if use_google_format(is_google) else task.to_dict()
+    
+    async def run_task(task: Task) -> Task:
+        try:
+            with in_flight.track_inprogress(), task_latency.time():
+                result = await agent._async_handle_message(Message.from_dict(task.message or {}))
+            parts = [{"type": "text", "text": result.get("text", "")}]
+            if result.get("data") is not None:
+                # Structured payload next to the display text
+                parts.append({"type": "data", "data": result["data"]})
+            if result.get("error"):
+                parts.append({"type": "error", "message": result["error"]})
+            task.artifacts = [{"parts": parts}]
+        except Exception as e:
+            logger.error(f"❌ Error in message handler: {e}")
+            task.artifacts = [{"parts": [{"type": "error", "message": f"Error in message handler: {e}"}]}]
+        task.status = TaskStatus(state=TaskState.COMPLETED)
+        tasks.set(task.id, task)
+        return task
+    
+    async def handle_task(data: Dict[str, Any]) -> Dict[str, Any]:
+        task = await run_task(Task.from_dict(data))
+        return task_dict(task, _is_google_message(data.get("message")))
+    
+    async def stored_task(request: Request, cancel: bool = False):
+        data = await request.json()
+        is_rpc = "jsonrpc" in data
+        params = data.get("params", {}) if is_rpc else data
+        entry = tasks.get(params.get("id"))
+        if entry is None:
+            message = f"Task not found: {params.get('id')}"
+            if is_rpc:
+                return _rpc_error(data.get("id", 1), -32000, message, 404)
+            return JSONResponse({"error": message}, status_code=404)
+        
+        task = entry.value
+        if cancel:
+            task.status = TaskStatus(state=TaskState.CANCELED)
+        if is_rpc:
+            return {"jsonrpc": "2.0", "id": data.get("id", 1), "result": task_dict(task)}
+        return task_dict(task)
+    
+    def agent_card() -> Dict[str, Any]:
+        card = agent.agent_card.to_dict()
+        capabilities = card.setdefault("capabilities", {})
+        capabilities["google_a2a_compatible"] = getattr(agent, "_use_google_a2a", False)
+        capabilities["parts_array_format"] = getattr(agent, "_use_google_a2a", False)
+        capabilities["streaming"] = _supports_streaming(agent)
+        return card
+    
+    @app.get("/")
+    @app.get("/a2a")
+    async def index():
+        return {
+            "name": agent.agent_card.name,
+            "description": agent.agent_card.description,
+            "agent_card_url": "/a2a/agent.json",
+            "protocol": "a2a",
+            "capabilities": agent_card()["capabilities"]
+        }
+    
+    @app.get("/a2a/agent.json")
+    @app.get("/a2a/.well-known/agent.json")
+    @app.get("/agent.json")
+    @app.get("/.well-known/agent.json")
+    @app.get("/.well-known/agent-card.json")
+    async def get_agent_card():
+        return agent_card()
+    
+    @app.get("/a2a/metadata")
+    async def get_metadata():
+        return agent.get_metadata()
+    
+    @app.get("/a2a/health")
+    async def health():
+        return {"status": "ok"}
+    
+    @app.get("/metrics")
+    async def get_metrics():
+        return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+    
+    @app.post("/a2a/tasks/send")
+    @app.post("/tasks/send")
+    async def tasks_send(request: Request):
+        data = await request.json()
+        if "jsonrpc" in data:
+            result = await handle_task(data.get("params", {}))
+            return {"jsonrpc": "2.0", "id": data.get("id", 1), "result": result}
+        return await handle_task(data)
+    
+    @app.post("/a2a/tasks/get")
+    @app.post("/tasks/get")
+    async def tasks_get(request: Request):
+        return await stored_task(request)
+    
+    @app.post("/a2a/tasks/cancel")
+    @app.post("/tasks/cancel")
+    async def tasks_cancel(request: Request):
+        return await stored_task(request, cancel=True)
+    
+    @app.post("/a2a/tasks/stream")
+    @app.post("/tasks/stream")
+    async def tasks_stream(request: Request):
+        data = await request.json()
+        if "jsonrpc" not in data:
+            return JSONResponse({"error": "Expected JSON-RPC format for streaming requests"}, status_code=400)
+        method = data.get("method", "")
+        params = data.get("params", {})
+        rpc_id = data.get("id", 1)
+        
+        if method == "tasks/sendSubscribe":
+            is_google = _is_google_message(params.get("message"))
+            task = Task.from_dict(params)
+            
+            async def events():
+                yield _sse("update", rpc_id, task_dict(task, is_google))
+                yield _sse("complete", rpc_id, task_dict(await run_task(task), is_google))
+                
+        elif method == "tasks/resubscribe":
+            if not params.get("id"):
+                return _rpc_error(rpc_id, -32602, "Missing required parameter: id", 400)
+            entry = tasks.get(params["id"])
+            if entry is None:
+                return _rpc_error(rpc_id, -32000, f"Task not found: {params['id']}", 404)
+            
+            async def events():
+                # Tasks finish within their request, so the current state is final
+                current = task_dict(entry.value)
+                yield _sse("update", rpc_id, current)
+                yield _sse("complete", rpc_id, current)
+                
+        else:
+            return _rpc_error(rpc_id, -32601, f"Method '{method}' not found", 404)
+        
+        return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    @app.options("/")
+    @app.options("/{path:path}")
+    async def options(path: str = ""):
+        # Preflights with an Origin are answered by the CORS middleware
+        return Response()
+    
+    @app.post("/")
+    @app.post("/a2a")
+    async def a2a_post(request: Request):
+        data = await request.json()
+        try:
+            if "id" in data and ("message" in data or "status" in data):
+                return await handle_task(data)
+            
+            if "messages" in data:
+                is_google = bool(data["messages"]) and _is_google_message(data["messages"][0])
+                conversation = Conversation.from_dict(data)
+                if conversation.messages:
+                    conversation.add_message(await handle(conversation.messages[-1]))
+                return conversation.to_google_a2a() if use_google_format(is_google) else conversation.to_dict()
+            
+            is_google = _is_google_message(data)
+            response = await handle(Message.from_dict(data))
+            return response.to_google_a2a() if use_google_format(is_google) else response.to_dict()
+            
+        except Exception as e:
+            logger.error(f"❌ Error processing request: {e}")
+            return JSONResponse(
+                {"content": {"type": "error", "message": f"Error processing request: {e}"}, "role": "system"},
+                status_code=500
+            )
+    
+    @app.post("/a2a/stream")
+    @app.post("/stream")
+    async def stream(request: Request):
+        if not _supports_streaming(agent):
+            return JSONResponse({"error": "This agent does not support streaming"}, status_code=501)
+        
+        data = await request.json()
+        message = Message.from_dict(data.get("message", data))
+        
+        async def events():
+            try:
+                with in_flight.track_inprogress(), stream_latency.time():
+                    async for chunk in agent.stream_response(message):
+                        yield f"data: {json.dumps({'content': chunk}, ensure_ascii=False)}\n\n"
+            except Exception as e:
+                logger.error(f"❌ Error while streaming: {e}")
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        
+        return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    if hasattr(agent, "setup_asgi_routes"):
+        agent.setup_asgi_routes(app)
+    
+    return app
+
+def run_asgi_server(agent: A2AServer, host: str = "0.0.0.0", port: int = 5000, log_level: str = "warning"):
+    """Serve an agent with uvicorn (single long-lived event loop)"""
+    uvicorn.run(
+        create_asgi_app(agent),
+        host=host,
+        port=port,
+        log_level=log_level,
+        timeout_keep_alive=int(settings.AGENT_KEEPALIVE)
+    )
@@ -0,0 +1,109 @@
+"""In-memory caches"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+@dataclass
+class CacheEntry:
+    """Cached value with its freshness deadlines"""
+    value: Any
+    expires_at: float
+    stale_until: float
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry TTL and an optional stale window.
+
+    An entry is fresh for `ttl` seconds, then stale for another `stale_ttl`
+    seconds (still served, so callers can revalidate in the background),
+    then dropped. When full, the least recently used entry is evicted.
+    """
+    
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry (fresh or stale) for key, or None on a miss"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            if now >= entry.stale_until:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            if now < entry.expires_at:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return entry
+    
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Whether an entry returned by get() is still within its TTL"""
+        return self._clock() < entry.expires_at
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Insert or replace a value, evicting least recently used entries"""
+        if self.max_size <= 0:
+            return
+        
+        now = self._clock()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        entry = CacheEntry(value=value, expires_at=expires_at, stale_until=expires_at + self.stale_ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for tuning size and TTLs"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
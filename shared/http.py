@@ -0,0 +1,196 @@
+"""Pooled, keep-alive async HTTP client"""
+
+import asyncio
+import time
+import weakref
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import aiohttp
+
+class PooledHTTPClient:
+    """
+    Async HTTP client backed by a bounded keep-alive connection pool.
+    
+    aiohttp sessions are bound to the event loop that created them, so one
+    session (and pool) is kept per running loop and created lazily on first use.
+    Connections opened, reused, in use, idle and waited for are counted across
+    all of them from aiohttp trace events (see stats()).
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = 100,
+        per_host_limit: int = 0,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 5.0,
+        connect_timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.headers = headers or {}
+        # event loop -> aiohttp.ClientSession
+        self._sessions = weakref.WeakKeyDictionary()
+        
+        self.created = 0
+        self.reused = 0
+        self.in_use = 0    # requests holding a connection
+        self.waiting = 0   # requests queued for a free connection
+        # (connector, host, port) -> release times of idle connections, oldest first
+        self._idle: Dict[Tuple[int, Optional[str], Optional[int]], Deque[float]] = defaultdict(deque)
+        self._trace = aiohttp.TraceConfig()
+        self._trace.on_request_start.append(self._on_request_start)
+        self._trace.on_connection_queued_start.append(self._on_queued_start)
+        self._trace.on_connection_queued_end.append(self._on_queued_end)
+        self._trace.on_connection_create_end.append(self._on_create)
+        self._trace.on_connection_reuseconn.append(self._on_reuse)
+        self._trace.on_request_end.append(self._on_request_end)
+        self._trace.on_request_exception.append(self._on_request_exception)
+    
+    # Trace callbacks; `context` is per request. aiohttp always ends a traced
+    # request with on_request_end or on_request_exception (also when cancelled),
+    # so waiting and in-use counts are settled there.
+    
+    async def _on_request_start(self, session, context, params):
+        context.key = (id(session.connector), params.url.host, params.url.port)
+        context.queued = context.holding = False
+    
+    async def _on_queued_start(self, session, context, params):
+        context.queued = True
+        self.waiting += 1
+    
+    async def _on_queued_end(self, session, context, params):
+        self._unqueue(context)
+    
+    async def _on_create(self, session, context, params):
+        self.created += 1
+        self._acquire(context)
+    
+    async def _on_reuse(self, session, context, params):
+        self.reused += 1
+        # aiohttp hands out the oldest idle connection, closing expired ones on the way
+        idle = self._idle.get(context.key)
+        if idle:
+            self._expire(idle)
+            if idle:
+                idle.popleft()
+        self._acquire(context)
+    
+    async def _on_request_end(self, session, context, params):
+        self._unqueue(context)
+        response = params.response
+        reusable = response.headers.get("Connection", "").lower() != "close"
+        if response.connection is None:
+            # Body-less answer: the connection is already back in the pool
+            self._release(context, reusable)
+        else:
+            # Held until the body is read or the response released
+            response.connection.add_callback(lambda: self._release(context, reusable))
+    
+    async def _on_request_exception(self, session, context, params):
+        self._unqueue(context)
+        # The connection is closed, not returned to the pool
+        self._release(context, reusable=False)
+    
+    def _unqueue(self, context):
+        if context.queued:
+            context.queued = False
+            self.waiting -= 1
+    
+    def _acquire(self, context):
+        if not context.holding:
+            context.holding = True
+            self.in_use += 1
+    
+    def _release(self, context, reusable: bool):
+        if context.holding:
+            context.holding = False
+            self.in_use -= 1
+            if reusable:
+                self._idle[context.key].append(time.monotonic())
+    
+    def _expire(self, idle: Deque[float]):
+        """Drop idle connections the pool has closed after keepalive_timeout"""
+        cutoff = time.monotonic() - self.keepalive_timeout
+        while idle and idle[0] < cutoff:
+            idle.popleft()
+    
+    def session(self) -> aiohttp.ClientSession:
+        """Get the pooled session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.per_host_limit,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=self.headers,
+                trace_configs=[self._trace]
+            )
+            self._sessions[loop] = session
+        return session
+    
+    def borrow_session(self, **kwargs) -> aiohttp.ClientSession:
+        """
+        A session on the running loop's pool that can be closed without
+        closing the pool, for code that manages its own session.
+        """
+        return aiohttp.ClientSession(
+            connector=self.session().connector,
+            connector_owner=False,
+            trace_configs=[self._trace],
+            **kwargs
+        )
+    
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a URL and decode the JSON body, raising on HTTP errors"""
+        async with self.session().get(url, params=params) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+    
+    async def post_json(self, url: str, data: Any, headers: Optional[Dict[str, str]] = None) -> Any:
+        """POST a JSON body and decode the JSON answer, raising on HTTP errors"""
+        async with self.session().post(url, json=data, headers=headers) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Connections over every loop's pool: open (idle + in use), idle,
+        requests waiting for a free connection, and totals created/reused.
+        
+        Counted from trace events, as aiohttp has no public pool
+        introspection: a connection the server drops while idle is still
+        counted as idle until keepalive_timeout.
+        """
+        idle = 0
+        for connections in list(self._idle.values()):
+            self._expire(connections)
+            idle += len(connections)
+        return {
+            "open": idle + self.in_use,
+            "idle": idle,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "created": self.created,
+            "reused": self.reused,
+            "pool_size": self.pool_size,
+            "per_host_limit": self.per_host_limit,
+            "keepalive_timeout": self.keepalive_timeout
+        }
+    
+    async def close(self):
+        """Close the session owned by the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session is not None:
+            connector = id(session.connector)
+            await session.close()
+            for key in [key for key in self._idle if key[0] == connector]:
+                del self._idle[key]
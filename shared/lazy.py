@@ -0,0 +1,32 @@
+"""
+Lazy package exports.
+
+A package's __init__ maps its public names to submodules; a submodule is
+imported the first time one of its names is accessed, so importing the
+package (or one of its submodules) stays cheap:
+
+    __getattr__, __dir__ = lazy_exports(__name__, {
+        "GeminiClient": ".gemini_client",
+    })
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """Module __getattr__ and __dir__ resolving `exports` ({name: submodule}) on first use"""
+    
+    def __getattr__(name: str):
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, package), name)
+        # Later lookups find the name directly
+        setattr(sys.modules[package], name, value)
+        return value
+    
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+    
+    return __getattr__, __dir__
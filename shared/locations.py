@@ -0,0 +1,342 @@
+"""
+Canonical location resolution.
+
+"Đà Nẵng", "Danang" and "da nang, vietnam" are the same place; resolving
+them to one canonical ID lets the weather cache, the response cache and
+in-flight dedup share entries across spellings.
+
+Lookup order: exact alias (after folding case, diacritics, punctuation and
+spaces), the same with qualifiers ("city", ", vietnam") dropped, a unique
+prefix covering most of a spelling ("Vungta"), then a near-typo within a
+small edit distance ("Hanoii"). Only exact matches share the canonical ID:
+"Vung" or "Hanover" may be another place, so prefix and fuzzy hits keep
+their own key. Recent resolutions are memoized.
+"""
+
+import json
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+from shared.cache import TTLCache
+
+# Letters that do not decompose into base letter + combining mark
+_SPECIAL_LETTERS = str.maketrans({"đ": "d", "Đ": "D", "ø": "o", "Ø": "O", "ł": "l", "Ł": "L", "ß": "ss"})
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+# Words around a name that qualify the place without changing it ("TP Huế", "Ho Chi Minh City Vietnam")
+_LEADING_QUALIFIER_RE = re.compile(r"^(?:thanh pho|tp|tinh) ")
+_TRAILING_QUALIFIER_RE = re.compile(r" (?:city|province|viet nam|vietnam)$")
+
+MIN_PREFIX = 4   # characters before a prefix can resolve a place
+PREFIX_COVERAGE = 0.75   # share of a spelling a prefix must cover ("Vung" is not "Vũng Tàu")
+TYPO_LENGTH = 6   # one edit allowed per this many characters of the query
+FUZZY_CANDIDATES = 32   # spellings sharing the most trigrams that are scored exactly
+
+def fold(text: str) -> str:
+    """Lowercase, strip diacritics (đ -> d) and collapse punctuation and whitespace"""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text.translate(_SPECIAL_LETTERS))
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(_NON_WORD_RE.sub(" ", text.lower()).split())
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"${key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance, counting a swap of adjacent letters as one edit"""
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        before, previous = previous, current
+    return previous[-1]
+
+@dataclass(frozen=True)
+class Location:
+    """A canonical place: stable ID, display name and alternative spellings"""
+    id: str
+    name: str
+    country: str = ""
+    aliases: Tuple[str, ...] = ()
+    
+    @property
+    def query(self) -> str:
+        """Query string for weather providers ("Đà Nẵng,VN")"""
+        return f"{self.name},{self.country}" if self.country else self.name
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Location":
+        return cls(
+            id=data["id"],
+            name=data.get("name") or data["id"],
+            country=data.get("country", ""),
+            aliases=tuple(data.get("aliases", ()))
+        )
+
+# IDs match the keys of the mock weather table
+LOCATIONS = [
+    Location("da nang", "Đà Nẵng", "VN", ("Danang", "Tourane")),
+    Location("hanoi", "Hà Nội", "VN", ("Ha Noi", "Thủ đô Hà Nội")),
+    Location("ho chi minh", "Hồ Chí Minh", "VN", ("Thành phố Hồ Chí Minh", "HCMC", "TPHCM", "Saigon", "Sài Gòn")),
+    Location("hue", "Huế", "VN", ("Thừa Thiên Huế",)),
+    Location("nha trang", "Nha Trang", "VN"),
+    Location("hoi an", "Hội An", "VN", ("Faifo",)),
+    Location("da lat", "Đà Lạt", "VN", ("Dalat",)),
+    Location("sa pa", "Sa Pa", "VN", ("Sapa",)),
+    Location("ha long", "Hạ Long", "VN", ("Halong", "Vịnh Hạ Long", "Ha Long Bay")),
+    Location("phu quoc", "Phú Quốc", "VN", ("Phu Quoc Island", "Đảo Ngọc")),
+    Location("hai phong", "Hải Phòng", "VN", ("Haiphong",)),
+    Location("can tho", "Cần Thơ", "VN", ("Cantho",)),
+    Location("vung tau", "Vũng Tàu", "VN", ("Vungtau", "Bà Rịa - Vũng Tàu")),
+    Location("quy nhon", "Quy Nhơn", "VN", ("Qui Nhon",)),
+    Location("ninh binh", "Ninh Bình", "VN", ("Tràng An", "Tam Cốc")),
+    Location("mui ne", "Mũi Né", "VN", ("Phan Thiết", "Phan Thiet")),
+]
+
+class LocationResolver:
+    """
+    Resolve free-form place names to canonical Locations.
+    
+    Aliases are indexed by their folded form without spaces ("hanoi" for
+    "Hà Nội" and "Ha Noi"); a sorted key list serves prefix lookups and a
+    trigram index finds fuzzy candidates. A fuzzy match must be within one
+    edit per TYPO_LENGTH characters and at least `fuzzy_threshold` similar
+    (1 - distance / length), and closer than any other place. When two
+    places share a spelling, the one added first wins. Resolutions
+    (including misses) are kept in a bounded LRU memo.
+    """
+    
+    def __init__(
+        self,
+        locations: Iterable[Location] = (),
+        memo_size: int = 4096,
+        fuzzy_threshold: float = 0.8
+    ):
+        self.fuzzy_threshold = fuzzy_threshold
+        self._by_id: Dict[str, Location] = {}
+        self._by_key: Dict[str, Location] = {}
+        self._keys: List[str] = []
+        self._grams: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+        self._sorted: Optional[List[str]] = None
+        self._lock = threading.Lock()
+        self._memo = TTLCache(max_size=memo_size, ttl=float("inf"))
+        self.resolutions = Counter()
+        
+        for location in locations:
+            self.add(location)
+    
+    @classmethod
+    def from_file(cls, path: Union[str, Path], **kwargs) -> "LocationResolver":
+        """Built-in places plus a JSONL gazetteer ({"id", "name", "country", "aliases"} per line)"""
+        resolver = cls(LOCATIONS, **kwargs)
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    resolver.add(Location.from_dict(json.loads(line)))
+        return resolver
+    
+    def add(self, location: Location):
+        """Index a place under its name and aliases (IDs only match exactly)"""
+        with self._lock:
+            self._by_id.setdefault(location.id, location)
+            for spelling in (location.name, *location.aliases):
+                key = fold(spelling).replace(" ", "")
+                if not key or key in self._by_key:
+                    continue
+                self._by_key[key] = location
+                index = len(self._keys)
+                self._keys.append(key)
+                grams = _trigrams(key)
+                self._gram_counts.append(len(grams))
+                for gram in grams:
+                    self._grams.setdefault(gram, []).append(index)
+            self._sorted = None
+            self._memo.clear()
+    
+    def get(self, location_id: str) -> Optional[Location]:
+        return self._by_id.get(location_id)
+    
+    def match(self, text: str) -> Tuple[Optional[Location], str]:
+        """(place, how it matched: "exact", "prefix", "fuzzy" or "unknown")"""
+        text = text.strip()
+        entry = self._memo.get(text)
+        if entry is not None:
+            return entry.value
+        
+        location, how = self._resolve(text)
+        self.resolutions[how] += 1
+        self._memo.set(text, (location, how))
+        return location, how
+    
+    def resolve(self, text: str) -> Optional[Location]:
+        """The canonical place for `text`, or None if nothing matches well enough"""
+        return self.match(text)[0]
+    
+    def key(self, text: str) -> str:
+        """
+        Canonical ID for cache and dedup keys.
+        
+        Only exact matches (up to spelling and qualifiers) share the ID;
+        prefix and fuzzy matches, like unknown places, fall back to the
+        folded text, so a guess never serves or is served another place's
+        entry and the caller's own text is what gets looked up.
+        """
+        location, how = self.match(text)
+        return location.id if how == "exact" else fold(text)
+    
+    def _resolve(self, text: str) -> Tuple[Optional[Location], str]:
+        location = self._by_id.get(text)
+        if location:
+            return location, "exact"
+        folded = fold(text)
+        compact = folded.replace(" ", "")
+        if not compact:
+            return None, "unknown"
+        location = self._by_key.get(compact)
+        if location:
+            return location, "exact"
+        
+        # "Đà Nẵng, Vietnam", "Ho Chi Minh City": drop what follows a comma,
+        # then trailing qualifiers one at a time, then a leading one
+        head = fold(text.split(",", 1)[0])
+        candidates = [head]
+        while _TRAILING_QUALIFIER_RE.search(candidates[-1]):
+            candidates.append(_TRAILING_QUALIFIER_RE.sub("", candidates[-1]))
+        candidates += [_LEADING_QUALIFIER_RE.sub("", candidate) for candidate in candidates]
+        for candidate in candidates:
+            candidate = candidate.replace(" ", "")
+            if candidate and candidate != compact:
+                location = self._by_key.get(candidate)
+                if location:
+                    return location, "exact"
+        base = candidates[-1].replace(" ", "") or compact
+        
+        location = self._prefix(base)
+        if location:
+            return location, "prefix"
+        location = self._fuzzy(base)
+        if location:
+            return location, "fuzzy"
+        return None, "unknown"
+    
+    def _prefix(self, prefix: str) -> Optional[Location]:
+        """
+        The place whose spellings are the only ones starting with `prefix`,
+        provided the prefix covers PREFIX_COVERAGE of one of them
+        """
+        if len(prefix) < MIN_PREFIX:
+            return None
+        if self._sorted is None:
+            with self._lock:
+                self._sorted = sorted(self._keys)
+        keys = self._sorted
+        
+        match = None
+        covered = False
+        for index in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[index]
+            if not key.startswith(prefix):
+                break
+            location = self._by_key[key]
+            if match is not None and location is not match:
+                return None   # ambiguous
+            match = location
+            covered = covered or len(prefix) >= PREFIX_COVERAGE * len(key)
+        return match if covered else None
+    
+    def _fuzzy(self, key: str) -> Optional[Location]:
+        """
+        The only place with a spelling a near-typo away from `key`.
+        
+        One edit changes at most four of the key's trigrams, so a spelling
+        within `max_distance` edits shares at least `needed` of them and
+        appears in one of the rarest len - needed + 1 posting lists; only
+        those are counted. The best-sharing candidates are then checked by
+        edit distance. Two places equally close is a miss, not a guess.
+        """
+        max_distance = max(1, len(key) // TYPO_LENGTH)
+        grams = _trigrams(key)
+        needed = max(1, len(grams) - 4 * max_distance)
+        postings = sorted((self._grams.get(gram, ()) for gram in grams), key=len)
+        shared = Counter()
+        for posting in postings[:len(grams) - needed + 1]:
+            shared.update(posting)
+        
+        best, best_distance = None, max_distance + 1
+        for index, _ in shared.most_common(FUZZY_CANDIDATES):
+            distance = self._typo_distance(key, self._keys[index])
+            if distance is None or distance > best_distance:
+                continue
+            location = self._by_key[self._keys[index]]
+            if distance == best_distance and best is not location:
+                best = None   # ambiguous at this distance
+            else:
+                best = location
+            best_distance = distance
+        return best
+    
+    def _typo_distance(self, key: str, spelling: str) -> Optional[int]:
+        """Edit distance from `key` to `spelling` if it is close enough to be a typo, else None"""
+        max_distance = max(1, len(key) // TYPO_LENGTH)
+        if abs(len(key) - len(spelling)) > max_distance:
+            return None
+        distance = _edit_distance(key, spelling)
+        if distance > max_distance or 1 - distance / max(len(key), len(spelling)) < self.fuzzy_threshold:
+            return None
+        return distance
+    
+    def __len__(self) -> int:
+        return len(self._by_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Index size, resolutions by match type and memo counters"""
+        return {
+            "locations": len(self._by_id),
+            "spellings": len(self._keys),
+            "trigrams": len(self._grams),
+            "resolutions": dict(self.resolutions),
+            "memo": self._memo.stats()
+        }
+
+_default_resolver: Optional[LocationResolver] = None
+_default_lock = threading.Lock()
+
+def get_resolver() -> LocationResolver:
+    """Process-wide resolver: built-in places plus LOCATION_GAZETTEER_PATH, if set"""
+    global _default_resolver
+    if _default_resolver is None:
+        with _default_lock:
+            if _default_resolver is None:
+                from config.setting import settings
+                from shared import metrics
+                
+                options = dict(memo_size=settings.LOCATION_MEMO_SIZE, fuzzy_threshold=settings.LOCATION_FUZZY_THRESHOLD)
+                if settings.LOCATION_GAZETTEER_PATH:
+                    resolver = LocationResolver.from_file(settings.LOCATION_GAZETTEER_PATH, **options)
+                else:
+                    resolver = LocationResolver(LOCATIONS, **options)
+                metrics.callback(
+                    "location_resolutions_total", "counter", "Location resolutions by match type",
+                    lambda: [({"match": how}, count) for how, count in resolver.resolutions.items()]
+                )
+                metrics.callback(
+                    "location_memo_hit_ratio", "gauge", "Location lookups answered from the memo",
+                    lambda: resolver.stats()["memo"]["hit_rate"]
+                )
+                _default_resolver = resolver
+    return _default_resolver
+
+def location_key(text: str) -> str:
+    """Canonical ID for cache and dedup keys (see LocationResolver.key)"""
+    return get_resolver().key(text)
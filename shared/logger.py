@@ -1,30 +1,330 @@
+"""
+Process-wide logging on loguru.
+
+Sinks are added once per process: a colored stdout sink, plus one rotating
+file per agent name that receives that agent's records. Sinks are queued:
+the calling thread only builds the record and appends it to an in-process
+queue; a writer thread per sink renders the line (timestamp, level,
+colors) and does the I/O, rotation and compression.
+
+Hot paths should let loguru format the message, so a disabled level costs
+no string building:
+
+    logger.info("Planning for {}", location)
+    logger.opt(lazy=True).debug("Prompt: {}", lambda: build_prompt())
+
+LOG_LEVELS overrides the level per module ("agents.planning=DEBUG,shared.asgi=WARNING"),
+and LogSampler keeps the info/debug lines of one request in LOG_SAMPLE_EVERY.
+"""
+
+import atexit
+import itertools
+import queue
 import sys
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO
 from loguru import logger
 from config.setting import settings
 
-def setup_logger(agent_name: str):
-    """Setup logger for agent"""
+ROTATION_BYTES = 10 * 1024 * 1024
+RETENTION_SECONDS = 7 * 24 * 3600
+
+_lock = threading.Lock()
+_configured = False
+_sinks: List["QueuedSink"] = []
+_file_sinks: Dict[str, int] = {}
+_level = settings.LOG_LEVEL
+_module_levels: Dict[str, str] = {}
+_console: Optional[TextIO] = None   # console stream, sys.stdout unless configured
+
+_RESET = "\x1b[0m"
+_GREEN = "\x1b[32m"
+_CYAN = "\x1b[36m"
+_LEVEL_COLORS = {
+    "TRACE": "\x1b[36m\x1b[1m",
+    "DEBUG": "\x1b[34m\x1b[1m",
+    "INFO": "\x1b[1m",
+    "SUCCESS": "\x1b[32m\x1b[1m",
+    "WARNING": "\x1b[33m\x1b[1m",
+    "ERROR": "\x1b[31m\x1b[1m",
+    "CRITICAL": "\x1b[41m\x1b[1m",
+}
+
+def render_plain(message) -> str:
+    """"time | LEVEL | module:function | message" from a loguru message"""
+    record = message.record
+    return (
+        f"{record['time'].strftime('%Y-%m-%d %H:%M:%S')} | {record['level'].name: <8} | "
+        f"{record['name']}:{record['function']} | {message}"
+    )
+
+def render_colored(message) -> str:
+    """render_plain with ANSI colors, for the console"""
+    record = message.record
+    level = record["level"].name
+    color = _LEVEL_COLORS.get(level, "")
+    text, newline, rest = str(message).partition("\n")
+    return (
+        f"{_GREEN}{record['time'].strftime('%Y-%m-%d %H:%M:%S')}{_RESET} | {color}{level: <8}{_RESET} | "
+        f"{_CYAN}{record['name']}{_RESET}:{_CYAN}{record['function']}{_RESET} | {color}{text}{_RESET}{newline}{rest}"
+    )
+
+class QueuedSink:
+    """
+    Loguru sink that queues messages for a writer thread, which renders
+    and writes them.
+    
+    With a path, the file is rotated once it reaches `rotation` bytes: the
+    old file is zipped and archives older than `retention` seconds are
+    deleted, all on the writer thread.
+    """
+    
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        path: Optional[Path] = None,
+        render: Callable[[Any], str] = render_plain,
+        rotation: int = ROTATION_BYTES,
+        retention: float = RETENTION_SECONDS
+    ):
+        if (stream is None) == (path is None):
+            raise ValueError("exactly one of stream and path is required")
+        self.render = render
+        self.path = Path(path) if path is not None else None
+        self.rotation = rotation
+        self.retention = retention
+        self._stream = stream
+        self._size = 0
+        if self.path is not None:
+            self._open()
+        
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+    
+    def __call__(self, message):
+        self._queue.put(message)
+    
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until everything queued so far is written"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+    
+    def close(self, timeout: Optional[float] = 5.0):
+        """Write what is queued, then stop the writer"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 64:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            lines = []
+            for item in batch:
+                if isinstance(item, str):
+                    lines.append(self._render(item))
+                    continue
+                self._write(lines)
+                lines = []
+                if item is None:
+                    self._close_file()
+                    return
+                item.set()   # flush marker
+            self._write(lines)
+    
+    def _render(self, message) -> str:
+        try:
+            return self.render(message)
+        except Exception:
+            return str(message)
+    
+    def _write(self, lines: List[str]):
+        if not lines:
+            return
+        text = "".join(lines)
+        try:
+            self._stream.write(text)
+            self._stream.flush()
+            if self.path is not None:
+                self._size += len(text.encode("utf-8"))
+                if self._size >= self.rotation:
+                    self._rotate()
+        except Exception as e:
+            # Never let a logging failure kill the writer
+            sys.stderr.write(f"--- log writer error: {e} ---\n")
+    
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._stream = open(self.path, "a", encoding="utf-8")
+        self._size = self._stream.tell()
+    
+    def _close_file(self):
+        if self.path is not None:
+            self._stream.close()
     
-    # Remove default handler
+    def _rotate(self):
+        self._stream.close()
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        rotated = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        self.path.rename(rotated)
+        with zipfile.ZipFile(f"{rotated}.zip", "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(rotated, arcname=rotated.name)
+        rotated.unlink()
+        
+        cutoff = time.time() - self.retention
+        for archive_path in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}.zip"):
+            if archive_path.stat().st_mtime < cutoff:
+                archive_path.unlink()
+        self._open()
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """"module=LEVEL,other.module=LEVEL" -> {"module": "LEVEL", ...}"""
+    levels = {}
+    for item in spec.split(","):
+        module, _, level = item.partition("=")
+        if module.strip() and level.strip():
+            levels[module.strip()] = level.strip().upper()
+    return levels
+
+class _LevelFilter:
+    """
+    Minimum level per module (the longest matching module prefix wins),
+    optionally limited to the records of one agent.
+    """
+    
+    def __init__(self, default: str, overrides: Dict[str, str], agent: Optional[str] = None):
+        self.default = logger.level(default.upper()).no
+        self.overrides = {module: logger.level(level).no for module, level in overrides.items()}
+        self.agent = agent
+        self._levels: Dict[str, int] = {}
+    
+    @property
+    def minimum(self) -> int:
+        return min([self.default, *self.overrides.values()])
+    
+    def level_for(self, module: Optional[str]) -> int:
+        module = module or ""
+        level = self._levels.get(module)
+        if level is None:
+            level = self.default
+            prefix = module
+            while prefix:
+                if prefix in self.overrides:
+                    level = self.overrides[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._levels[module] = level
+        return level
+    
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        if self.agent is not None and record["extra"].get("agent") != self.agent:
+            return False
+        return not self.overrides or record["level"].no >= self.level_for(record["name"])
+
+def _close_sinks():
     logger.remove()
+    for sink in _sinks:
+        sink.close()
+    _sinks.clear()
+    _file_sinks.clear()
+
+def configure_logging(level: Optional[str] = None, levels: Optional[str] = None, stream: Optional[TextIO] = None):
+    """
+    (Re)configure the process's sinks. Called on the first setup_logger;
+    call it directly to change levels at runtime, or to move console output
+    to another stream (e.g. sys.stderr when stdout carries data). File sinks
+    are re-added by the next setup_logger call for each agent.
+    """
+    global _configured, _level, _module_levels, _console
+    with _lock:
+        _close_sinks()
+        _level = level or settings.LOG_LEVEL
+        _module_levels = _parse_levels(settings.LOG_LEVELS if levels is None else levels)
+        _console = stream or _console
+        level_filter = _LevelFilter(_level, _module_levels)
+        sink = QueuedSink(stream=_console or sys.stdout, render=render_colored)
+        _sinks.append(sink)
+        logger.add(
+            sink,
+            format="{message}",
+            level=level_filter.minimum,
+            filter=level_filter if level_filter.overrides else None
+        )
+        if not _configured:
+            atexit.register(_close_sinks)
+        _configured = True
+
+def flush_logs(timeout: Optional[float] = None):
+    """Wait until every queued log line is written"""
+    for sink in list(_sinks):
+        sink.flush(timeout)
+
+def setup_logger(agent_name: str):
+    """Logger for an agent's modules; adds the agent's log file on first use"""
+    if not _configured:
+        configure_logging()
     
-    # Console handler with colors
-    logger.add(
-        sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> | <level>{message}</level>",
-        level=settings.LOG_LEVEL,
-        colorize=True
-    )
+    with _lock:
+        if agent_name not in _file_sinks:
+            level_filter = _LevelFilter(_level, _module_levels, agent=agent_name)
+            sink = QueuedSink(path=settings.LOG_DIR / f"{agent_name}.log")
+            _sinks.append(sink)
+            _file_sinks[agent_name] = logger.add(
+                sink,
+                format="{message}",
+                level=level_filter.minimum,
+                filter=level_filter
+            )
     
-    # File handler
-    log_file = settings.LOG_DIR / f"{agent_name}.log"
-    logger.add(
-        log_file,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} | {message}",
-        level=settings.LOG_LEVEL,
-        rotation="10 MB",
-        retention="7 days",
-        compression="zip"
-    )
+    return logger.bind(agent=agent_name)
+
+class _QuietLogger:
+    """Logger view that drops debug/info/success records and passes the rest"""
+    
+    def __init__(self, target):
+        self._target = target
+    
+    def debug(self, *args, **kwargs):
+        pass
+    
+    info = success = trace = debug
+    
+    def opt(self, *args, **kwargs):
+        return _QuietLogger(self._target.opt(*args, **kwargs))
+    
+    def bind(self, **kwargs):
+        return _QuietLogger(self._target.bind(**kwargs))
+    
+    def __getattr__(self, name: str):
+        return getattr(self._target, name)
+
+class LogSampler:
+    """
+    Sample the info/debug lines of high-volume requests as a whole.
+    
+    for_request() returns the real logger for one request in `every` and a
+    quiet one for the others, so a sampled request keeps all its lines.
+    Warnings and errors are always logged.
+    """
+    
+    def __init__(self, target, every: Optional[int] = None):
+        self._target = target
+        self._quiet = _QuietLogger(target)
+        self.every = max(1, every or settings.LOG_SAMPLE_EVERY)
+        self._counter = itertools.count()
     
-    return logger
+    def for_request(self):
+        if self.every == 1 or next(self._counter) % self.every == 0:
+            return self._target
+        return self._quiet
@@ -0,0 +1,288 @@
+"""Typed, versioned payloads exchanged between the coordinator and the agents"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+PAYLOAD_VERSION = 1
+
+# Message metadata key (Metadata.custom_fields) carrying a request payload
+METADATA_KEY = "payload"
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+class PayloadError(ValueError):
+    """A payload is missing, of the wrong kind, or of an unsupported version"""
+
+def _number(value: Any) -> Optional[float]:
+    """Read a number from 27.5, "27.5°C" or "72%" """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER_RE.search(str(value or ""))
+    return float(match.group()) if match else None
+
+def _format_number(value: float) -> str:
+    return f"{value:g}"
+
+def _check(data: Any, kind: str) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise PayloadError(f"expected a {kind} payload, got {type(data).__name__}")
+    if data.get("kind") != kind:
+        raise PayloadError(f"expected a {kind} payload, got {data.get('kind')!r}")
+    version = data.get("version")
+    if not isinstance(version, int) or version > PAYLOAD_VERSION:
+        raise PayloadError(f"unsupported {kind} payload version: {version!r}")
+    return data
+
+@dataclass
+class WeatherReport:
+    """Current weather for one location"""
+    location: str
+    condition: str
+    temperature: Optional[float] = None  # °C
+    humidity: Optional[float] = None     # %
+    
+    KIND = "weather_report"
+    
+    @classmethod
+    def from_weather_data(cls, data: Dict[str, Any]) -> "WeatherReport":
+        """Build from a WeatherHandler result ({"temperature": "27.5°C", ...})"""
+        return cls(
+            location=data["location"],
+            condition=data["condition"],
+            temperature=_number(data.get("temperature")),
+            humidity=_number(data.get("humidity"))
+        )
+    
+    def to_text(self) -> str:
+        """Compact one-line form, used for prompts and cache keys"""
+        parts = [f"Condition: {self.condition}"]
+        if self.temperature is not None:
+            parts.insert(0, f"Temperature: {_format_number(self.temperature)}°C")
+        if self.humidity is not None:
+            parts.append(f"Humidity: {_format_number(self.humidity)}%")
+        return ", ".join(parts)
+    
+    def to_display_text(self) -> str:
+        """Multi-line form shown to users"""
+        temperature = f"{_format_number(self.temperature)}°C" if self.temperature is not None else "n/a"
+        humidity = f"{_format_number(self.humidity)}%" if self.humidity is not None else "n/a"
+        return (
+            f"Weather in {self.location}:\n"
+            f"🌡️ Temperature: {temperature}\n"
+            f"☁️ Condition: {self.condition}\n"
+            f"💧 Humidity: {humidity}"
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.KIND, "version": PAYLOAD_VERSION, **asdict(self)}
+    
+    @classmethod
+    def from_dict(cls, data: Any) -> "WeatherReport":
+        data = _check(data, cls.KIND)
+        return cls(
+            location=data["location"],
+            condition=data["condition"],
+            temperature=data.get("temperature"),
+            humidity=data.get("humidity")
+        )
+
+@dataclass
+class WeatherRequest:
+    """Ask the Weather Agent for several locations in one message"""
+    locations: List[str]
+    
+    KIND = "weather_request"
+    
+    def to_text(self) -> str:
+        """Text form, one location per line"""
+        return "\n".join(self.locations)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.KIND, "version": PAYLOAD_VERSION, "locations": list(self.locations)}
+    
+    @classmethod
+    def from_dict(cls, data: Any) -> "WeatherRequest":
+        data = _check(data, cls.KIND)
+        locations = data.get("locations")
+        if not isinstance(locations, list) or not all(isinstance(location, str) for location in locations):
+            raise PayloadError("locations must be a list of strings")
+        return cls(locations=locations)
+
+@dataclass
+class WeatherBatch:
+    """Weather for several locations, keyed by location as requested; failed ones under errors"""
+    reports: Dict[str, WeatherReport] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    
+    KIND = "weather_batch"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.KIND,
+            "version": PAYLOAD_VERSION,
+            "reports": {location: report.to_dict() for location, report in self.reports.items()},
+            "errors": dict(self.errors)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Any) -> "WeatherBatch":
+        data = _check(data, cls.KIND)
+        return cls(
+            reports={location: WeatherReport.from_dict(report) for location, report in (data.get("reports") or {}).items()},
+            errors=dict(data.get("errors") or {})
+        )
+
+def _iso_date(value: Any) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise PayloadError(f"expected an ISO date (YYYY-MM-DD), got {value!r}") from None
+
+@dataclass
+class ForecastRequest:
+    """Ask the Weather Agent for the daily forecast of `days` days from `start`"""
+    location: str
+    start: str   # ISO date
+    days: int
+    
+    KIND = "forecast_request"
+    
+    def to_text(self) -> str:
+        return f"Forecast for {self.location} from {self.start}, {self.days} day(s)"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.KIND, "version": PAYLOAD_VERSION, "location": self.location, "start": self.start, "days": self.days}
+    
+    @classmethod
+    def from_dict(cls, data: Any) -> "ForecastRequest":
+        data = _check(data, cls.KIND)
+        days = data.get("days")
+        if not isinstance(days, int) or isinstance(days, bool) or days < 1:
+            raise PayloadError(f"days must be a positive integer, got {days!r}")
+        if not isinstance(data.get("location"), str):
+            raise PayloadError("location must be a string")
+        return cls(location=data["location"], start=_iso_date(data.get("start")), days=days)
+
+@dataclass
+class Forecast:
+    """Daily weather for one location: days[i] is the report for start + i days"""
+    location: str
+    start: str   # ISO date of days[0]
+    days: List[WeatherReport] = field(default_factory=list)
+    
+    KIND = "forecast"
+    
+    @property
+    def dates(self) -> List[str]:
+        first = date.fromisoformat(self.start)
+        return [(first + timedelta(days=offset)).isoformat() for offset in range(len(self.days))]
+    
+    def to_display_text(self) -> str:
+        lines = [f"Forecast for {self.location}:"]
+        lines += [f"📅 {day}: {report.to_text()}" for day, report in zip(self.dates, self.days)]
+        return "\n".join(lines)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.KIND,
+            "version": PAYLOAD_VERSION,
+            "location": self.location,
+            "start": self.start,
+            "days": [report.to_dict() for report in self.days]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Any) -> "Forecast":
+        data = _check(data, cls.KIND)
+        return cls(
+            location=data["location"],
+            start=_iso_date(data.get("start")),
+            days=[WeatherReport.from_dict(report) for report in data.get("days") or []]
+        )
+
+def _activity_count(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= 10:
+        raise PayloadError(f"activity_count must be an integer from 1 to 10, got {value!r}")
+    return value
+
+@dataclass
+class PlanningRequest:
+    """Ask the Planning Agent for activities at a location"""
+    location: str
+    weather: Optional[WeatherReport] = None
+    weather_text: Optional[str] = None   # free-form weather when no report is available
+    additional_context: Optional[str] = None
+    activity_count: Optional[int] = None   # activities wanted (default 3-5)
+    
+    KIND = "planning_request"
+    
+    @property
+    def weather_info(self) -> str:
+        """Weather as text for the prompt"""
+        if self.weather is not None:
+            return self.weather.to_text()
+        return self.weather_text or "Unknown weather conditions"
+    
+    def to_text(self) -> str:
+        """Legacy text form understood by agents without payload support"""
+        return f"Plan for {self.location} with weather: {self.weather_info}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"kind": self.KIND, "version": PAYLOAD_VERSION, "location": self.location}
+        if self.weather is not None:
+            data["weather"] = self.weather.to_dict()
+        if self.weather_text:
+            data["weather_text"] = self.weather_text
+        if self.additional_context:
+            data["additional_context"] = self.additional_context
+        if self.activity_count:
+            data["activity_count"] = self.activity_count
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Any) -> "PlanningRequest":
+        data = _check(data, cls.KIND)
+        weather = data.get("weather")
+        return cls(
+            location=data["location"],
+            weather=WeatherReport.from_dict(weather) if weather is not None else None,
+            weather_text=data.get("weather_text"),
+            additional_context=data.get("additional_context"),
+            activity_count=_activity_count(data.get("activity_count"))
+        )
+
+@dataclass
+class ActivityPlan:
+    """Activities suggested by the Planning Agent"""
+    location: str
+    activities: List[Dict[str, str]] = field(default_factory=list)
+    cached: bool = False
+    
+    KIND = "activity_plan"
+    
+    @property
+    def count(self) -> int:
+        return len(self.activities)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.KIND, "version": PAYLOAD_VERSION, **asdict(self)}
+    
+    @classmethod
+    def from_dict(cls, data: Any) -> "ActivityPlan":
+        data = _check(data, cls.KIND)
+        return cls(
+            location=data["location"],
+            activities=list(data.get("activities") or []),
+            cached=bool(data.get("cached", False))
+        )
+
+def message_payload(message: Any) -> Optional[Dict[str, Any]]:
+    """Return the structured payload attached to an A2A message, if any"""
+    metadata = getattr(message, "metadata", None)
+    custom_fields = getattr(metadata, "custom_fields", None) or {}
+    payload = custom_fields.get(METADATA_KEY)
+    return payload if isinstance(payload, dict) else None
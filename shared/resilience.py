@@ -0,0 +1,341 @@
+"""Deadlines, circuit breakers, retry budgets and admission control for calls between agents"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+# Message metadata key (Metadata.custom_fields) carrying the caller's remaining time
+DEADLINE_METADATA_KEY = "timeout_ms"
+
+class DeadlineExceeded(Exception):
+    """The caller's deadline passed before the work finished"""
+
+class CircuitOpenError(Exception):
+    """The circuit breaker is rejecting calls"""
+
+class Overloaded(Exception):
+    """Admission control rejected the request; try again after `retry_after` seconds"""
+    
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class Deadline:
+    """
+    A point in time by which work must be done.
+    
+    Deadlines travel between processes as the remaining time in
+    milliseconds, so clocks do not need to agree.
+    """
+    
+    def __init__(self, timeout: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.at = clock() + timeout
+    
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(0.0, self.at - self._clock())
+    
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.at
+    
+    def share(self, fraction: float) -> "Deadline":
+        """A sub-deadline using `fraction` of the remaining time"""
+        return Deadline(self.remaining() * fraction, self._clock)
+    
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded("deadline exceeded")
+    
+    async def run(self, awaitable: Awaitable[Any]) -> Any:
+        """Await within the deadline, raising DeadlineExceeded when it passes"""
+        if self.expired:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded("deadline exceeded")
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("deadline exceeded") from None
+    
+    def to_metadata(self) -> Dict[str, int]:
+        return {DEADLINE_METADATA_KEY: int(self.remaining() * 1000)}
+    
+    @classmethod
+    def from_message(cls, message: Any) -> Optional["Deadline"]:
+        """Deadline sent by the caller in the message metadata, if any"""
+        metadata = getattr(message, "metadata", None)
+        custom_fields = getattr(metadata, "custom_fields", None) or {}
+        timeout_ms = custom_fields.get(DEADLINE_METADATA_KEY)
+        if not isinstance(timeout_ms, (int, float)):
+            return None
+        return cls(timeout_ms / 1000)
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker.
+    
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast with CircuitOpenError. After `reset_timeout` seconds it
+    lets `half_open_max_calls` trial calls through: a success closes it,
+    a failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.consecutive_failures = 0
+        
+        self.rejected = 0
+        self.opened = 0
+    
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+    
+    def allow(self):
+        """Admit a call or raise CircuitOpenError"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return
+        self.rejected += 1
+        raise CircuitOpenError(f"circuit for {self.name} is {state}")
+    
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._state = self.CLOSED
+    
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.opened += 1
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+    
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Admit the enclosed call and record its outcome"""
+        self.allow()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Abandoned by the caller: free the half-open slot, don't judge the agent
+            if self._state == self.HALF_OPEN:
+                self._half_open_calls = max(0, self._half_open_calls - 1)
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        else:
+            self.record_success()
+    
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        async with self.guard():
+            return await func()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected
+        }
+
+class RetryBudget:
+    """
+    Cap retries at a fraction of recent requests.
+    
+    Over a sliding `window` (seconds), at most `min_retries` plus `ratio`
+    times the number of first attempts may be retried, so a failing
+    dependency cannot multiply the load sent to it.
+    """
+    
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries: int = 10,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted = 0
+    
+    def _trim(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+    
+    def record_request(self):
+        now = self._clock()
+        self._trim(now)
+        self._requests.append(now)
+    
+    def try_spend(self) -> bool:
+        """Take one retry from the budget, False if none is left"""
+        now = self._clock()
+        self._trim(now)
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        self._trim(self._clock())
+        return {
+            "requests": len(self._requests),
+            "retries": len(self._retries),
+            "exhausted": self.exhausted
+        }
+
+class AdmissionController:
+    """
+    Bounded concurrency with a bounded FIFO wait queue that sheds load early.
+    
+    Up to `max_in_flight` requests hold a slot at once and up to
+    `max_queue` more wait for one. A request is rejected with Overloaded
+    straight away when the queue is full or when its expected wait (its
+    queue position times the average time a slot is held, spread over the
+    slots) exceeds `max_wait`; a queued request still without a slot after
+    `max_wait` seconds is rejected too. Latency for admitted requests stays
+    bounded instead of growing with the backlog.
+    """
+    
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        max_wait: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if max_in_flight < 1 or max_queue < 0:
+            raise ValueError("max_in_flight must be at least 1 and max_queue at least 0")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._clock = clock
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time: Optional[float] = None   # EWMA of seconds a slot is held
+        
+        self.in_flight = 0
+        self.admitted = 0
+        self.admitted_from_queue = 0
+        self.wait_seconds = 0.0
+        self.rejected = {"queue_full": 0, "wait_too_long": 0, "timeout": 0}
+    
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+    
+    def expected_wait(self, position: Optional[int] = None) -> float:
+        """Seconds until a request at queue `position` (default: the end) gets a slot"""
+        if self._service_time is None:
+            return 0.0
+        position = len(self._waiters) + 1 if position is None else position
+        return self._service_time * position / self.max_in_flight
+    
+    def _reject(self, reason: str) -> Overloaded:
+        self.rejected[reason] += 1
+        return Overloaded(reason, max(1, math.ceil(self.expected_wait() or self.max_wait)))
+    
+    async def acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed; returns the seconds waited"""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+        if self.expected_wait() > self.max_wait:
+            raise self._reject("wait_too_long")
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = self._clock()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject("timeout") from None
+        
+        waited = self._clock() - started
+        self.admitted += 1
+        self.admitted_from_queue += 1
+        self.wait_seconds += waited
+        return waited
+    
+    def release(self, held: Optional[float] = None):
+        """Free a slot (handing it to the oldest waiter), recording how long it was held"""
+        if held is not None:
+            self._service_time = held if self._service_time is None else 0.8 * self._service_time + 0.2 * held
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+    
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold a slot for the block, yielding the seconds spent queued"""
+        waited = await self.acquire()
+        started = self._clock()
+        try:
+            yield waited
+        finally:
+            self.release(self._clock() - started)
+    
+    def stats(self) -> Dict[str, Any]:
+        queued = self.admitted_from_queue
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "mean_queue_wait": self.wait_seconds / queued if queued else 0.0,
+            "service_time": self._service_time
+        }
@@ -1,6 +1,8 @@
 import asyncio
-from typing import Any, Dict
+import random
+from typing import Any, Dict, Optional, Tuple, Type
 from datetime import datetime
+from shared.resilience import Deadline, DeadlineExceeded, RetryBudget
 
 def format_timestamp() -> str:
     """Get formatted timestamp"""
@@ -14,15 +16,44 @@ def parse_location(text: str) -> str:
         return text.lower().split("in ")[-1].strip()
     return text
 
-async def retry_async(func, max_retries: int = 3, delay: float = 1.0):
-    """Retry async function with exponential backoff"""
+async def retry_async(
+    func,
+    max_retries: int = 3,
+    delay: float = 1.0,
+    max_delay: Optional[float] = None,
+    jitter: bool = True,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    deadline: Optional[Deadline] = None,
+    budget: Optional[RetryBudget] = None
+):
+    """
+    Retry async function with exponential backoff
+    
+    Backoff is capped at max_delay and, with jitter, drawn uniformly from
+    [0, backoff] so callers failing together don't retry together. Only
+    errors in retry_on are retried. No retry is attempted when the backoff
+    would overrun the deadline or the retry budget is spent.
+    """
+    if budget:
+        budget.record_request()
+    
     for attempt in range(max_retries):
         try:
             return await func()
         except Exception as e:
-            if attempt == max_retries - 1:
+            if attempt == max_retries - 1 or isinstance(e, DeadlineExceeded) or not isinstance(e, retry_on):
                 raise
+            
             wait_time = delay * (2 ** attempt)
+            if max_delay is not None:
+                wait_time = min(wait_time, max_delay)
+            if jitter:
+                wait_time = random.uniform(0, wait_time)
+            
+            if deadline and deadline.remaining() <= wait_time:
+                raise
+            if budget and not budget.try_spend():
+                raise
             await asyncio.sleep(wait_time)
 
 def create_error_response(error: str) -> Dict[str, Any]:
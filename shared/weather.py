@@ -0,0 +1,60 @@
+"""Bucketing of weather text into signatures shared by equivalent weather"""
+
+import hashlib
+import re
+
+_TEMPERATURE_RE = re.compile(r"temperature:\s*(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+_HUMIDITY_RE = re.compile(r"humidity:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_CONDITION_RE = re.compile(r"condition:\s*([^,\n]+)", re.IGNORECASE)
+
+# Checked in order, first match wins
+_CONDITION_CLASSES = (
+    ("storm", ("thunder", "storm")),
+    ("snow", ("snow", "sleet", "blizzard")),
+    ("rain", ("rain", "drizzle", "shower")),
+    ("fog", ("fog", "mist", "haze", "smoke")),
+    ("cloudy", ("cloud", "overcast")),
+    ("clear", ("sun", "clear")),
+)
+
+TEMPERATURE_BAND = 5   # °C
+HUMIDITY_BAND = 20     # %
+
+def _band(value: float, width: int) -> str:
+    low = int(value // width) * width
+    return f"{low}..{low + width - 1}"
+
+def condition_class(condition: str) -> str:
+    """Collapse a free-form weather condition into a small set of classes"""
+    condition = condition.lower()
+    for name, keywords in _CONDITION_CLASSES:
+        if any(keyword in condition for keyword in keywords):
+            return name
+    return "other"
+
+def weather_signature(weather_info: str) -> str:
+    """
+    Bucket weather text into "condition|temperature band|humidity band".
+
+    Equivalent weather maps to the same signature so the cached plan can be
+    reused. Fields are read from "Condition:", "Temperature:" and
+    "Humidity:" labels; text without any of them is hashed as is.
+    
+    >>> weather_signature("Condition: Sunny, Temperature: 28°C, Humidity: 71%")
+    'clear|25..29|60..79'
+    >>> weather_signature("Condition: Clear, Temperature: 29°C, Humidity: 75%")
+    'clear|25..29|60..79'
+    """
+    condition_match = _CONDITION_RE.search(weather_info)
+    temperature_match = _TEMPERATURE_RE.search(weather_info)
+    humidity_match = _HUMIDITY_RE.search(weather_info)
+    
+    if not (condition_match or temperature_match or humidity_match):
+        # Unstructured text: only identical text shares an entry
+        digest = hashlib.sha1(weather_info.strip().lower().encode("utf-8")).hexdigest()[:16]
+        return f"raw:{digest}"
+    
+    condition = condition_class(condition_match.group(1) if condition_match else weather_info)
+    temperature = _band(float(temperature_match.group(1)), TEMPERATURE_BAND) if temperature_match else "?"
+    humidity = _band(float(humidity_match.group(1)), HUMIDITY_BAND) if humidity_match else "?"
+    return f"{condition}|{temperature}|{humidity}"
@@ -0,0 +1,64 @@
+"""PooledA2AClient: no blocking request on creation, card fetched through the pool"""
+
+import pytest
+import pytest_asyncio
+import requests
+from aiohttp import web
+from python_a2a import AgentCard
+from benchmarks.stubs import free_port
+from shared.a2a_client import PooledA2AClient
+from shared.http import PooledHTTPClient
+
+@pytest_asyncio.fixture
+async def agent_url():
+    async def agent_card(request):
+        return web.json_response({
+            "name": "weather",
+            "description": "Test agent",
+            "version": "1.0.0",
+            "capabilities": {"streaming": True, "google_a2a_compatible": True}
+        })
+    
+    app = web.Application()
+    app.router.add_get("/a2a/agent.json", agent_card)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+@pytest.fixture
+def no_blocking_requests(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("blocking request made")
+    
+    monkeypatch.setattr(requests, "get", fail)
+    monkeypatch.setattr(requests, "post", fail)
+
+def test_creating_a_client_makes_no_request(no_blocking_requests):
+    client = PooledA2AClient("http://127.0.0.1:9", transport=PooledHTTPClient())
+    
+    assert client.agent_card.name == "Unknown Agent"
+
+def test_agent_card_can_be_passed_in(no_blocking_requests):
+    card = AgentCard(name="weather", description="", url="http://127.0.0.1:9", capabilities={"google_a2a_compatible": True})
+    client = PooledA2AClient("http://127.0.0.1:9", transport=PooledHTTPClient(), agent_card=card)
+    
+    assert client.agent_card is card
+    assert client.is_using_google_a2a_format()
+
+@pytest.mark.asyncio
+async def test_card_is_fetched_once_through_the_pool(agent_url, no_blocking_requests):
+    transport = PooledHTTPClient()
+    client = PooledA2AClient(agent_url, transport=transport)
+    
+    card = await client.load_agent_card()
+    await client.load_agent_card()
+    stats = transport.stats()
+    await transport.close()
+    
+    assert card.name == "weather"
+    assert client.is_using_google_a2a_format()
+    # Three well-known paths tried on the first call, none on the second
+    assert stats["created"] + stats["reused"] == 3
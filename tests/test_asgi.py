@@ -0,0 +1,76 @@
+"""ASGI app: the task routes of python_a2a's server, CORS preflight and closing the agent at shutdown"""
+
+import json
+import pytest
+from fastapi.testclient import TestClient
+from python_a2a import A2AServer, AgentCard
+from shared.asgi import create_asgi_app
+
+class EchoAgent(A2AServer):
+    """Answers every message with its text; records when it is closed"""
+    
+    def __init__(self):
+        super().__init__(agent_card=AgentCard(name="echo", description="Echo agent", url="http://localhost"))
+        self.closed = False
+    
+    async def _async_handle_message(self, message):
+        return {"text": f"echo: {message.content.text}"}
+    
+    async def close(self):
+        self.closed = True
+
+TASK = {"id": "task-1", "message": {"content": {"type": "text", "text": "hi"}, "role": "user"}}
+
+@pytest.fixture
+def agent():
+    return EchoAgent()
+
+@pytest.fixture
+def client(agent):
+    with TestClient(create_asgi_app(agent)) as client:
+        yield client
+
+def artifact_text(task):
+    return task["artifacts"][0]["parts"][0]["text"]
+
+@pytest.mark.parametrize("prefix", ["", "/a2a"])
+def test_sent_task_can_be_fetched_and_cancelled(client, prefix):
+    assert artifact_text(client.post(f"{prefix}/tasks/send", json=TASK).json()) == "echo: hi"
+    
+    fetched = client.post(f"{prefix}/tasks/get", json={"jsonrpc": "2.0", "id": 7, "params": {"id": "task-1"}}).json()
+    cancelled = client.post(f"{prefix}/tasks/cancel", json={"id": "task-1"}).json()
+    
+    assert fetched["id"] == 7
+    assert fetched["result"]["status"]["state"] == "completed"
+    assert cancelled["status"]["state"] == "canceled"
+
+def test_unknown_task_is_not_found(client):
+    response = client.post("/tasks/get", json={"jsonrpc": "2.0", "id": 1, "params": {"id": "missing"}})
+    
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == -32000
+
+def test_send_subscribe_streams_update_then_complete(client):
+    request = {"jsonrpc": "2.0", "id": 3, "method": "tasks/sendSubscribe", "params": TASK}
+    
+    with client.stream("POST", "/a2a/tasks/stream", json=request) as response:
+        body = "".join(response.iter_text())
+    
+    events = [block.split("\n") for block in body.strip().split("\n\n")]
+    assert [lines[0] for lines in events] == ["event: update", "event: complete"]
+    assert artifact_text(json.loads(events[1][2].removeprefix("data: "))) == "echo: hi"
+
+def test_cors_preflight(client):
+    response = client.options(
+        "/a2a/tasks/send",
+        headers={"Origin": "http://example.com", "Access-Control-Request-Method": "POST"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "*"
+
+def test_agent_is_closed_at_shutdown(agent):
+    with TestClient(create_asgi_app(agent)):
+        assert not agent.closed
+    
+    assert agent.closed
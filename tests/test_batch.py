@@ -0,0 +1,61 @@
+"""Batch planning input: bad lines become failed results, blank ones don't hold back the checkpoint"""
+
+import io
+import json
+import pytest
+from agents.coordinator.batch import BatchWriter, Checkpoint, read_items, run_batch
+from agents.coordinator.orchestrator import TravelOrchestrator
+
+class InstantOrchestrator(TravelOrchestrator):
+    """Every trip succeeds at once, without any agent"""
+    
+    def __init__(self):
+        super().__init__(["http://127.0.0.1:9/weather"], ["http://127.0.0.1:9/planning"])
+    
+    async def get_weather_many(self, locations, timeout=None):
+        return {}
+    
+    async def _plan_trip_isolated(self, location, weather=None, timeout=None):
+        return {**self._empty_result(location), "success": True}
+
+def test_undecodable_line_is_invalid():
+    lines = [b'{"location": "Hanoi"}\n', b'{"location": "Hu\xe9"}\n', '"Da Nang"\n']
+    invalid = []
+    
+    items = list(read_items(lines, None, invalid))
+    
+    assert items == [(0, "Hanoi", None), (2, "Da Nang", None)]
+    assert [index for index, _ in invalid] == [1]
+    assert "utf-8" in invalid[0][1]
+
+@pytest.mark.asyncio
+async def test_run_batch_reports_bad_lines_and_keeps_going():
+    lines = io.BytesIO(b'{"location": "Hanoi"}\n\xff\xfe\nnot json\n{"location": "Hue", "timeout": 5}\n')
+    output = io.StringIO()
+    writer = BatchWriter(output, None, checkpoint_every=100)
+    
+    await run_batch(InstantOrchestrator(), lines, writer, concurrency=2)
+    
+    results = {result["index"]: result for result in map(json.loads, output.getvalue().splitlines())}
+    assert sorted(results) == [0, 1, 2, 3]
+    assert [results[index]["success"] for index in range(4)] == [True, False, False, True]
+    assert writer.invalid == 2
+
+@pytest.mark.asyncio
+async def test_resume_moves_past_blank_lines(tmp_path):
+    output = tmp_path / "plans.ndjson"
+    checkpoint = Checkpoint(tmp_path / "plans.ndjson.checkpoint")
+    lines = [b'{"location": "Hanoi"}\n', b"\n", b'{"location": "Hue"}\n']
+    with open(output, "a", encoding="utf-8") as stream:
+        await run_batch(InstantOrchestrator(), lines, BatchWriter(stream, checkpoint, checkpoint_every=100), concurrency=2)
+    
+    resumed = Checkpoint.load(checkpoint.path)
+    assert (resumed.next, resumed.done) == (3, set())
+    
+    resumed.recover(output)
+    with open(output, "a", encoding="utf-8") as stream:
+        writer = BatchWriter(stream, resumed, checkpoint_every=100)
+        await run_batch(InstantOrchestrator(), [*lines, b'"Da Nang"\n'], writer, concurrency=2)
+    
+    assert writer.written == 1
+    assert sorted(json.loads(line)["index"] for line in output.read_text().splitlines()) == [0, 2, 3]
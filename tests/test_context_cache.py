@@ -0,0 +1,64 @@
+"""Context caching of the system instruction: size threshold and cleanup on refresh"""
+
+import sys
+import types
+import pytest
+from agents.planning.backends import CONTEXT_CACHE_MIN_TOKENS, GeminiBackend
+
+class FakeCachedContent:
+    created = []
+    
+    def __init__(self, name):
+        self.name = name
+        self.deleted = False
+    
+    @classmethod
+    def create(cls, model, system_instruction, ttl):
+        cached = cls(f"cachedContents/{len(cls.created)}")
+        cls.created.append(cached)
+        return cached
+    
+    def delete(self):
+        self.deleted = True
+
+class FakeModel:
+    def __init__(self, model_name, system_instruction=None):
+        self.model_name = model_name
+    
+    @classmethod
+    def from_cached_content(cls, cached):
+        return cls(cached.name)
+    
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        return prompt
+
+@pytest.fixture
+def genai(monkeypatch):
+    FakeCachedContent.created = []
+    module = types.ModuleType("google.generativeai")
+    module.configure = lambda api_key: None
+    module.GenerativeModel = FakeModel
+    module.caching = types.SimpleNamespace(CachedContent=FakeCachedContent)
+    monkeypatch.setitem(sys.modules, "google.generativeai", module)
+    return module
+
+def test_short_instruction_is_not_cached(genai):
+    backend = GeminiBackend("model", "key", context_cache_ttl=3600)
+    backend.set_system_instruction("Plan activities for the weather.")
+    
+    assert FakeCachedContent.created == []
+    assert backend.cached_content is None
+    assert backend.context_cache_ttl == 0
+
+def test_refresh_deletes_previous_cache(genai):
+    backend = GeminiBackend("model", "key", context_cache_ttl=3600)
+    backend.set_system_instruction("x" * 4 * CONTEXT_CACHE_MIN_TOKENS)
+    first = FakeCachedContent.created[0]
+    
+    backend._cache_expires = 0   # due for renewal
+    backend.generate_content("prompt")
+    
+    assert len(FakeCachedContent.created) == 2
+    assert first.deleted
+    assert not FakeCachedContent.created[1].deleted
+    assert backend.cached_content == FakeCachedContent.created[1].name
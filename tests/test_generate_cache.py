@@ -0,0 +1,87 @@
+"""Only complete, parseable answers go into the response cache (single, batch and streamed calls)"""
+
+from types import SimpleNamespace
+import pytest
+from agents.planning.gemini_client import GeminiClient
+from agents.planning.response_cache import ResponseCache
+from config.setting import settings
+
+pytestmark = pytest.mark.asyncio
+
+WEATHER = "Temperature: 22°C, Condition: Cloudy, Humidity: 70%"
+ACTIVITIES = "🏖️ Beach Day\nEnjoy the sunny beaches.\n\n🍜 Food Tour\nTaste the local street food."
+BATCH = f"=== 1 ===\n{ACTIVITIES}\n=== 2 ===\n{ACTIVITIES}"
+
+class FixedBackend:
+    """Model backend answering every prompt with the same text"""
+    
+    name = "fixed"
+    
+    def __init__(self, text: str, finish_reason: str = "STOP"):
+        self.text = text
+        self.finish_reason = finish_reason
+    
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        if stream:
+            # One chunk per line; only the last one carries the finish reason
+            lines = self.text.splitlines(keepends=True)
+            return [
+                self._response(line, "STOP" if index < len(lines) else self.finish_reason)
+                for index, line in enumerate(lines, 1)
+            ]
+        return self._response(self.text, self.finish_reason)
+    
+    @staticmethod
+    def _response(text: str, finish_reason: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            text=text,
+            candidates=[SimpleNamespace(finish_reason=finish_reason)],
+            usage_metadata=None
+        )
+
+def make_client(monkeypatch, tmp_path, backend) -> GeminiClient:
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    client = GeminiClient(backend=backend)
+    client.cache = ResponseCache(tmp_path / "cache.db", ttl=3600, max_entries=100)
+    return client
+
+async def test_complete_answer_is_cached(monkeypatch, tmp_path):
+    client = make_client(monkeypatch, tmp_path, FixedBackend(ACTIVITIES))
+    
+    await client.generate_activities("Hanoi", WEATHER)
+    result = await client.generate_activities("Hanoi", WEATHER)
+    
+    assert result.get("cached")
+    assert result["count"] == 2
+
+@pytest.mark.parametrize("backend", [
+    FixedBackend(ACTIVITIES, finish_reason="MAX_TOKENS"),
+    FixedBackend("Sorry, I cannot help with that.")
+], ids=["truncated", "unparseable"])
+async def test_incomplete_answer_is_not_cached(monkeypatch, tmp_path, backend):
+    client = make_client(monkeypatch, tmp_path, backend)
+    
+    await client.generate_activities("Hanoi", WEATHER)
+    result = await client.generate_activities("Hanoi", WEATHER)
+    
+    assert not result.get("cached")
+    assert client.cache.stats()["size"] == 0
+
+@pytest.mark.parametrize("finish_reason, cached", [("STOP", 2), ("MAX_TOKENS", 0)])
+async def test_batch_is_cached_only_when_complete(monkeypatch, tmp_path, finish_reason, cached):
+    client = make_client(monkeypatch, tmp_path, FixedBackend(BATCH, finish_reason))
+    
+    results = await client.generate_activities_batch([("Hanoi", WEATHER), ("Hue", WEATHER)], batch_size=2)
+    
+    assert [result["count"] for result in results] == [2, 2]
+    assert client.batch_calls == 1
+    assert client.cache.stats()["size"] == cached
+
+@pytest.mark.parametrize("finish_reason, cached", [("STOP", 1), ("MAX_TOKENS", 0)])
+async def test_stream_is_cached_only_when_complete(monkeypatch, tmp_path, finish_reason, cached):
+    client = make_client(monkeypatch, tmp_path, FixedBackend(ACTIVITIES, finish_reason))
+    
+    activities = [activity async for activity in client.stream_activities("Hanoi", WEATHER)]
+    
+    assert len(activities) == 2
+    assert client.cache.stats()["size"] == cached
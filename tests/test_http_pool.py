@@ -0,0 +1,87 @@
+"""Pool stats counted from aiohttp trace events"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from benchmarks.stubs import free_port
+from shared.http import PooledHTTPClient
+
+pytestmark = pytest.mark.asyncio
+
+@pytest_asyncio.fixture
+async def server():
+    release = asyncio.Event()
+    
+    async def fast(request):
+        return web.json_response({"ok": True})
+    
+    async def slow(request):
+        await release.wait()
+        return web.json_response({"ok": True})
+    
+    async def stream(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(b"first ")
+        await release.wait()
+        await response.write(b"last")
+        return response
+    
+    app = web.Application()
+    app.router.add_get("/fast", fast)
+    app.router.add_get("/slow", slow)
+    app.router.add_get("/stream", stream)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    yield f"http://127.0.0.1:{port}", release
+    release.set()
+    await runner.cleanup()
+
+async def test_sequential_requests_reuse_one_idle_connection(server):
+    url, _ = server
+    client = PooledHTTPClient(pool_size=2)
+    
+    for _ in range(3):
+        await client.get_json(f"{url}/fast")
+    stats = client.stats()
+    await client.close()
+    
+    assert (stats["created"], stats["reused"]) == (1, 2)
+    assert (stats["open"], stats["idle"], stats["in_use"], stats["waiting"]) == (1, 1, 0, 0)
+    assert client.stats()["idle"] == 0
+
+async def test_cancelled_waiters_are_not_counted(server):
+    url, release = server
+    client = PooledHTTPClient(pool_size=1)
+    
+    holder = asyncio.create_task(client.get_json(f"{url}/slow"))
+    waiters = [asyncio.create_task(client.get_json(f"{url}/fast")) for _ in range(3)]
+    await asyncio.sleep(0.1)
+    busy = client.stats()
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    release.set()
+    await holder
+    stats = client.stats()
+    await client.close()
+    
+    assert (busy["in_use"], busy["waiting"]) == (1, 3)
+    assert (stats["in_use"], stats["waiting"], stats["idle"]) == (0, 0, 1)
+
+async def test_connection_is_in_use_until_the_body_is_read(server):
+    url, release = server
+    client = PooledHTTPClient()
+    
+    async with client.session().get(f"{url}/stream") as response:
+        reading = client.stats()["in_use"]
+        release.set()
+        await response.read()
+    stats = client.stats()
+    await client.close()
+    
+    assert reading == 1
+    assert (stats["in_use"], stats["idle"]) == (0, 1)
@@ -0,0 +1,59 @@
+"""Location resolution: distinct places stay apart, near-typos resolve but keep their own key"""
+
+import pytest
+from agents.weather.handlers import WeatherHandler
+from shared.locations import LOCATIONS, Location, LocationResolver
+
+@pytest.fixture
+def resolver():
+    return LocationResolver(LOCATIONS)
+
+@pytest.mark.parametrize("text", ["Hanover", "Hai Duong", "Hoi Nhon", "Dalaman", "Cantor", "Can", "Vung"])
+def test_other_places_do_not_collapse(resolver, text):
+    assert resolver.resolve(text) is None
+    assert resolver.key(text) == text.lower()
+
+@pytest.mark.parametrize("text, location_id", [
+    ("Đà Nẵng", "da nang"),
+    ("Danang", "da nang"),
+    ("da nang, vietnam", "da nang"),
+    ("Ho Chi Minh City", "ho chi minh"),
+    ("TP Huế", "hue")
+])
+def test_spellings_share_the_canonical_id(resolver, text, location_id):
+    assert resolver.match(text) == (resolver.get(location_id), "exact")
+    assert resolver.key(text) == location_id
+
+@pytest.mark.parametrize("text, location_id, how", [
+    ("Hanoii", "hanoi", "fuzzy"),
+    ("Nha Trnag", "nha trang", "fuzzy"),
+    ("Quy Nhonn", "quy nhon", "fuzzy"),
+    ("Vungta", "vung tau", "prefix")
+])
+def test_near_misses_resolve_under_their_own_key(resolver, text, location_id, how):
+    assert resolver.match(text) == (resolver.get(location_id), how)
+    assert resolver.key(text) == text.lower()
+
+def test_equally_close_places_are_a_miss():
+    resolver = LocationResolver(LOCATIONS)
+    resolver.add(Location("hanoj", "Hanoj"))
+    
+    assert resolver.resolve("Hanox") is None
+
+@pytest.mark.asyncio
+async def test_fuzzy_hit_queries_the_provider_as_typed(monkeypatch):
+    handler = WeatherHandler()
+    handler.use_mock = False
+    queries = []
+    
+    async def fake_weather(location):
+        queries.append(location)
+        return {"location": location}
+    
+    monkeypatch.setattr(handler, "_get_real_weather", fake_weather)
+    
+    typed = await handler.get_weather("Hanoii")
+    canonical = await handler.get_weather("Hà Nội")
+    
+    assert queries == ["Hanoii", "Hà Nội,VN"]
+    assert typed != canonical
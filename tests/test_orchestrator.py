@@ -0,0 +1,109 @@
+"""Coordinator fan-out settings"""
+
+import asyncio
+import pytest
+from python_a2a import Message, MessageRole, TextContent
+from agents.coordinator import agent, batch
+from agents.coordinator.orchestrator import TravelOrchestrator, concurrency_limit
+from config.setting import settings
+from shared.resilience import CircuitBreaker, Deadline, DeadlineExceeded
+
+def test_concurrency_limit_defaults_only_when_unset():
+    assert concurrency_limit(None) == settings.COORDINATOR_MAX_CONCURRENCY
+    assert concurrency_limit(1) == 1
+
+@pytest.mark.parametrize("value", [0, -1])
+def test_concurrency_below_one_is_rejected(value):
+    with pytest.raises(ValueError):
+        concurrency_limit(value)
+
+@pytest.mark.parametrize("parse_args", [agent.parse_args, batch.parse_args], ids=["agent", "batch"])
+def test_cli_rejects_zero_concurrency(parse_args):
+    with pytest.raises(SystemExit):
+        parse_args(["input.jsonl", "--concurrency", "0"])
+
+def test_cli_rejects_stream_with_days():
+    with pytest.raises(SystemExit):
+        agent.parse_args(["Hanoi", "--stream", "--days", "3"])
+
+class ItineraryOrchestrator(TravelOrchestrator):
+    """Itineraries take a moment; records the most planned at once"""
+    
+    def __init__(self):
+        super().__init__(["http://127.0.0.1:9/weather"], ["http://127.0.0.1:9/planning"])
+        self.running = self.peak = 0
+    
+    async def plan_itinerary(self, location, days, start=None, timeout=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return {"location": location, "success": True}
+    
+    def format_itinerary(self, result):
+        return result["location"]
+
+@pytest.mark.asyncio
+async def test_itineraries_respect_concurrency():
+    orchestrator = ItineraryOrchestrator()
+    
+    await agent.plan_itineraries(orchestrator, [f"City {i}" for i in range(6)], 3, max_concurrency=2)
+    
+    assert orchestrator.peak == 2
+
+class ChunkedOrchestrator(TravelOrchestrator):
+    """Bulk weather takes longer for later chunks; trips are instant"""
+    
+    def __init__(self):
+        super().__init__(["http://127.0.0.1:9/weather"], ["http://127.0.0.1:9/planning"])
+        self.events = []
+    
+    async def get_weather_many(self, locations, timeout=None):
+        self.events.append(("weather", *locations))
+        await asyncio.sleep(0.01 if "City 4" not in locations else 0.2)
+        self.events.append(("weather done", *locations))
+        return {location: (f"Sunny in {location}", None) for location in locations}
+    
+    async def _plan_trip_isolated(self, location, weather=None, timeout=None):
+        self.events.append(("trip", location))
+        return {"location": location, "success": weather is not None}
+
+@pytest.mark.asyncio
+async def test_iter_trips_starts_before_later_chunks_have_weather(monkeypatch):
+    monkeypatch.setattr(settings, "COORDINATOR_BULK_WEATHER", True)
+    monkeypatch.setattr(settings, "WEATHER_BULK_MAX_LOCATIONS", 4)
+    orchestrator = ChunkedOrchestrator()
+    locations = [f"City {i}" for i in range(12)]
+    
+    trips = orchestrator.iter_trips(locations, max_concurrency=2)
+    first = await anext(trips)
+    await trips.aclose()
+    
+    assert first["success"]
+    # Planned on the first chunk's weather while the second chunk's is still coming
+    assert orchestrator.events[:2] == [("weather", *locations[:4]), ("weather done", *locations[:4])]
+    assert not any(event[0] == "weather done" and "City 4" in event for event in orchestrator.events)
+    results = await orchestrator.plan_trips(locations, max_concurrency=2)
+    assert [result["location"] for result in results] == locations
+    assert all(result["success"] for result in results)
+
+class HangingPool:
+    """Replica pool whose agent never answers"""
+    
+    async def call(self, send):
+        await asyncio.sleep(10)
+
+@pytest.mark.asyncio
+async def test_caller_deadline_is_not_an_agent_failure():
+    orchestrator = ChunkedOrchestrator()
+    breaker = CircuitBreaker("weather", failure_threshold=1)
+    
+    for _ in range(3):
+        with pytest.raises(DeadlineExceeded):
+            await orchestrator._call_agent(
+                "weather", HangingPool(), breaker, Deadline(0.02),
+                lambda: Message(content=TextContent(text="Hanoi"), role=MessageRole.USER)
+            )
+    
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
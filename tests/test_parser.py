@@ -0,0 +1,46 @@
+"""Activity titles start with an emoji; bullet characters do not start one"""
+
+import pytest
+from agents.planning.parser import ActivityStreamParser, parse_activities
+
+BULLETED = """🏖️ Beach Day
+Enjoy the sunny weather at the beach.
+▪ Bring sunscreen
+► Go before noon
+★ Best at My Khe beach
+✓ Free entry
+➤ Rent a chair
+
+☕ Cafe Hopping
+Try egg coffee in the Old Quarter.
+"""
+
+def test_bullet_lines_stay_in_the_description():
+    activities = parse_activities(BULLETED)
+    
+    assert [activity["title"] for activity in activities] == ["🏖️ Beach Day", "☕ Cafe Hopping"]
+    assert activities[0]["description"] == (
+        "Enjoy the sunny weather at the beach. ▪ Bring sunscreen ► Go before noon "
+        "★ Best at My Khe beach ✓ Free entry ➤ Rent a chair"
+    )
+
+@pytest.mark.parametrize("title", [
+    "1. 🏛️ Temple of Literature",
+    "- ⛰️ Hike Ba Na Hills",
+    "**⛵ Boat Trip**",
+    "### ✈️ Day Trip to Hue",
+    "☔ Museum Afternoon",
+])
+def test_emoji_titles_after_list_markers(title):
+    activities = parse_activities(f"{title}\nA good choice for this weather.\n")
+    
+    assert activities == [{"title": title, "description": "A good choice for this weather."}]
+
+def test_streamed_bullets_match_the_whole_text():
+    parser = ActivityStreamParser()
+    streamed = []
+    for start in range(0, len(BULLETED), 7):
+        streamed.extend(parser.feed(BULLETED[start:start + 7]))
+    streamed.extend(parser.close())
+    
+    assert streamed == parse_activities(BULLETED)
@@ -0,0 +1,57 @@
+"""ResponseCache: off-loop access, sampled LRU touches, eviction over max_entries"""
+
+import sqlite3
+import pytest
+from agents.planning.response_cache import ResponseCache
+
+def accessed_at(cache: ResponseCache, key: str) -> float:
+    with sqlite3.connect(cache.path) as conn:
+        return conn.execute("SELECT accessed_at FROM responses WHERE key = ?", (key,)).fetchone()[0]
+
+def test_hits_within_touch_interval_do_not_write(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", ttl=3600, max_entries=10, touch_interval=60)
+    cache.set("key", "text")
+    before = accessed_at(cache, "key")
+    
+    assert cache.get("key") == "text"
+    assert accessed_at(cache, "key") == before
+    
+    cache.touch_interval = 0
+    assert cache.get("key") == "text"
+    assert accessed_at(cache, "key") > before
+
+def test_evicts_only_over_max_entries(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", ttl=3600, max_entries=10, evict_fraction=0.2)
+    for index in range(10):
+        cache.set(f"key{index}", "text")
+    assert cache.evictions == 0
+    assert cache.stats()["size"] == 10
+    
+    cache.set("key10", "text")
+    assert cache.stats()["size"] == 8
+    assert cache.evictions == 3
+    # The newest entry survives; the next inserts fit without evicting again
+    assert cache.get("key10") == "text"
+    cache.set("key11", "text")
+    assert cache.evictions == 3
+
+@pytest.mark.asyncio
+async def test_async_access(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", ttl=3600, max_entries=10)
+    assert await cache.get_async("key") is None
+    await cache.set_async("key", "text")
+    assert await cache.get_async("key") == "text"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_close_closes_every_thread_connection(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", ttl=3600, max_entries=10)
+    await cache.set_async("key", "text")
+    connections = list(cache._connections)
+    
+    cache.close()
+    
+    assert len(connections) == 2   # this thread's and the cache thread's
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,31 @@
+"""Coordinator service: /plan request validation"""
+
+import pytest
+from fastapi.testclient import TestClient
+from agents.coordinator.service import create_app
+
+class FakeOrchestrator:
+    """Plans instantly, without any agent"""
+    
+    timeout = 5.0
+    
+    async def plan_trip(self, location, timeout=None):
+        return {"location": location, "success": True}
+    
+    async def plan_itinerary(self, location, days, start=None, timeout=None):
+        return {"location": location, "days": days, "success": True}
+
+@pytest.fixture
+def client():
+    with TestClient(create_app(FakeOrchestrator())) as client:
+        yield client
+
+@pytest.mark.parametrize("days", [True, 0, 2.5, "3"])
+def test_bad_days_are_rejected(client, days):
+    assert client.post("/plan", json={"location": "Hanoi", "days": days}).status_code == 400
+
+def test_itinerary_days(client):
+    response = client.post("/plan", json={"location": "Hanoi", "days": 3})
+    
+    assert response.status_code == 200
+    assert response.json()["days"] == 3
@@ -0,0 +1,81 @@
+"""N concurrent identical requests must reach the upstream exactly once"""
+
+import asyncio
+import time
+import pytest
+from agents.planning.backends import LLMResponse
+from agents.planning.gemini_client import GeminiClient
+from agents.weather.handlers import WeatherHandler
+from config.setting import settings
+from shared.singleflight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+CONCURRENT = 20
+
+class CountingBackend:
+    """Model backend that blocks like the SDK and counts calls"""
+    
+    name = "counting"
+    
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = 0
+    
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        time.sleep(self.latency)
+        return LLMResponse(
+            text="🏖️ Beach Day\nEnjoy the sunny beaches.\n\n🍜 Food Tour\nTaste the local street food."
+        )
+
+async def test_weather_requests_share_one_upstream_call():
+    handler = WeatherHandler()
+    handler.use_mock = False
+    handler.cache.clear()
+    calls = 0
+    
+    async def fake_real_weather(location):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"location": "Hanoi", "temperature": "27.5°C", "condition": "Clouds", "humidity": "72%"}
+    
+    handler._get_real_weather = fake_real_weather
+    
+    results = await asyncio.gather(*(handler.get_weather(" Hanoi ") for _ in range(CONCURRENT)))
+    
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+
+async def test_gemini_generations_share_one_model_call(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    backend = CountingBackend()
+    client = GeminiClient(backend=backend)
+    weather = "Temperature: 22°C, Condition: Cloudy, Humidity: 70%"
+    
+    results = await asyncio.gather(*(
+        client.generate_activities("Hanoi", weather, use_cache=False) for _ in range(CONCURRENT)
+    ))
+    
+    assert backend.calls == 1
+    assert all(result["count"] == 2 for result in results)
+
+async def test_upstream_error_reaches_every_waiter():
+    flight = SingleFlight()
+    calls = 0
+    
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+    
+    results = await asyncio.gather(*(flight.do("key", failing) for _ in range(CONCURRENT)), return_exceptions=True)
+    
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # The key is released once the call settles, so the next caller retries
+    with pytest.raises(RuntimeError):
+        await flight.do("key", failing)
+    assert calls == 2
@@ -0,0 +1,25 @@
+"""Bulk weather: the default concurrency applies only when none is given"""
+
+import pytest
+from agents.weather.handlers import WeatherHandler
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def handler():
+    handler = WeatherHandler()
+    handler.use_mock = True
+    return handler
+
+@pytest.mark.parametrize("value", [0, -1])
+async def test_concurrency_below_one_is_rejected(handler, value):
+    with pytest.raises(ValueError):
+        await handler.get_weather_many(["Hanoi"], max_concurrency=value)
+
+@pytest.mark.parametrize("value", [None, 1])
+async def test_default_or_explicit_concurrency(handler, value):
+    weather = await handler.get_weather_many(["Hanoi", "Hue", "Ha Noi"], max_concurrency=value)
+    
+    assert set(weather) == {"Hanoi", "Hue", "Ha Noi"}
+    assert weather["Hanoi"] == weather["Ha Noi"]
+    assert "error" not in weather["Hue"]
@@ -0,0 +1,32 @@
+"""Daily forecasts: capped at WEATHER_FORECAST_MAX_DAYS, mock days derived from the mock report"""
+
+from datetime import date
+import pytest
+from agents.weather.handlers import WeatherHandler
+from config.setting import settings
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def handler():
+    handler = WeatherHandler()
+    handler.use_mock = True
+    return handler
+
+async def test_days_are_capped_in_the_handler(handler, monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_FORECAST_MAX_DAYS", 5)
+    
+    forecast = await handler.get_forecast("Hanoi", date(2026, 10, 1), 30)
+    
+    assert [day["date"] for day in forecast] == [f"2026-10-0{day}" for day in range(1, 6)]
+
+@pytest.mark.parametrize("location", ["Hanoi", "Atlantis"])
+async def test_mock_days_vary_around_the_mock_report(handler, location):
+    report = handler._get_mock_weather(handler.locations.key(location))
+    
+    forecast = await handler.get_forecast(location, date(2026, 10, 1), 7)
+    
+    temperatures = [float(day["temperature"].rstrip("°C")) for day in forecast]
+    assert all(day["location"] == report["location"] for day in forecast)
+    assert float(report["temperature"].rstrip("°C")) in temperatures
+    assert max(temperatures) - min(temperatures) <= 4
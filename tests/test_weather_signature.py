@@ -0,0 +1,20 @@
+"""Weather signatures: equivalent labelled weather shares one, the docstring examples hold"""
+
+import doctest
+from shared import weather
+from shared.weather import weather_signature
+
+def test_docstring_examples():
+    assert doctest.testmod(weather).failed == 0
+
+def test_equivalent_weather_shares_a_signature():
+    sunny = weather_signature("Condition: Sunny, Temperature: 28°C, Humidity: 71%")
+    
+    assert sunny == weather_signature("Temperature: 29°C, Condition: Clear sky, Humidity: 75%")
+    assert sunny != weather_signature("Condition: Light rain, Temperature: 28°C, Humidity: 71%")
+    assert sunny != weather_signature("Condition: Sunny, Temperature: 31°C, Humidity: 71%")
+
+def test_unlabelled_text_only_matches_itself():
+    assert weather_signature("Sunny, 28°C, 71%").startswith("raw:")
+    assert weather_signature("Sunny, 28°C, 71%") == weather_signature("  sunny, 28°C, 71% ")
+    assert weather_signature("Sunny, 28°C, 71%") != weather_signature("Clear, 29°C, 75%")